@@ -0,0 +1,95 @@
+#time to answer every chart query for one filter pick with the pandas stores against sql on duckdb, and a check
+#that both give the same numbers. the input is synthetic_mangrove_dataset.csv repeated up to --rows
+#python benchmarks/bench_backends.py --rows 100000 1000000
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def queries(backend, regions, species):
+    from mangrove.aggregates import STORES
+    stores = {name: backend.store(name, storeClass) for name, storeClass in STORES.items()}
+    start, end = stores["time_series"].date_range()
+    return {
+        "rows": len(backend.rows(regions, species, ["Latitude", "Temperature", "Mangrove_Species"])),
+        "corr": stores["correlation"].corr(regions, species),
+        "fits": stores["trendline"].fits(regions, species),
+        "box": stores["box"].summary("Plant_Height", regions, species),
+        "envelope": stores["time_series"].envelope("Temperature", regions, species, start=start, end=end),
+        "density": stores["density"].density("Growth_Rate", regions, species),
+        "splom": stores["splom"].select(regions, species),
+        "map": stores["map_bins"].cells(6, (23.5, 42.0), regions, species),
+    }
+
+def compare(a, b):
+    import numpy as np
+    assert a["rows"] == b["rows"], (a["rows"], b["rows"])
+    assert np.allclose(a["corr"].to_numpy(), b["corr"].to_numpy(), equal_nan=True, atol=1e-6), "correlation"
+    assert a["fits"].keys() == b["fits"].keys(), "trendline species"
+    for name in a["fits"]:
+        assert np.allclose([a["fits"][name][k] for k in ("slope", "intercept", "r2")],
+                           [b["fits"][name][k] for k in ("slope", "intercept", "r2")], rtol=1e-6), "trendline"
+    #the pandas quartiles come from t-digests, sql ones are exact
+    for name in a["box"]:
+        spread = a["box"][name]["q3"] - a["box"][name]["q1"]
+        assert abs(a["box"][name]["median"] - b["box"][name]["median"]) < 0.05 * spread, "box median"
+    assert len(a["envelope"]) == len(b["envelope"]), "envelope buckets"
+    assert np.allclose(a["envelope"]["mean"].to_numpy(), b["envelope"]["mean"].to_numpy(), atol=1e-4), "envelope"
+    assert np.array_equal(a["density"]["counts"], b["density"]["counts"]), "density grid"
+    for key in a["splom"]:
+        assert np.array_equal(np.asarray(a["splom"][key]), np.asarray(b["splom"][key])), f"splom {key}"
+    assert int(a["map"]["Count"].sum()) == int(b["map"]["Count"].sum()), "map cells"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["MANGROVE_CACHE_DIR"] = os.path.join(tmp, "cache")
+        os.environ.pop("MANGROVE_OFFLINE", None)
+        sys.path.insert(0, ROOT)
+        from bench_ingest import make_csv
+        from mangrove import backends, loader
+        from mangrove.filters import FilterIndex
+
+        print(f"{'rows':>8} {'backend':>8} {'load s':>7} {'first s':>8} {'unfiltered s':>13} {'filtered s':>11}")
+        for rows in args.rows:
+            csv = os.path.join(tmp, f"mangrove-{rows}.csv")
+            make_csv(csv, rows)
+            results = {}
+            for name in ("pandas", "duckdb"):
+                loader.invalidate()
+                start = time.perf_counter()
+                if name == "pandas":
+                    df, _ = loader.load_versioned(csv, ttl=0)
+                    backend = backends.PandasBackend(df, loader.derived("filter_index", FilterIndex, csv, frame=df),
+                                                     source=csv)
+                else:
+                    backend = backends.duckdb_backend(csv, ttl=0)
+                loadSeconds = time.perf_counter() - start
+                regions, species = backend.values("Region")[:1], backend.values("Mangrove_Species")[:2]
+                start = time.perf_counter()
+                queries(backend, [], []) #builds the pandas stores on first use
+                firstSeconds = time.perf_counter() - start
+                timings = []
+                for picks in (([], []), (regions, species)):
+                    best = None
+                    for _ in range(args.runs):
+                        start = time.perf_counter()
+                        result = queries(backend, *picks)
+                        seconds = time.perf_counter() - start
+                        best = seconds if best is None else min(best, seconds)
+                    timings.append(best)
+                    results.setdefault(picks == ([], []), []).append(result)
+                print(f"{rows:>8} {name:>8} {loadSeconds:>7.2f} {firstSeconds:>8.2f} {timings[0]:>13.3f} {timings[1]:>11.3f}")
+            for pandasResult, duckdbResult in results.values():
+                compare(pandasResult, duckdbResult)
+        print("both backends give the same chart data")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#cold start of the csv path against the memory-mapped columnar cache and the .npz browser bundle, each run in a
+#fresh interpreter. the bundle row is what the stlite build parses instead of the csv (see mangrove/bundle.py)
+#python benchmarks/bench_coldstart.py --csv synthetic_mangrove_dataset.csv --runs 5
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#runs inside the child process, prints one json line
+CHILD = r"""
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+import pandas as pd
+from mangrove import columnar
+from mangrove.regions import assign_regions
+if {mode!r} == "columnar":
+    import pyarrow
+before = rss_mb()
+start = time.perf_counter()
+if {mode!r} == "csv":
+    df = pd.read_csv({csv!r}, encoding="ISO-8859-1")
+    df['Date'] = pd.to_datetime(df['Date'])
+    df["Region"] = assign_regions(df["Latitude"], df["Longitude"])
+elif {mode!r} == "bundle":
+    from mangrove.bundle import read_bundle
+    with open({bundle!r}, "rb") as f:
+        df = read_bundle(f.read())
+else:
+    df = columnar.read_columnar({csv!r})
+    df["Temperature"].sum() #touch a column so the mapped pages are really read
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss_mb() - before, "frame_mb": df.memory_usage(deep=True).sum() / 2**20}}))
+"""
+
+def run(mode, csv, bundle):
+    code = CHILD.format(root=ROOT, mode=mode, csv=csv, bundle=bundle)
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=os.path.join(ROOT, "synthetic_mangrove_dataset.csv"))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    csv = os.path.abspath(args.csv)
+
+    sys.path.insert(0, ROOT)
+    import tempfile
+    from mangrove import bundle, loader, columnar
+    os.environ["MANGROVE_DATA"] = csv
+    os.environ.pop("MANGROVE_OFFLINE", None)
+    loader.load_data(csv) #makes sure the columnar cache exists for this csv version
+    bundlePath = os.path.join(tempfile.mkdtemp(), "mangrove_data.npz")
+    with open(csv, "rb") as f:
+        content = f.read()
+    bundle.write_bundle(loader.parse_csv(content), loader.content_hash(content), bundlePath)
+    print(f"csv {os.path.getsize(csv) / 2**20:.1f} MB, cache {os.path.getsize(columnar.cache_path(csv)) / 2**20:.1f} MB, "
+          f"bundle {os.path.getsize(bundlePath) / 2**20:.1f} MB")
+
+    print(f"{'path':>10} {'load s (median)':>16} {'rss delta MB':>13} {'frame MB':>9}")
+    for mode in ("csv", "columnar", "bundle"):
+        results = sorted((run(mode, csv, bundlePath) for _ in range(args.runs)), key=lambda r: r["seconds"])
+        mid = results[len(results) // 2]
+        print(f"{mode:>10} {mid['seconds']:>16.4f} {mid['rss_mb']:>13.1f} {mid['frame_mb']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#peak memory and time of the one-shot csv parse against the chunked streaming ingest, each run in a fresh
+#interpreter. the streaming run then reads what a scatter chart needs from the parquet partitions, unfiltered
+#and for one region ("rows s"), its peak includes those reads. the input is synthetic_mangrove_dataset.csv
+#repeated up to --rows
+#python benchmarks/bench_ingest.py --rows 1000000 --chunks 50000 200000
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#runs inside the child process, prints one json line. ru_maxrss is the peak resident size in KB on linux
+CHILD = r"""
+import json, os, resource, sys, time
+sys.path.insert(0, {root!r})
+os.environ["MANGROVE_CACHE_DIR"] = {cacheDir!r}
+from mangrove import ingest, loader
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+base = peak_mb()
+start = time.perf_counter()
+result = {{}}
+if {mode!r} == "parse":
+    with open({csv!r}, "rb") as f:
+        df = loader.parse_csv(f.read())
+    result["aggregates_s"] = None
+else:
+    run = ingest.StreamingIngest({csv!r}, chunkRows={chunkRows})
+    run.ingest_chunks()
+    result["first_chunk_s"] = run.firstChunkSeconds
+    result["aggregates_s"] = time.perf_counter() - start
+    result["aggregates_peak_mb"] = peak_mb() - base
+    run.finish()
+    rowsStart = time.perf_counter()
+    columns = ["Latitude", "Temperature", "Mangrove_Species"]
+    run.backend.rows([], [], columns)
+    run.backend.rows(run.backend.values("Region")[:1], [], columns)
+    result["rows_s"] = time.perf_counter() - rowsStart
+result["total_s"] = time.perf_counter() - start
+result["peak_mb"] = peak_mb() - base
+print(json.dumps(result))
+"""
+
+def make_csv(path, rows):
+    import pandas as pd
+    base = pd.read_csv(os.path.join(ROOT, "synthetic_mangrove_dataset.csv"), encoding="ISO-8859-1")
+    with open(path, "w", encoding="ISO-8859-1", newline="") as f:
+        written = 0
+        while written < rows:
+            part = base.iloc[:rows - written]
+            part.to_csv(f, index=False, header=written == 0)
+            written += len(part)
+
+def run(mode, csv, cacheDir, chunkRows=0):
+    code = CHILD.format(root=ROOT, mode=mode, csv=csv, cacheDir=cacheDir, chunkRows=chunkRows)
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[50000, 200000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv = os.path.join(tmp, "mangrove.csv")
+        make_csv(csv, args.rows)
+        print(f"{args.rows} rows, csv {os.path.getsize(csv) / 2**20:.0f} MB")
+        print(f"{'path':>16} {'first chunk s':>14} {'aggregates s':>13} {'peak MB then':>13} {'rows s':>7} {'total s':>8} {'peak MB':>8}")
+        result = run("parse", csv, os.path.join(tmp, "cache"))
+        print(f"{'one-shot parse':>16} {'':>14} {'':>13} {'':>13} {'':>7} {result['total_s']:>8.2f} {result['peak_mb']:>8.0f}")
+        for chunkRows in args.chunks:
+            result = run("stream", csv, os.path.join(tmp, f"cache-{chunkRows}"), chunkRows)
+            print(f"{f'stream {chunkRows}':>16} {result['first_chunk_s']:>14.2f} {result['aggregates_s']:>13.2f} "
+                  f"{result['aggregates_peak_mb']:>13.0f} {result['rows_s']:>7.2f} {result['total_s']:>8.2f} {result['peak_mb']:>8.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#figure json sent to the browser per scatter chart: svg traces with json number lists (before) against
+#scattergl with float32 typed arrays (after). --html writes a page that times first paint of both in a browser
+#python benchmarks/bench_payload.py --rows 10000 100000 --html payload.html
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import pandas as pd
+
+from mangrove import payload
+from mangrove.backends import PandasBackend
+from mangrove.charts import CHARTS, ChartContext, style
+from mangrove.filters import FilterIndex
+from mangrove.loader import load_data
+from mangrove.splom import SPLOM_COLUMNS
+
+SCATTER_CHARTS = ["latitude_temperature", "humidity_temperature", "latitude_sunlight", "soil_moisture_precipitation",
+                  "tidal_precipitation", "soil_moisture_water_depth", "soil_matrix"]
+OPTIONS = {"soil_matrix": {"dimensions": tuple(SPLOM_COLUMNS)}}
+PLOTLY_JS = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+
+#first paint is the time from Plotly.newPlot until the frame after the plot promise resolves
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><script src="{plotly}"></script></head>
+<body><pre id="out">rendering...</pre><div id="plot" style="width:900px;height:600px"></div>
+<script>
+const payloads = {payloads};
+async function run() {{
+    const rows = [];
+    for (const p of payloads) {{
+        const start = performance.now();
+        const fig = JSON.parse(p.json);
+        await Plotly.newPlot("plot", fig.data, fig.layout);
+        await new Promise(r => requestAnimationFrame(() => r()));
+        rows.push(`${{p.name}} ${{p.mode}} ${{p.rows}} rows: ${{(performance.now() - start).toFixed(1)}} ms`);
+        Plotly.purge("plot");
+    }}
+    document.getElementById("out").textContent = rows.join("\\n");
+}}
+run();
+</script></body></html>
+"""
+
+def scaled(df, rows):
+    if rows <= len(df):
+        return df.iloc[:rows].reset_index(drop=True)
+    return pd.concat([df] * -(-rows // len(df)), ignore_index=True).iloc[:rows]
+
+def build(chart, ctx, webglRows, binary):
+    payload.WEBGL_ROWS = webglRows
+    start = time.perf_counter()
+    result = chart.build(ctx, **OPTIONS.get(chart.name, {}))
+    fig = result[0] if isinstance(result, tuple) else result
+    figJson = payload.figure_json(style(fig, chart.title), binary=binary)
+    return figJson, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=os.path.join(ROOT, "synthetic_mangrove_dataset.csv"))
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--html", help="write a first paint page for both payloads here")
+    args = parser.parse_args()
+
+    base = load_data(args.csv)
+    webglRows = payload.WEBGL_ROWS
+    pages = []
+    print(f"{'chart':>28} {'rows':>8} {'before KB':>10} {'gzip':>8} {'after KB':>9} {'gzip':>8} {'ratio':>6} {'build s before/after':>21}")
+    for rows in args.rows:
+        df = scaled(base, rows)
+        ctx = ChartContext(PandasBackend(df, FilterIndex(df)), [], [], ("bench", rows))
+        for name in SCATTER_CHARTS:
+            chart = CHARTS[name]
+            before, beforeTime = build(chart, ctx, float("inf"), False)
+            after, afterTime = build(chart, ctx, webglRows, True)
+            sizes = [len(before), len(gzip.compress(before.encode())), len(after), len(gzip.compress(after.encode()))]
+            print(f"{name:>28} {rows:>8} {sizes[0] / 1024:>10.0f} {sizes[1] / 1024:>8.0f} {sizes[2] / 1024:>9.0f} "
+                  f"{sizes[3] / 1024:>8.0f} {sizes[0] / sizes[2]:>6.1f} {beforeTime:>10.3f}/{afterTime:.3f}")
+            pages += [{"name": name, "rows": rows, "mode": "svg+json", "json": before},
+                      {"name": name, "rows": rows, "mode": "gl+binary", "json": after}]
+    payload.WEBGL_ROWS = webglRows
+
+    if args.html:
+        with open(args.html, "w") as f:
+            f.write(PAGE.format(plotly=PLOTLY_JS, payloads=json.dumps(pages)))
+        print(f"open {args.html} in a browser for first paint per chart")
+
+if __name__ == "__main__":
+    main()
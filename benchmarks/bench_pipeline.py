@@ -0,0 +1,132 @@
+#end-to-end cost of the real dashboard script without a browser or the network: main.py (or --script) is run by
+#streamlit's AppTest on generated data of growing size (see mangrove/synthetic.py), first unfiltered through every
+#section, then with one region and one species picked, and the stage timings the script itself records (fetch,
+#parse, region, derive, filter, then build, serialize and render per chart, see mangrove/perf.py) are summed.
+#the figure cache, snapshots and the build pool are off so every rerun builds its section one chart at a time.
+#each size runs in a fresh interpreter with an empty cache dir for its peak memory, and is appended to --history
+#(benchmarks/pipeline_history.jsonl, not tracked) so runs can be compared from commit to commit
+#python benchmarks/bench_pipeline.py --rows 100000 1000000 10000000
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+from bench_startup import git_commit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY = os.path.join(ROOT, "benchmarks", "pipeline_history.jsonl")
+SUMMARY_STAGES = ["fetch", "parse", "region", "write_columnar", "derive", "filter", "build", "serialize", "render"]
+
+#runs inside the child process, prints one json line. ru_maxrss is the peak resident size in KB on linux
+CHILD = r"""
+import json, resource, sys
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+from mangrove import perf
+from mangrove.charts import SECTIONS
+records, seconds = [], 0.0
+def widget(widgets, label):
+    return [w for w in widgets if w.label == label][0]
+def rerun(app, pick, section):
+    global seconds
+    app.run()
+    if app.exception:
+        raise SystemExit(f"{{pick}} {{section}}: {{[e.message for e in app.exception]}}")
+    run = perf.last_run()
+    seconds += run.seconds
+    records.extend(dict(record, pick=pick, section=section) for record in run.records)
+app = AppTest.from_file({script!r}, default_timeout=1200)
+rerun(app, "all", SECTIONS[0])
+for section in SECTIONS[1:]:
+    widget(app.radio, "Charts").set_value(section)
+    rerun(app, "all", section)
+region, species = widget(app.multiselect, "Pick your region"), widget(app.multiselect, "Pick your mangrove species")
+region.set_value(region.options[:1])
+species.set_value(species.options[:1])
+for section in SECTIONS:
+    widget(app.radio, "Charts").set_value(section)
+    rerun(app, "filtered", section)
+rows = max([record["rows"] or 0 for record in records if record["stage"] == "parse"] or [0])
+print(json.dumps({{"rows": rows, "seconds": seconds, "peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                  "records": records}}, default=str))
+"""
+
+def data_file(dataDir, rows, seed):
+    path = os.path.join(dataDir, f"mangrove_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        sys.path.insert(0, ROOT)
+        from mangrove import synthetic
+        print(f"generating {rows} rows into {path}")
+        synthetic.write_csv(path + ".tmp", synthetic.fit_model(synthetic.read_source()), rows, seed)
+        os.replace(path + ".tmp", path)
+    return path
+
+def run(script, csv):
+    code = CHILD.format(root=ROOT, script=os.path.join(ROOT, script))
+    with tempfile.TemporaryDirectory() as cacheDir:
+        env = dict(os.environ, MANGROVE_DATA=csv, MANGROVE_CACHE_DIR=cacheDir, MANGROVE_FIGURE_CACHE_MB="0",
+                   MANGROVE_SNAPSHOTS="0", MANGROVE_BUILD_WORKERS="1")
+        for name in ("MANGROVE_OFFLINE", "MANGROVE_STREAM", "MANGROVE_TAIL", "MANGROVE_BACKEND"):
+            env.pop(name, None)
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise SystemExit(f"pipeline run on {csv} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def summary(result):
+    stages = {stage: 0.0 for stage in SUMMARY_STAGES}
+    charts = {}
+    for record in result["records"]:
+        if record["stage"] in stages:
+            stages[record["stage"]] += record["seconds"]
+        if record["stage"] in ("build", "serialize") and record.get("pick") == "all":
+            chart = charts.setdefault(record["name"], {})
+            chart[record["stage"]] = record["seconds"]
+            if record["bytes"] is not None:
+                chart["bytes"] = record["bytes"]
+    return stages, charts
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--script", default="main.py")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "mangrove_bench"),
+                        help="generated csvs are kept here and reused by later runs")
+    parser.add_argument("--history", default=HISTORY, help="jsonl file the results are appended to, '' to skip")
+    args = parser.parse_args()
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    print(f"{'rows':>10} {'peak MB':>8} " + " ".join(f"{stage:>9}" for stage in SUMMARY_STAGES) + f" {'total s':>8}")
+    results = []
+    for rows in args.rows:
+        result = run(args.script, data_file(args.data_dir, rows, args.seed))
+        stages, charts = summary(result)
+        results.append((rows, charts))
+        print(f"{rows:>10} {result['peak_mb']:>8.0f} " + " ".join(f"{stages[stage]:>9.3f}" for stage in SUMMARY_STAGES) +
+              f" {result['seconds']:>8.2f}")
+        if args.history:
+            record = {"date": datetime.datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+                      "python": platform.python_version(), "script": args.script, "rows": rows, "seed": args.seed,
+                      "peak_mb": round(result["peak_mb"], 1),
+                      "seconds": round(result["seconds"], 3), "stages": {k: round(v, 4) for k, v in stages.items()},
+                      "charts": charts, "records": result["records"]}
+            with open(args.history, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+    print("\nunfiltered charts, build + serialize seconds (json KB)")
+    print(f"{'chart':>28} " + " ".join(f"{rows:>18}" for rows, _ in results))
+    for name in results[0][1]:
+        cells = []
+        for _, charts in results:
+            chart = charts.get(name, {})
+            seconds = chart.get("build", 0.0) + chart.get("serialize", 0.0)
+            cells.append(f"{seconds:>9.3f} ({chart.get('bytes', 0) / 1024:>5.0f})")
+        print(f"{name:>28} " + " ".join(f"{cell:>18}" for cell in cells))
+
+if __name__ == "__main__":
+    main()
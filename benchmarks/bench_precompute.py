@@ -0,0 +1,53 @@
+#scaling of the aggregate precompute over worker processes, on synthetic_mangrove_dataset.csv repeated up to --rows
+#python benchmarks/bench_precompute.py --rows 2000000 --workers 1 2 4 8
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--task-rows", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["MANGROVE_CACHE_DIR"] = os.path.join(tmp, "cache")
+        os.environ.pop("MANGROVE_OFFLINE", None)
+        sys.path.insert(0, ROOT)
+        from bench_ingest import make_csv
+        import numpy as np
+        from mangrove import loader
+        from mangrove.precompute import make_tasks, precompute
+
+        csv = os.path.join(tmp, "mangrove.csv")
+        make_csv(csv, args.rows)
+        df, _ = loader.load_versioned(csv)
+        print(f"{args.rows} rows, {len(make_tasks(df, args.task_rows))} tasks of up to {args.task_rows} rows, "
+              f"{os.cpu_count()} cpus")
+
+        print(f"{'workers':>8} {'seconds (best)':>15} {'speedup':>8} {'rows/s':>12}")
+        results = {}
+        for workers in [0] + args.workers:
+            best = None
+            for _ in range(args.runs):
+                _, stores, seconds = precompute(csv, workers, args.task_rows, save=False)
+                best = seconds if best is None else min(best, seconds)
+            results[workers] = (best, stores)
+            base = results[args.workers[0]][0] if args.workers[0] in results else best
+            label = "serial" if workers == 0 else str(workers)
+            print(f"{label:>8} {best:>15.3f} {base / best:>8.2f} {args.rows / best:>12.0f}")
+
+        #the pool only changes where partials are summarized, never what they are
+        reference = results[0][1]["correlation"].corr().to_numpy()
+        for workers, (_, stores) in results.items():
+            difference = np.nanmax(np.abs(stores["correlation"].corr().to_numpy() - reference))
+            assert difference < 1e-9, f"{workers} workers: correlation differs by {difference}"
+        print("all worker counts give the same correlation matrix")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#compares the row-wise get_region apply with the vectorized assign_regions
+#python benchmarks/bench_regions.py --sizes 10000 1000000 10000000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mangrove.regions import assign_regions, get_region, regions
+
+#random points over the area covered by all regions, a share of them snapped onto region edges
+#so inclusive bounds and overlapping edges are exercised
+def make_points(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(16.0, 30.0, rows)
+    lon = rng.uniform(34.0, 49.0, rows)
+    latEdges = np.unique([v for region in regions for v in region["latitude"]])
+    lonEdges = np.unique([v for region in regions for v in region["longitude"]])
+    snap = rng.random(rows) < 0.05
+    lat[snap] = rng.choice(latEdges, snap.sum())
+    snap = rng.random(rows) < 0.05
+    lon[snap] = rng.choice(lonEdges, snap.sum())
+    return pd.DataFrame({"Latitude": lat, "Longitude": lon})
+
+def time_call(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--max-apply-rows", type=int, default=None,
+                        help="skip the apply baseline above this many rows (it takes minutes at 10M)")
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'apply s':>10} {'vectorized s':>13} {'speedup':>9}")
+    for rows in args.sizes:
+        df = make_points(rows)
+        vecTime, vec = time_call(lambda: assign_regions(df["Latitude"], df["Longitude"]))
+        if args.max_apply_rows is not None and rows > args.max_apply_rows:
+            print(f"{rows:>12} {'skipped':>10} {vecTime:>13.4f} {'-':>9}")
+            continue
+        applyTime, ref = time_call(lambda: df.apply(lambda row: get_region(row["Latitude"], row["Longitude"]), axis=1))
+        if not (np.asarray(vec, dtype=object) == ref.to_numpy()).all():
+            raise SystemExit(f"assign_regions disagrees with get_region at {rows} rows")
+        print(f"{rows:>12} {applyTime:>10.3f} {vecTime:>13.4f} {applyTime / vecTime:>8.0f}x")
+
+if __name__ == "__main__":
+    main()
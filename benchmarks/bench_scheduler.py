@@ -0,0 +1,86 @@
+#wall-clock seconds per rerun of each section with the figures built one after the other (MANGROVE_BUILD_WORKERS=1)
+#against the build pool (see render_section in mangrove/charts.py). every worker count runs streamlit's AppTest
+#in a fresh interpreter on generated data (see mangrove/synthetic.py) with the figure cache and snapshots off, so
+#every rerun builds every figure. the gain needs a multi-core host, plotly and json serialization hold the GIL
+#for part of each build and MANGROVE_PROCESS_WORKERS moves the row-heavy scatters to processes
+#python benchmarks/bench_scheduler.py --rows 1000000 --workers 1 2 4 --process-workers 0 2
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from bench_pipeline import data_file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#runs inside the child process, prints one json line
+CHILD = r"""
+import json, sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+from mangrove.charts import SECTIONS
+app = AppTest.from_file({script!r}, default_timeout=600).run()
+times = {{}}
+for section in SECTIONS:
+    [radio for radio in app.radio if radio.label == "Charts"][0].set_value(section).run()
+    times[section] = []
+    for _ in range({runs}):
+        start = time.perf_counter()
+        app.run()
+        times[section].append(time.perf_counter() - start)
+print(json.dumps({{"times": times, "exceptions": [e.message for e in app.exception], "warnings": len(app.warning)}}))
+"""
+
+def run(script, csv, workers, processWorkers, processRows, runs):
+    env = dict(os.environ, MANGROVE_DATA=csv, MANGROVE_FIGURE_CACHE_MB="0", MANGROVE_SNAPSHOTS="0",
+               MANGROVE_BUILD_WORKERS=str(workers), MANGROVE_PROCESS_WORKERS=str(processWorkers),
+               MANGROVE_PROCESS_ROWS=str(processRows))
+    env.pop("MANGROVE_OFFLINE", None)
+    code = CHILD.format(root=ROOT, script=os.path.join(ROOT, script), runs=runs)
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise SystemExit(f"{script} with {workers} workers failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--script", default="main.py")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--process-workers", type=int, nargs="+", default=[0])
+    parser.add_argument("--process-rows", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=3, help="reruns per section, the median is shown")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "mangrove_bench"))
+    args = parser.parse_args()
+    os.makedirs(args.data_dir, exist_ok=True)
+    csv = data_file(args.data_dir, args.rows, args.seed)
+
+    print(f"{args.script} on {args.rows} rows, {os.cpu_count()} cpus, median seconds per rerun")
+    results = {}
+    for processWorkers in args.process_workers:
+        for workers in args.workers:
+            if workers == 1 and processWorkers: #processes are only used from the build pool
+                continue
+            result = run(args.script, csv, workers, processWorkers, args.process_rows, args.runs)
+            if result["exceptions"] or result["warnings"]:
+                print(f"  {workers} workers: exceptions {result['exceptions']}, {result['warnings']} timed out")
+            results[f"{workers}t" + (f"+{processWorkers}p" if processWorkers else "")] = \
+                {section: statistics.median(times) for section, times in result["times"].items()}
+
+    baseline = results.get("1t")
+    print(f"{'section':>14} " + " ".join(f"{name:>14}" for name in results))
+    for section in next(iter(results.values())):
+        cells = []
+        for times in results.values():
+            cell = f"{times[section]:.3f}"
+            if baseline:
+                cell += f" ({baseline[section] / times[section]:.1f}x)"
+            cells.append(cell)
+        print(f"{section:>14} " + " ".join(f"{cell:>14}" for cell in cells))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#viewport, box, radius and polygon queries through the lat/lon grid index against a full scan of the columns,
+#and region assignment with many region boxes. points are spread over the area covered by all regions
+#python benchmarks/bench_spatial.py --rows 1000000 10000000 --regions 5 300
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mangrove.mapbins import viewport
+from mangrove.regions import assign_regions, get_region
+from mangrove.spatial import GridIndex, area_mask
+
+AREAS = [("viewport", ("box", viewport((20.25, 43.0), 9))),
+         ("box", ("box", (24.5, 27.0, 34.5, 37.5))),
+         ("radius", ("radius", (25.75, 36.0, 50.0))),
+         ("polygon", ("polygon", ((20.0, 40.0), (22.0, 41.0), (21.0, 43.5), (19.5, 42.0))))]
+
+def time_call(fn, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+#random boxes inside the area of the real regions, names repeat so the categories stay few
+def make_regions(count, seed=0):
+    rng = np.random.default_rng(seed)
+    result = []
+    for i in range(count):
+        lat, lon = rng.uniform(16.0, 29.0), rng.uniform(34.0, 48.0)
+        result.append({"name": f"region{i % 50}", "latitude": (lat, lat + rng.uniform(0.1, 1.5)),
+                       "longitude": (lon, lon + rng.uniform(0.1, 1.5))})
+    return result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--regions", type=int, nargs="+", default=[5, 300])
+    args = parser.parse_args()
+    print(f"{'rows':>10} {'query':>9} {'hits':>8} {'index s':>9} {'scan s':>8} {'speedup':>8}")
+    for rows in args.rows:
+        rng = np.random.default_rng(rows)
+        lat, lon = rng.uniform(16.0, 30.0, rows), rng.uniform(34.0, 49.0, rows)
+        buildTime, index = time_call(lambda: GridIndex(lat, lon), repeat=1)
+        print(f"{rows:>10} {'build':>9} {'':>8} {buildTime:>9.4f}")
+        for label, area in AREAS:
+            indexTime, hits = time_call(lambda: index.query(area))
+            scanTime, scanned = time_call(lambda: np.flatnonzero(area_mask(lat, lon, area)))
+            if not np.array_equal(hits, scanned):
+                raise SystemExit(f"grid index disagrees with the scan for {label} at {rows} rows")
+            print(f"{rows:>10} {label:>9} {len(hits):>8} {indexTime:>9.4f} {scanTime:>8.4f} {scanTime / indexTime:>7.0f}x")
+    print(f"\n{'regions':>10} {'rows':>10} {'assign s':>9}")
+    rng = np.random.default_rng(0)
+    lat, lon = rng.uniform(16.0, 30.0, max(args.rows)), rng.uniform(34.0, 49.0, max(args.rows))
+    for count in args.regions:
+        regionList = make_regions(count)
+        seconds, assigned = time_call(lambda: assign_regions(lat, lon, regionList), repeat=1)
+        check = [get_region(a, b, regionList) for a, b in zip(lat[:2000], lon[:2000])]
+        if not (np.asarray(assigned[:2000], dtype=object) == np.array(check, dtype=object)).all():
+            raise SystemExit(f"assign_regions disagrees with get_region for {count} regions")
+        print(f"{count:>10} {len(lat):>10} {seconds:>9.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#startup cost of the streamlit entry points, each run in a fresh interpreter:
+#  imports: python -X importtime over the script's top-level imports, the slowest packages and the heavy ones loaded
+#  first run: streamlit's AppTest running the whole script once on the bundled csv (imports, data load, first section)
+#every run is appended to --history (benchmarks/startup_history.jsonl, not tracked, so a run never dirties the tree it
+#records) so the numbers can be followed from commit to commit.
+#the stlite (browser) counterpart is benchmarks/stlite_startup.html
+#python benchmarks/bench_startup.py --scripts main.py mangroveMain.py --runs 5
+import argparse
+import ast
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY = os.path.join(ROOT, "benchmarks", "startup_history.jsonl")
+HEAVY = ["matplotlib", "seaborn", "scipy", "statsmodels", "plotly.express", "plotly.figure_factory", "duckdb", "pyarrow"]
+
+#runs inside the child process, prints one json line
+FIRST_RUN = r"""
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+os.environ["MANGROVE_OFFLINE"] = "1"
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({script!r}, default_timeout=300).run()
+print(json.dumps({{"seconds": time.perf_counter() - start, "exceptions": [e.message for e in app.exception],
+                   "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+def script_imports(path):
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+#(total ms, {top level module: cumulative ms}, modules imported) from -X importtime output
+def parse_importtime(stderr):
+    topLevel, modules = {}, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        if not name.startswith("  "):
+            topLevel[name.strip()] = int(cumulative) / 1000
+    return sum(topLevel.values()), topLevel, modules
+
+def measure_imports(script):
+    code = script_imports(os.path.join(ROOT, script))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, check=True,
+                            capture_output=True, text=True)
+    return parse_importtime(result.stderr)
+
+def measure_first_run(script):
+    code = FIRST_RUN.format(root=ROOT, script=os.path.join(ROOT, script), heavy=HEAVY)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+#short hash of HEAD, "+dirty" when tracked files have uncommitted changes
+def git_commit():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, check=True,
+                               capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + "+dirty" if dirty else commit
+
+def previous(history, script):
+    if not os.path.exists(history):
+        return None
+    with open(history, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records = [record for record in records if record["script"] == script and record["python"] == platform.python_version()]
+    return records[-1] if records else None
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scripts", nargs="+", default=["main.py", "mangroveMain.py"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8)
+    parser.add_argument("--history", default=HISTORY, help="jsonl file the results are appended to, '' to skip")
+    args = parser.parse_args()
+
+    for script in args.scripts:
+        imports = [measure_imports(script) for _ in range(args.runs)]
+        importMs = statistics.median(total for total, _, _ in imports)
+        _, topLevel, modules = imports[-1]
+        heavy = [name for name in HEAVY if name in modules]
+        firstRuns = [measure_first_run(script) for _ in range(args.runs)]
+        firstRunS = statistics.median(run["seconds"] for run in firstRuns)
+        record = {"date": datetime.datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+                  "python": platform.python_version(), "script": script, "runs": args.runs,
+                  "import_ms": round(importMs, 1), "first_run_s": round(firstRunS, 3),
+                  "heavy_at_import": heavy, "heavy_after_first_run": firstRuns[-1]["heavy"]}
+        before = previous(args.history, script) if args.history else None
+
+        print(f"{script}: imports {importMs:.0f} ms, first run {firstRunS:.2f} s (median of {args.runs})")
+        if before is not None:
+            print(f"  last recorded ({before['commit']}, {before['date']}): imports {before['import_ms']:.0f} ms, "
+                  f"first run {before['first_run_s']:.2f} s")
+        print(f"  heavy packages at import: {', '.join(heavy) or 'none'}; after the first run: "
+              f"{', '.join(record['heavy_after_first_run']) or 'none'}")
+        for name, ms in sorted(topLevel.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"  {ms:>8.1f} ms  {name}")
+        if firstRuns[-1]["exceptions"]:
+            print(f"  the script raised: {firstRuns[-1]['exceptions']}")
+        if args.history:
+            with open(args.history, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#cost of picking up rows appended to a csv in tail mode (MANGROVE_TAIL=1) against reloading the whole file,
+#for growing history sizes, and a check that the tailed frame and stores match a full reload.
+#the input is synthetic_mangrove_dataset.csv repeated up to --rows, --append rows are then added to its end
+#--appends times. "append s" is the median of picking them up with the filter and grid index (after the first
+#append, which moves the frame into the growable buffer), it should stay flat as the history grows.
+#"tail s"/"reload s" include answering every chart query on the result
+#python benchmarks/bench_tail.py --rows 100000 1000000 --append 1000 --appends 5
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def append_csv(path, rows):
+    import pandas as pd
+    base = pd.read_csv(os.path.join(ROOT, "synthetic_mangrove_dataset.csv"), encoding="ISO-8859-1")
+    with open(path, "a", encoding="ISO-8859-1", newline="") as f:
+        base.sample(rows, replace=True, random_state=rows).to_csv(f, index=False, header=False)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--append", type=int, default=1000)
+    parser.add_argument("--appends", type=int, default=5)
+    args = parser.parse_args()
+    tmp = tempfile.mkdtemp()
+    os.environ["MANGROVE_CACHE_DIR"] = os.path.join(tmp, "cache")
+    sys.path.insert(0, ROOT)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import pandas as pd
+    from bench_backends import compare, queries
+    from bench_ingest import make_csv
+    from mangrove import backends, loader
+    from mangrove.aggregates import STORES
+    from mangrove.filters import FilterIndex
+    from mangrove.spatial import GridIndex
+    loader.TAIL = True
+
+    def backend_for(csv, df):
+        return backends.PandasBackend(df, loader.derived("filter_index", FilterIndex, csv, frame=df), source=csv)
+
+    def pick_up(csv):
+        df, _ = loader.load_versioned(csv, ttl=0)
+        loader.derived("spatial_index", GridIndex.from_frame, csv, frame=df)
+        return df, backend_for(csv, df)
+
+    print(f"{'rows':>9} {'append':>7} {'append s':>9} {'tail s':>8} {'reload s':>9} {'speedup':>8}")
+    for rows in args.rows:
+        csv = os.path.join(tmp, f"mangrove_{rows}.csv")
+        make_csv(csv, rows)
+        df, backend = pick_up(csv)
+        for name, storeClass in STORES.items():
+            backend.store(name, storeClass)
+        appendSeconds = []
+        for _ in range(args.appends):
+            time.sleep(0.01) #new mtime
+            append_csv(csv, args.append)
+            start = time.perf_counter()
+            df, backend = pick_up(csv)
+            appendSeconds.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        tailed = queries(backend, [], [])
+        tailSeconds = appendSeconds[-1] + time.perf_counter() - start
+        assert len(df) == rows + args.append * args.appends, len(df)
+        loader.invalidate(csv)
+        start = time.perf_counter()
+        full, _ = loader.load_versioned(csv, ttl=0)
+        reloaded = queries(backend_for(csv, full), [], [])
+        reloadSeconds = time.perf_counter() - start
+        pd.testing.assert_frame_equal(df, full, check_categorical=False)
+        compare(tailed, reloaded)
+        appendMedian = sorted(appendSeconds[1:] or appendSeconds)[len(appendSeconds[1:] or appendSeconds) // 2]
+        print(f"{rows:>9} {args.append:>7} {appendMedian:>9.4f} {tailSeconds:>8.3f} {reloadSeconds:>9.3f} {reloadSeconds / tailSeconds:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#checks the built-in ols trendlines against statsmodels and times both for every sidebar selection
+#python benchmarks/bench_trendline.py [--csv data.csv]
+import argparse
+import itertools
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from mangrove.filters import FilterIndex
+from mangrove.loader import load_data
+from mangrove.trendline import TrendlineStore
+
+def subsets(values):
+    return [list(c) for size in range(len(values) + 1) for c in itertools.combinations(values, size)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=os.path.join(ROOT, "synthetic_mangrove_dataset.csv"))
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    args = parser.parse_args()
+    import statsmodels.api as sm
+
+    df = load_data(args.csv)
+    start = time.perf_counter()
+    store = TrendlineStore.from_frame(df)
+    buildTime = time.perf_counter() - start
+    filterIndex = FilterIndex(df)
+    regions = filterIndex.values("Region")
+    species = filterIndex.values("Mangrove_Species")
+
+    storeTime = statsTime = 0.0
+    worst = 0.0
+    checked = 0
+    for regionPick, speciesPick in itertools.product(subsets(regions), subsets(species)):
+        start = time.perf_counter()
+        fits = store.fits(regionPick, speciesPick)
+        storeTime += time.perf_counter() - start
+
+        start = time.perf_counter()
+        rows = filterIndex.view(df, {"Region": regionPick, "Mangrove_Species": speciesPick})
+        for name, group in rows.groupby("Mangrove_Species", observed=True):
+            x = group["Humidity"].to_numpy(dtype="float64")
+            y = group["Temperature"].to_numpy(dtype="float64")
+            if len(x) < 2:
+                continue
+            model = sm.OLS(y, sm.add_constant(x)).fit()
+            fit = fits[name]
+            for ours, theirs in ((fit["intercept"], model.params[0]), (fit["slope"], model.params[1]), (fit["r2"], model.rsquared)):
+                error = abs(ours - theirs) / max(1.0, abs(theirs))
+                worst = max(worst, error)
+                if error > args.tolerance:
+                    raise SystemExit(f"{regionPick} {speciesPick} {name}: {ours} != statsmodels {theirs}")
+            checked += 1
+        statsTime += time.perf_counter() - start
+
+    print(f"{checked} fits agree with statsmodels (worst relative error {worst:.2e})")
+    print(f"store build {buildTime:.4f}s, all selections: store {storeTime:.4f}s vs filter + statsmodels {statsTime:.4f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+#shared data and chart helpers for main.py and mangroveMain.py
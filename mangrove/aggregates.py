@@ -0,0 +1,54 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+from mangrove import columnar
+from mangrove.boxstats import BoxStore
+from mangrove.corrstats import CorrelationStore
+from mangrove.density import DensityStore
+from mangrove.mapbins import MapBinStore
+from mangrove.splom import SplomStore
+from mangrove.timeseries import TimeSeriesStore
+from mangrove.trendline import TrendlineStore
+
+#the aggregate stores the charts ask for by name (see ChartContext.store)
+STORES = {"time_series": TimeSeriesStore, "correlation": CorrelationStore, "density": DensityStore,
+          "box": BoxStore, "trendline": TrendlineStore, "splom": SplomStore, "map_bins": MapBinStore}
+AGGREGATE_KEEP = 3 #source versions kept on disk per source
+
+#finished stores for one source version, one pickle per version next to the columnar cache.
+#the loader picks them up when it loads that version, so no store is built on the page.
+def aggregate_dir(source):
+    name = hashlib.sha1(str(source).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(columnar.CACHE_DIR, f"{name}.aggregates")
+
+def aggregate_path(source, version):
+    name = hashlib.sha1(version.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(aggregate_dir(source), f"{name}.pkl")
+
+def save_aggregates(source, version, stores):
+    directory = aggregate_dir(source)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmpPath = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({"version": version, "stores": stores}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpPath, aggregate_path(source, version))
+    except BaseException:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+        raise
+    files = sorted((os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".pkl")),
+                   key=os.path.getmtime, reverse=True)
+    for path in files[AGGREGATE_KEEP:]:
+        os.remove(path)
+
+#stores precomputed for exactly this version, None when there are none (or they cannot be read)
+def load_aggregates(source, version):
+    try:
+        with open(aggregate_path(source, version), "rb") as f:
+            saved = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    return saved["stores"] if saved.get("version") == version else None
@@ -0,0 +1,557 @@
+import hashlib
+import importlib.util
+import operator
+import os
+import tempfile
+import threading
+import time
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from mangrove import columnar, loader, perf, schema
+from mangrove.boxstats import TAIL_SIZE
+from mangrove.density import DENSITY_COLUMNS, DensityStore
+from mangrove.filters import FilterIndex
+from mangrove.mapbins import MapBinStore, cell_size
+from mangrove.partitions import PARTITION_COLUMNS
+from mangrove.regions import UNKNOWN_REGION, regions
+from mangrove.spatial import GridIndex, area_box, area_mask
+from mangrove.splom import SOIL_COLUMNS, SplomStore
+from mangrove.timeseries import choose_bucket
+
+#where the charts get rows and aggregates from. "pandas" (default) filters the shared frame and builds the
+#per-partition stores, "duckdb" keeps the data in an on-disk duckdb database built once per source version
+#and pushes the sidebar filters and every chart aggregation down to sql, only result-sized frames come back
+BACKEND = os.environ.get("MANGROVE_BACKEND", "pandas").lower()
+TABLE = "mangrove"
+
+#raised when a chart needs rows while only aggregates exist (streaming ingest still running)
+class RowsPending(Exception):
+    pass
+
+class PandasBackend:
+    name = "pandas"
+
+    #df None means only the given stores are available yet
+    def __init__(self, df, filterIndex, stores=None, source=None):
+        self.df = df
+        self.filterIndex = filterIndex
+        self.stores = stores
+        self.source = source
+
+    def values(self, column):
+        return self.filterIndex.values(column)
+
+    #lat/lon grid over the shared frame, built on the first area query of a data version
+    def spatial(self):
+        if self.stores is not None and "spatial_index" in self.stores:
+            return self.stores["spatial_index"]
+        return loader.derived("spatial_index", GridIndex.from_frame, self.source, frame=self.df)
+
+    #the shared frame itself when unfiltered, columns are not projected since that would copy it.
+    #an area (see mangrove/spatial.py) is looked up in the grid and AND-ed with the sidebar bitmaps
+    def rows(self, regions=None, species=None, columns=None, area=None):
+        if self.df is None:
+            raise RowsPending()
+        with perf.timed("filter", self.name) as stage:
+            filters = {"Region": regions, "Mangrove_Species": species}
+            if area is None:
+                rows = self.filterIndex.view(self.df, filters)
+            else:
+                positions = self.spatial().query(area)
+                bitmap = self.filterIndex.select(filters)
+                if bitmap is not None:
+                    positions = positions[np.unpackbits(bitmap, count=self.filterIndex.rows)[positions].astype(bool)]
+                rows = self.df.take(positions)
+            stage["rows"] = len(rows)
+        return rows
+
+    def count(self, regions=None, species=None, area=None):
+        if self.df is None:
+            raise RowsPending()
+        bitmap = self.filterIndex.select({"Region": regions, "Mangrove_Species": species})
+        if area is None:
+            return self.filterIndex.count(bitmap)
+        positions = self.spatial().query(area)
+        if bitmap is None:
+            return len(positions)
+        return int(np.unpackbits(bitmap, count=self.filterIndex.rows)[positions].sum())
+
+    def store(self, name, storeClass):
+        if self.stores is not None and name in self.stores:
+            return self.stores[name]
+        if self.df is None:
+            raise RowsPending()
+        return loader.derived(name, storeClass.from_frame, self.source, frame=self.df)
+
+#file position of every row in the streaming ingest's parquet copy
+ROW_COLUMN = "_row"
+
+#rows of a finished streaming ingest (see mangrove/ingest.py) read from its hive-partitioned parquet copy: only the
+#partitions of the picked regions/species and the asked columns are read, an area's box is pushed down to the
+#row groups and rows come back in file order. aggregates come from the ingest's finished stores, the sidebar
+#values from the ingest (filterIndex), so the whole frame is never in memory
+class PartitionedBackend(PandasBackend):
+    name = "parquet"
+
+    def __init__(self, directory, columns, filterIndex, stores):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        super().__init__(None, filterIndex, dict(stores))
+        partitioning = ds.partitioning(pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]), flavor="hive")
+        self.dataset = ds.dataset(directory, format="parquet", partitioning=partitioning)
+        self.columns = list(columns)
+        self.lock = threading.Lock()
+
+    def expression(self, regions=None, species=None, area=None):
+        import pyarrow.dataset as ds
+        clauses = [ds.field(column).isin([str(value) for value in values])
+                   for column, values in (("Region", regions), ("Mangrove_Species", species)) if values]
+        if area is not None:
+            box = area_box(area)
+            clauses += [ds.field("Latitude") >= box[0], ds.field("Latitude") <= box[1],
+                        ds.field("Longitude") >= box[2], ds.field("Longitude") <= box[3]]
+        return reduce(operator.and_, clauses) if clauses else None
+
+    def rows(self, regions=None, species=None, columns=None, area=None):
+        columns = list(columns) if columns else list(self.columns)
+        if area is not None:
+            columns = list(dict.fromkeys(columns + ["Latitude", "Longitude"]))
+        with perf.timed("filter", self.name) as stage:
+            table = self.dataset.to_table(columns=columns + [ROW_COLUMN], filter=self.expression(regions, species, area))
+            table = table.sort_by(ROW_COLUMN).drop_columns([ROW_COLUMN])
+            rows = schema.compact_frame(table.to_pandas(split_blocks=True, self_destruct=True))
+            if area is not None and area[0] != "box":
+                rows = rows[area_mask(rows["Latitude"], rows["Longitude"], area)].reset_index(drop=True)
+            stage["rows"] = len(rows)
+        return rows
+
+    def count(self, regions=None, species=None, area=None):
+        if area is not None:
+            return len(self.rows(regions, species, ["Latitude", "Longitude"], area))
+        return self.dataset.count_rows(filter=self.expression(regions, species))
+
+    #stores the ingest did not build are built once from the rows
+    def store(self, name, storeClass):
+        with self.lock:
+            if name not in self.stores:
+                self.stores[name] = storeClass.from_frame(self.rows())
+            return self.stores[name]
+
+def quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+#string literal for the places duckdb takes no parameters (table function arguments)
+def literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+#schema.SCHEMA dtypes in duckdb, columns it does not know are cast like compact_frame does
+SQL_TYPES = {"float32": "FLOAT", "float64": "DOUBLE", "datetime64[ns]": "TIMESTAMP", "category": "VARCHAR"}
+
+def typed_sql(column, sqlType):
+    if column in schema.SCHEMA:
+        sqlType = SQL_TYPES[schema.SCHEMA[column][0]]
+    elif sqlType == "DOUBLE":
+        sqlType = "FLOAT"
+    return f"CAST({quote(column)} AS {sqlType}) AS {quote(column)}"
+
+#same first-match-wins rule as regions.get_region
+def region_sql(regions=regions):
+    cases = " ".join(f"WHEN Latitude BETWEEN {r['latitude'][0]} AND {r['latitude'][1]} "
+                     f"AND Longitude BETWEEN {r['longitude'][0]} AND {r['longitude'][1]} THEN {literal(r['name'])}"
+                     for r in regions)
+    return f"CASE {cases} ELSE {literal(UNKNOWN_REGION)} END"
+
+class DuckDBBackend:
+    name = "duckdb"
+
+    def __init__(self, path, version):
+        import duckdb
+        self.path = path
+        self.version = version
+        self.checked = time.monotonic()
+        self.con = duckdb.connect(path, read_only=True)
+        self.lock = threading.Lock()
+        self.adapters = {}
+        described = self.con.execute(f"DESCRIBE {TABLE}").fetchall()
+        self.columns = [row[0] for row in described]
+        self.numeric = [row[0] for row in described if row[1] in ("DOUBLE", "FLOAT", "BIGINT", "INTEGER", "SMALLINT", "DECIMAL")]
+
+    def close(self):
+        self.con.close()
+
+    #every query runs on its own cursor, a duckdb connection must not be shared between threads
+    def query(self, sql, params=()):
+        return self.con.cursor().execute(sql, list(params)).df()
+
+    def where(self, regions=None, species=None, extra=()):
+        clauses, params = list(extra), []
+        for column, values in (("Region", regions), ("Mangrove_Species", species)):
+            if values:
+                clauses.append(f"{quote(column)} IN ({', '.join('?' for _ in values)})")
+                params.extend(str(value) for value in values)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def values(self, column):
+        return self.query(f"SELECT {quote(column)} AS v FROM {TABLE} GROUP BY 1 ORDER BY min(rowid)")["v"].tolist()
+
+    def count(self, regions=None, species=None, area=None):
+        if area is not None:
+            return len(self.rows(regions, species, ["Latitude", "Longitude"], area))
+        where, params = self.where(regions, species)
+        return int(self.query(f"SELECT count(*) AS n FROM {TABLE}{where}", params)["n"].iloc[0])
+
+    #an area is cut to its box in sql, radius and polygon edges are then tested on the returned rows
+    def rows(self, regions=None, species=None, columns=None, area=None):
+        extra = []
+        if area is not None:
+            box = area_box(area)
+            extra = [f"Latitude BETWEEN {float(box[0])!r} AND {float(box[1])!r}",
+                     f"Longitude BETWEEN {float(box[2])!r} AND {float(box[3])!r}"]
+            if columns:
+                columns = list(dict.fromkeys(list(columns) + ["Latitude", "Longitude"]))
+        where, params = self.where(regions, species, extra)
+        select = ", ".join(quote(column) for column in columns) if columns else "*"
+        with perf.timed("filter", self.name) as stage:
+            rows = schema.compact_frame(self.query(f"SELECT {select} FROM {TABLE}{where} ORDER BY rowid", params))
+            if area is not None and area[0] != "box":
+                rows = rows[area_mask(rows["Latitude"], rows["Longitude"], area)].reset_index(drop=True)
+            stage["rows"] = len(rows)
+        return rows
+
+    #sql counterpart of the named store, with the same query methods the figures call
+    def store(self, name, storeClass):
+        with self.lock:
+            if name not in self.adapters:
+                self.adapters[name] = SQL_STORES[name](self)
+            return self.adapters[name]
+
+class SqlCorrelation:
+    def __init__(self, backend):
+        self.backend = backend
+        self.columns = list(backend.numeric)
+
+    #pairwise complete, same as DataFrame.corr(numeric_only=True)
+    def corr(self, regions=None, species=None):
+        k = len(self.columns)
+        pairs = [(i, j) for i in range(k) for j in range(i + 1, k)]
+        terms = [f"corr({quote(self.columns[j])}, {quote(self.columns[i])})" for i, j in pairs]
+        terms += [f"var_samp({quote(column)})" for column in self.columns]
+        where, params = self.backend.where(regions, species)
+        values = self.backend.query(f"SELECT {', '.join(terms)} FROM {TABLE}{where}", params).iloc[0].to_numpy(dtype="float64")
+        result = np.full((k, k), np.nan)
+        for (i, j), value in zip(pairs, values):
+            result[i, j] = result[j, i] = value
+        variances = values[len(pairs):]
+        np.fill_diagonal(result, np.where(variances > 0, 1.0, np.nan))
+        return pd.DataFrame(np.clip(result, -1.0, 1.0), index=self.columns, columns=self.columns)
+
+class SqlTrendline:
+    def __init__(self, backend, x="Humidity", y="Temperature"):
+        self.backend = backend
+        self.x = x
+        self.y = y
+
+    def fits(self, regions=None, species=None):
+        x, y = quote(self.x), quote(self.y)
+        where, params = self.backend.where(regions, species)
+        both = f"{x} IS NOT NULL AND {y} IS NOT NULL"
+        frame = self.backend.query(
+            f"SELECT Mangrove_Species AS name, regr_count({y}, {x}) AS n, regr_slope({y}, {x}) AS slope, "
+            f"regr_intercept({y}, {x}) AS intercept, regr_r2({y}, {x}) AS r2, "
+            f"min({x}) FILTER (WHERE {both}) AS low, max({x}) FILTER (WHERE {both}) AS high "
+            f"FROM {TABLE}{where} GROUP BY 1 ORDER BY min(rowid)", params)
+        result = {}
+        for row in frame.itertuples():
+            if row.n < 2 or pd.isna(row.slope):
+                continue
+            r2 = 1.0 if pd.isna(row.r2) else row.r2
+            result[row.name] = {"n": int(row.n), "slope": row.slope, "intercept": row.intercept, "r2": r2,
+                                "x": [row.low, row.high],
+                                "y": [row.slope * row.low + row.intercept, row.slope * row.high + row.intercept]}
+        return result
+
+#exact quartiles from the engine, outliers capped at TAIL_SIZE per side like BoxStore
+class SqlBox:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def summary(self, column, regions=None, species=None):
+        x = quote(column)
+        where, params = self.backend.where(regions, species, [f"{x} IS NOT NULL"])
+        base = f"SELECT Mangrove_Species AS name, {x} AS x, rowid AS r FROM {TABLE}{where}"
+        stats = ("SELECT name, count(*) AS n, avg(x) AS mean, quantile_cont(x, 0.25) AS q1, quantile_cont(x, 0.5) AS median, "
+                 "quantile_cont(x, 0.75) AS q3, min(r) AS first FROM rows GROUP BY name")
+        fenced = ("SELECT rows.name, x, q1 - 1.5 * (q3 - q1) AS low, q3 + 1.5 * (q3 - q1) AS high "
+                  "FROM rows JOIN stats USING (name)")
+        frame = self.backend.query(
+            f"WITH rows AS ({base}), stats AS ({stats}), fenced AS ({fenced}), "
+            f"whiskers AS (SELECT name, min(x) FILTER (WHERE x >= low) AS lowerfence, max(x) FILTER (WHERE x <= high) AS upperfence "
+            f"FROM fenced GROUP BY name) "
+            f"SELECT * FROM stats JOIN whiskers USING (name) ORDER BY first", params)
+        outliers = self.backend.query(
+            f"WITH rows AS ({base}), stats AS ({stats}), fenced AS ({fenced}), "
+            f"ranked AS (SELECT name, x, row_number() OVER (PARTITION BY name, x < low ORDER BY CASE WHEN x < low THEN x ELSE -x END) AS k "
+            f"FROM fenced WHERE x < low OR x > high) "
+            f"SELECT name, x FROM ranked WHERE k <= {TAIL_SIZE}", params)
+        result = {}
+        for row in frame.itertuples():
+            result[row.name] = {"n": int(row.n), "mean": float(row.mean), "q1": row.q1, "median": row.median, "q3": row.q3,
+                                "lowerfence": float(row.lowerfence), "upperfence": float(row.upperfence),
+                                "outliers": np.unique(outliers.loc[outliers["name"] == row.name, "x"].to_numpy())}
+        return result
+
+#pandas Grouper rules used by choose_bucket, weeks are labelled by their last day like freq="W"
+BUCKET_SQL = {"h": ("hour", 0), "D": ("day", 0), "W": ("week", 6), "MS": ("month", 0), "QS": ("quarter", 0), "YS": ("year", 0)}
+
+class SqlTimeSeries:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def date_range(self):
+        frame = self.backend.query(f"SELECT min(Date) AS low, max(Date) AS high FROM {TABLE}")
+        if frame["low"].isna().iloc[0]:
+            return None
+        return pd.Timestamp(frame["low"].iloc[0]).floor("h"), pd.Timestamp(frame["high"].iloc[0]).floor("h")
+
+    def envelope(self, column, regions=None, species=None, by="Mangrove_Species", start=None, end=None, maxPoints=400):
+        if by not in ("Mangrove_Species", "Region"):
+            raise ValueError(by)
+        dateRange = self.date_range()
+        if dateRange is None:
+            return pd.DataFrame(columns=["Date", by, "min", "mean", "max", "count"])
+        start = pd.Timestamp(start) if start is not None else dateRange[0]
+        end = pd.Timestamp(end) if end is not None else dateRange[1]
+        unit, shift = BUCKET_SQL[choose_bucket(start, end, maxPoints)]
+        x = quote(column)
+        where, params = self.backend.where(regions, species, [f"{x} IS NOT NULL", "date_trunc('hour', Date) BETWEEN ? AND ?"])
+        params = [start.to_pydatetime(), end.to_pydatetime()] + params
+        frame = self.backend.query(
+            f"SELECT date_trunc('{unit}', Date) + INTERVAL {shift} DAY AS Date, {quote(by)} AS {quote(by)}, min({x}) AS min, "
+            f"avg({x}) AS mean, max({x}) AS max, count({x}) AS count FROM {TABLE}{where} GROUP BY 1, 2 ORDER BY 2, 1", params)
+        return frame[["Date", by, "min", "mean", "max", "count"]]
+
+#ranges as DensityStore.configured picks them, the merged partial DensityStore.density reads comes from sql
+class SqlDensity(DensityStore):
+    def __init__(self, backend, columns=DENSITY_COLUMNS):
+        self.backend = backend
+        terms = ", ".join(f"min({quote(c)}) AS \"low{i}\", max({quote(c)}) AS \"high{i}\"" for i, c in enumerate(columns))
+        bounds = backend.query(f"SELECT {terms} FROM {TABLE}").iloc[0]
+        ranges = {}
+        for i, column in enumerate(columns):
+            low, high = float(bounds[f"low{i}"]), float(bounds[f"high{i}"])
+            pad = (high - low) * 0.1 or 1.0
+            ranges[column] = (low - pad, high + pad)
+        super().__init__(ranges)
+
+    def select(self, regions=None, species=None):
+        partial = {}
+        for column, (low, high) in self.ranges.items():
+            x = quote(column)
+            where, params = self.backend.where(regions, species, [f"{x} IS NOT NULL"])
+            cell = f"least(greatest(floor(({x} - {low}) / {high - low} * {self.gridSize}), 0), {self.gridSize - 1})::INTEGER"
+            cells = self.backend.query(f"SELECT {cell} AS cell, count(*) AS n FROM {TABLE}{where} GROUP BY 1", params)
+            stats = self.backend.query(f"SELECT count(*) AS n, sum({x}) AS s, sum({x} * {x}) AS q, min({x}) AS low, max({x}) AS high "
+                                       f"FROM {TABLE}{where}", params).iloc[0]
+            sample = self.backend.query(f"SELECT x FROM (SELECT {x} AS x FROM {TABLE}{where}) "
+                                        f"USING SAMPLE reservoir({self.rugSize} ROWS) REPEATABLE (0)", params)
+            counts = np.zeros(self.gridSize, dtype=np.int64)
+            counts[cells["cell"].to_numpy()] = cells["n"].to_numpy()
+            n = int(stats["n"])
+            partial[column] = {"counts": counts, "n": n, "sum": float(stats["s"] or 0.0), "squares": float(stats["q"] or 0.0),
+                               "min": float(stats["low"]) if n else np.inf, "max": float(stats["high"]) if n else -np.inf,
+                               "sample": sample["x"].to_numpy()}
+        return partial
+
+#per species (by=1) or per region (by=0) partials of SplomStore from one grouping-sets scan, the selection total is their sum
+class SqlSplom(SplomStore):
+    def __init__(self, backend, columns=SOIL_COLUMNS):
+        self.backend = backend
+        columns = [column for column in columns if column in backend.numeric]
+        terms = ", ".join(f"min({quote(c)}) AS \"low{i}\", max({quote(c)}) AS \"high{i}\"" for i, c in enumerate(columns))
+        bounds = backend.query(f"SELECT {terms} FROM {TABLE}").iloc[0]
+        ranges = {}
+        for i, column in enumerate(columns):
+            low, high = float(bounds[f"low{i}"]), float(bounds[f"high{i}"])
+            if np.isnan(low):
+                continue
+            ranges[column] = (low - 0.5, high + 0.5) if high <= low else (low, high)
+        super().__init__(ranges)
+
+    def group(self, by=1, regions=None, species=None):
+        cells = [f"least(greatest(floor(({quote(c)} - {low}) / {high - low} * {self.bins}), 0), {self.bins - 1})::INTEGER AS c{i}"
+                 for i, (c, (low, high)) in enumerate(self.ranges.items())]
+        k = len(self.columns)
+        sets = ["(name)"] + [f"(name, c{i})" for i in range(k)] + [f"(name, c{i}, c{j})" for i in range(k) for j in range(i + 1, k)]
+        where, params = self.backend.where(regions, species)
+        frame = self.backend.query(
+            f"SELECT name, {', '.join(f'c{i}' for i in range(k))}, count(*) AS n, "
+            f"{', '.join(f'grouping(c{i}) AS g{i}' for i in range(k))} FROM "
+            f"(SELECT {PARTITION_COLUMNS[by]} AS name, rowid AS r, {', '.join(cells)} FROM {TABLE}{where}) "
+            f"GROUP BY GROUPING SETS ({', '.join(sets)}) ORDER BY min(r)", params)
+        groups = {}
+        for name in frame["name"].unique():
+            part = frame[frame["name"] == name]
+            present = {i: part[f"g{i}"].to_numpy() == 0 for i in range(k)}
+            only = lambda *ids: np.logical_and.reduce([present[i] if i in ids else ~present[i] for i in range(k)])
+            partial = {"n": int(part.loc[only(), "n"].sum())}
+            for i, column in enumerate(self.columns):
+                rows = part[only(i) & part[f"c{i}"].notna()]
+                partial[column] = np.bincount(rows[f"c{i}"].astype(np.int64), weights=rows["n"], minlength=self.bins).astype(np.int64)
+                for j in range(i + 1, k):
+                    rows = part[only(i, j) & part[f"c{i}"].notna() & part[f"c{j}"].notna()]
+                    flat = rows[f"c{i}"].astype(np.int64) * self.bins + rows[f"c{j}"].astype(np.int64)
+                    partial[column, self.columns[j]] = np.bincount(flat, weights=rows["n"], minlength=self.bins * self.bins) \
+                        .astype(np.int64).reshape(self.bins, self.bins)
+            groups[name] = partial
+        return groups
+
+    def select(self, regions=None, species=None):
+        groups = list(self.group(1, regions, species).values())
+        return None if not groups else {key: sum(group[key] for group in groups) for key in groups[0]}
+
+    def count(self, regions=None, species=None):
+        return self.backend.count(regions, species)
+
+#cell sums at the store zoom per species (by=1) or region (by=0), everything coarser is merged from them like MapBinStore
+class SqlMapBins(MapBinStore):
+    def __init__(self, backend):
+        self.backend = backend
+        super().__init__()
+
+    def group(self, by=1, regions=None, species=None):
+        cellDeg = cell_size(self.zoom)
+        where, params = self.backend.where(regions, species, ["Latitude IS NOT NULL", "Longitude IS NOT NULL"])
+        frame = self.backend.query(
+            f"SELECT {PARTITION_COLUMNS[by]} AS name, floor(Latitude / {cellDeg})::BIGINT AS Lat, floor(Longitude / {cellDeg})::BIGINT AS Lon, "
+            f"count(*) AS Count, sum(Latitude) AS Latitude, sum(Longitude) AS Longitude, coalesce(sum(Growth_Rate), 0) AS Growth, "
+            f"count(Growth_Rate) AS GrowthCount, min(rowid) AS first FROM {TABLE}{where} GROUP BY 1, 2, 3", params)
+        order = frame.groupby("name", sort=False)["first"].min().sort_values().index
+        return {name: frame[frame["name"] == name].drop(columns=["name", "first"]).set_index(["Lat", "Lon"]) for name in order}
+
+    def select(self, regions=None, species=None):
+        groups = list(self.group(1, regions, species).values())
+        return pd.concat(groups).groupby(level=[0, 1]).sum() if groups else None
+
+SQL_STORES = {"correlation": SqlCorrelation, "trendline": SqlTrendline, "box": SqlBox, "time_series": SqlTimeSeries,
+              "density": SqlDensity, "splom": SqlSplom, "map_bins": SqlMapBins}
+
+#one database file per source version: duckdb hands out the already open instance for a path it has open,
+#so a rebuilt file under the same name would never be seen while an older backend still holds it
+DATABASE_KEEP = 3 #database versions kept on disk per source
+
+def database_path(source, version):
+    name = hashlib.sha1(str(source).encode("utf-8")).hexdigest()[:16]
+    versionName = hashlib.sha1(version.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(columnar.CACHE_DIR, f"{name}.{versionName}.duckdb")
+
+#databases built for the source, newest first
+def database_files(source):
+    prefix = hashlib.sha1(str(source).encode("utf-8")).hexdigest()[:16] + "."
+    try:
+        names = os.listdir(columnar.CACHE_DIR)
+    except OSError:
+        return []
+    files = [os.path.join(columnar.CACHE_DIR, name) for name in names if name.startswith(prefix) and name.endswith(".duckdb")]
+    return sorted(files, key=os.path.getmtime, reverse=True)
+
+#version the newest database was built from, None when there is none
+def database_version(source):
+    files = database_files(source)
+    if not files:
+        return None
+    try:
+        import duckdb
+        con = duckdb.connect(files[0], read_only=True)
+        try:
+            return con.execute(f"SELECT version FROM {TABLE}_meta").fetchone()[0]
+        finally:
+            con.close()
+    except Exception:
+        return None
+
+#csv or parquet straight into a duckdb table, columns cast to the schema.SCHEMA types and Region assigned in sql,
+#written next to the columnar cache and moved into place atomically. a .npz bundle is read with numpy first.
+#versions past DATABASE_KEEP are removed, on windows one that is still open stays until a later build
+def build_database(source, version, content=None):
+    import duckdb
+    os.makedirs(columnar.CACHE_DIR, exist_ok=True)
+    csvPath, bundle = None, None
+    if loader.is_bundle(source):
+        from mangrove.bundle import read_bundle
+        if content is None:
+            with open(source, "rb") as f:
+                content = f.read()
+        bundle = read_bundle(content).drop(columns=["Region"])
+        bundle["Mangrove_Species"] = bundle["Mangrove_Species"].astype(str)
+        scan = "bundle"
+    else:
+        if loader.is_url(source): #duckdb reads local files, the fetched body is parked next to the database
+            fd, csvPath = tempfile.mkstemp(dir=columnar.CACHE_DIR, suffix=".csv")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            path = csvPath
+        else:
+            path = source
+        if os.path.isdir(path):
+            scan = f"read_parquet({literal(os.path.join(path, '**', '*.parquet'))}, hive_partitioning = true)"
+        elif path.endswith(".parquet"):
+            scan = f"read_parquet({literal(path)})"
+        else:
+            scan = f"read_csv_auto({literal(path)}, encoding = 'latin-1')"
+    fd, tmpPath = tempfile.mkstemp(dir=columnar.CACHE_DIR, suffix=".duckdb")
+    os.close(fd)
+    os.remove(tmpPath)
+    try:
+        con = duckdb.connect(tmpPath)
+        if bundle is not None:
+            con.register("bundle", bundle)
+        described = con.execute(f"DESCRIBE SELECT * FROM {scan}").fetchall()
+        select = ", ".join(typed_sql(column, sqlType) for column, sqlType, *_ in described if column != "Region")
+        con.execute(f"CREATE TABLE {TABLE} AS SELECT {select}, {region_sql()} AS Region FROM {scan}")
+        con.execute(f"CREATE TABLE {TABLE}_meta AS SELECT ? AS version", [version])
+        con.close()
+        os.replace(tmpPath, database_path(source, version))
+    finally:
+        for leftover in (tmpPath, tmpPath + ".wal", csvPath):
+            if leftover and os.path.exists(leftover):
+                os.remove(leftover)
+    for path in database_files(source)[DATABASE_KEEP:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return database_path(source, version)
+
+_lock = threading.Lock()
+_databases = {}
+
+#shared duckdb backend for the source, rebuilt when the source has a new version (checked every ttl seconds)
+def duckdb_backend(source=None, ttl=loader.DEFAULT_TTL):
+    source = loader.resolve_source(source)
+    with _lock:
+        backend = _databases.get(source)
+        if backend is not None and time.monotonic() - backend.checked < ttl:
+            return backend
+        knownVersion = backend.version if backend else database_version(source)
+        version, content = loader.fetch_source(source, knownVersion)
+        if content is None and backend is not None:
+            backend.checked = time.monotonic()
+            return backend
+        if not os.path.exists(database_path(source, version)):
+            build_database(source, version, content)
+        #the old backend is not closed here, other sessions and render_section threads may be querying it mid-rerun.
+        #its connection is closed when the last of them drops it, they pick up the new one on their next rerun
+        _databases[source] = DuckDBBackend(database_path(source, version), version)
+        return _databases[source]
+
+#(backend, data version) for the page. without the duckdb package (pyodide) the pandas backend is used.
+#reload re-checks the source right away
+def open_backend(reload=False):
+    if BACKEND == "duckdb" and importlib.util.find_spec("duckdb") is not None:
+        backend = duckdb_backend(ttl=0 if reload else loader.DEFAULT_TTL)
+        return backend, backend.version
+    df, version = loader.load_versioned(ttl=0 if reload else loader.DEFAULT_TTL)
+    return PandasBackend(df, loader.derived("filter_index", FilterIndex, frame=df)), version
@@ -0,0 +1,100 @@
+import numpy as np
+
+from mangrove.partitions import PartitionStore
+
+BOX_COLUMNS = ["Plant_Height", "Growth_Rate"]
+COMPRESSION = 200 #t-digest size, about COMPRESSION / 2 centroids per partition and column
+TAIL_SIZE = 50 #exact extreme values kept per side, box outliers are drawn from these
+
+#merging t-digest step: sorted centroids are grouped so that every group spans at most one unit of the
+#arcsine scale k(q) = compression / (2 pi) * asin(2q - 1), which keeps the tails nearly exact
+def compress(means, weights, compression=COMPRESSION):
+    order = np.argsort(means, kind="stable")
+    means, weights = means[order], weights[order]
+    total = weights.sum()
+    q = (np.cumsum(weights) - weights / 2) / total
+    scale = np.floor(compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1)))
+    starts = np.flatnonzero(np.r_[True, scale[1:] != scale[:-1]])
+    groupWeights = np.add.reduceat(weights, starts)
+    return np.add.reduceat(means * weights, starts) / groupWeights, groupWeights
+
+def digest_quantile(means, weights, low, high, q):
+    total = weights.sum()
+    mids = np.cumsum(weights) - weights / 2
+    return float(np.interp(q * total, np.r_[0.0, mids, total], np.r_[low, means, high]))
+
+#per partition and column: t-digest centroids, count/sum/min/max and the TAIL_SIZE lowest and highest values,
+#bounded in size and mergeable across regions
+class BoxStore(PartitionStore):
+    def __init__(self, columns=BOX_COLUMNS, compression=COMPRESSION, tailSize=TAIL_SIZE):
+        super().__init__()
+        self.columns = list(columns)
+        self.compression = compression
+        self.tailSize = tailSize
+
+    def _partial(self, means, weights, low, high):
+        means, weights = compress(means, weights, self.compression)
+        low, high = np.sort(low)[:self.tailSize], np.sort(high)[-self.tailSize:]
+        return {"means": means, "weights": weights, "low": low, "high": high}
+
+    def summarize(self, part):
+        partial = {}
+        for column in self.columns:
+            values = part[column].to_numpy(dtype="float64")
+            values = values[~np.isnan(values)]
+            if not len(values):
+                continue
+            partial[column] = self._partial(values, np.ones(len(values)), values, values)
+        return partial
+
+    def combine(self, a, b):
+        merged = dict(a)
+        for column, y in b.items():
+            x = merged.get(column)
+            if x is None:
+                merged[column] = y
+                continue
+            merged[column] = self._partial(np.concatenate([x["means"], y["means"]]),
+                                           np.concatenate([x["weights"], y["weights"]]),
+                                           np.concatenate([x["low"], y["low"]]), np.concatenate([x["high"], y["high"]]))
+        return merged
+
+    #box statistics per species over the selected regions, outliers capped at TAIL_SIZE per side
+    def summary(self, column, regions=None, species=None):
+        result = {}
+        for name, partial in self.group(1, regions, species).items():
+            if column not in partial:
+                continue
+            stats = partial[column]
+            means, weights = stats["means"], stats["weights"]
+            low, high = stats["low"][0], stats["high"][-1]
+            q1, median, q3 = (digest_quantile(means, weights, low, high, q) for q in (0.25, 0.5, 0.75))
+            fenceLow, fenceHigh = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            #whiskers end at the most extreme value inside the fences, when the kept tail does not reach
+            #inside the fences the fence itself is the closest value we know of
+            inside = stats["low"][stats["low"] >= fenceLow]
+            lowerWhisker = inside[0] if len(inside) else fenceLow
+            inside = stats["high"][stats["high"] <= fenceHigh]
+            upperWhisker = inside[-1] if len(inside) else fenceHigh
+            outliers = np.concatenate([stats["low"][stats["low"] < fenceLow], stats["high"][stats["high"] > fenceHigh]])
+            result[name] = {"n": int(weights.sum()), "mean": float((means * weights).sum() / weights.sum()),
+                            "q1": q1, "median": median, "q3": q3,
+                            "lowerfence": float(lowerWhisker), "upperfence": float(upperWhisker),
+                            "outliers": np.unique(outliers)}
+        return result
+
+#precomputed boxes plus the bounded outlier sample, instead of px.box(points="all") over every row
+def box_figure(store, column, colors, regions=None, species=None):
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for i, (name, stats) in enumerate(store.summary(column, regions, species).items()):
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Box(x=[name], q1=[stats["q1"]], median=[stats["median"]], q3=[stats["q3"]],
+                             lowerfence=[stats["lowerfence"]], upperfence=[stats["upperfence"]], mean=[stats["mean"]],
+                             name=name, legendgroup=name, marker=dict(color=color), boxpoints=False))
+        if len(stats["outliers"]):
+            fig.add_trace(go.Scatter(x=[name] * len(stats["outliers"]), y=stats["outliers"], mode="markers",
+                                     name=name, legendgroup=name, showlegend=False, marker=dict(color=color, size=4)))
+    fig.update_layout(boxmode="overlay", xaxis_title="Mangrove_Species", yaxis_title=column,
+                      legend_title_text="Mangrove_Species")
+    return fig
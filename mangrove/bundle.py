@@ -0,0 +1,62 @@
+#the prepared frame (dates parsed, regions assigned, compact dtypes) as one compressed numpy .npz for the
+#stlite build. index.html mounts it next to main.py and keeps it in IndexedDB between visits, so the browser
+#neither downloads nor parses the csv. plain numpy arrays only, no pickles, numpy is part of every pyodide build.
+#python -m mangrove.bundle [--source data.csv] [--out mangrove_data.npz]
+import argparse
+import json
+import os
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from mangrove import loader, schema
+
+MANIFEST_NAME = "mangrove_data.json" #version and size, index.html checks it before touching the cached bundle
+
+#categories become their codes plus the category labels
+def bundle_arrays(df, version):
+    arrays = {"version": np.array(version), "columns": np.array(list(df.columns))}
+    for column in df.columns:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            arrays[f"codes:{column}"] = values.cat.codes.to_numpy()
+            arrays[f"categories:{column}"] = np.array([str(c) for c in values.cat.categories])
+        else:
+            arrays[f"values:{column}"] = values.to_numpy()
+    return arrays
+
+def write_bundle(df, version, path=loader.BUNDLE):
+    buffer = BytesIO()
+    np.savez_compressed(buffer, **bundle_arrays(df, version))
+    content = buffer.getvalue()
+    with open(path, "wb") as f:
+        f.write(content)
+    manifest = {"version": loader.content_hash(content), "source_version": version, "rows": len(df), "bytes": len(content)}
+    with open(os.path.join(os.path.dirname(path), MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+#same frame parse_csv gives for the source the bundle was built from
+def read_bundle(content):
+    with np.load(BytesIO(content), allow_pickle=False) as arrays:
+        frame = {}
+        for column in arrays["columns"]:
+            if f"codes:{column}" in arrays:
+                frame[column] = pd.Categorical.from_codes(arrays[f"codes:{column}"], arrays[f"categories:{column}"].tolist())
+            else:
+                frame[column] = arrays[f"values:{column}"]
+    return schema.compact_frame(pd.DataFrame(frame))
+
+def main():
+    parser = argparse.ArgumentParser(description="write the browser data bundle")
+    parser.add_argument("--source", default=loader.LOCAL_CSV, help="csv path or url, defaults to the bundled csv")
+    parser.add_argument("--out", default=loader.BUNDLE)
+    args = parser.parse_args()
+    source = loader.resolve_source(args.source)
+    version, content = loader.fetch_source(source)
+    manifest = write_bundle(loader.parse_csv(content), loader.content_hash(content), args.out)
+    print(f"{manifest['rows']} rows from {source}, {manifest['bytes'] / 2**10:.0f} KB written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,587 @@
+import inspect
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import streamlit as st
+
+from mangrove import perf
+from mangrove.backends import RowsPending, open_backend
+from mangrove.boxstats import BoxStore, box_figure
+from mangrove.corrstats import CorrelationStore
+from mangrove.density import DensityStore, density_figure
+from mangrove.loader import IN_PYODIDE
+from mangrove.mapbins import CELL_COLUMNS, MAP_POINT_LIMIT, MapBinStore, map_frame, map_views, viewport
+from mangrove import payload
+from mangrove.payload import figure_json, load_figure, render_mode
+from mangrove.regions import regions as REGIONS
+from mangrove.snapshots import load_snapshot, snapshot_key
+from mangrove.spatial import area_outline
+from mangrove.splom import SPLOM_COLUMNS, SPLOM_ROWS, SplomStore, splom_figure
+from mangrove.timeseries import TimeSeriesStore, envelope_figure
+from mangrove.trendline import TrendlineStore, add_trendlines
+
+#every figure on the page is a pure function of (data version, filter state, its own widget values),
+#registered here with its section; only the picked section is built and finished figures are kept as json.
+#plotly.express is imported by the builders, so a page serving cached figures never loads it
+DEFAULT_HEATMAP_COLOR = 'viridis'
+SPECIES_GREENS = ["forestgreen","lawngreen","limegreen"]
+SPECIES_COLORS = ["rgb(31, 119, 180)","rgb(255, 127, 14)","rgb(44, 160, 44)"]
+SECTIONS = ["Map", "Climate", "Growth", "Soil & water", "Correlation"]
+FIGURE_CACHE_BYTES = int(float(os.environ.get("MANGROVE_FIGURE_CACHE_MB", 64)) * 2**20)
+MAP_VIEWS = map_views()
+AREA_STORES = 16 #stores built for an area selection, kept for the latest few (chart, data version, filter) keys
+#selection events need streamlit 1.35+ (the version requirements.txt pins), on an older install Box and Radius
+#are the area filters and the map selection is left out
+SELECT_EVENTS = "on_select" in inspect.signature(st.plotly_chart).parameters
+#the charts of a section that are neither cached nor exported are built side by side: BUILD_WORKERS threads
+#(1 builds them one after the other like before, pyodide has no threads), "rows" charts on more than PROCESS_ROWS
+#selected rows go to PROCESS_WORKERS processes instead (pandas backend, 0 for none). a figure still building
+#after BUILD_TIMEOUT seconds gives its slot up and shows on a later rerun, from the figure cache
+BUILD_WORKERS = 1 if IN_PYODIDE else int(os.environ.get("MANGROVE_BUILD_WORKERS", min(4, os.cpu_count() or 1)))
+PROCESS_WORKERS = 0 if IN_PYODIDE else int(os.environ.get("MANGROVE_PROCESS_WORKERS", 0))
+PROCESS_ROWS = int(os.environ.get("MANGROVE_PROCESS_ROWS", 200000))
+BUILD_TIMEOUT = float(os.environ.get("MANGROVE_BUILD_TIMEOUT", 30))
+
+#least recently used figures are evicted once the cached json exceeds maxBytes, shared by all sessions
+class FigureCache:
+    def __init__(self, maxBytes=FIGURE_CACHE_BYTES):
+        self.maxBytes = maxBytes
+        self.bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+
+    def put(self, key, value, size):
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            if size > self.maxBytes:
+                return
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.maxBytes:
+                self.bytes -= self.entries.popitem(last=False)[1][1]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+figureCache = FigureCache()
+_areaStores = OrderedDict()
+_areaLock = threading.Lock()
+
+#what a chart may read: the query backend (see mangrove/backends.py), the sidebar picks and the map area.
+#rows are only fetched when a chart actually asks for them, once per set of columns.
+class ChartContext:
+    def __init__(self, backend, regions, species, version, area=None):
+        self.backend = backend
+        self.regions = list(regions)
+        self.species = list(species)
+        self.version = version
+        self.area = area
+        self._rows = {}
+
+    #filtered rows with at least these columns (all of them for none), raises RowsPending while only aggregates exist
+    def rows(self, columns=None):
+        columns = tuple(columns or ())
+        if columns not in self._rows:
+            self._rows[columns] = self.backend.rows(self.regions, self.species, list(columns) or None, self.area)
+        return self._rows[columns]
+
+    #the per-partition stores cannot cut an area out of a partition, so with an area the store is built from
+    #the selected rows, on the ranges of the backend's own pandas store when it has one, and kept for the next reruns
+    def store(self, name, storeClass):
+        if self.area is None:
+            return self.backend.store(name, storeClass)
+        key = (name, self.key())
+        with _areaLock:
+            if key in _areaStores:
+                _areaStores.move_to_end(key)
+                return _areaStores[key]
+        base = self.backend.store(name, storeClass)
+        rows = self.rows()
+        with perf.timed("derive", name, rows=len(rows)):
+            store = base.copy(parts=False).update(rows) if type(base) is storeClass else storeClass.from_frame(rows)
+        with _areaLock:
+            _areaStores[key] = store
+            while len(_areaStores) > AREA_STORES:
+                _areaStores.popitem(last=False)
+        return store
+
+    def key(self):
+        return (self.backend.name, self.version, tuple(sorted(map(str, self.regions))), tuple(sorted(map(str, self.species))),
+                self.area)
+
+class Chart:
+    def __init__(self, name, title, section, description, build, controls=None, height=700, selectable=False, defaults=None,
+                 workload="store"):
+        self.name = name
+        self.title = title
+        self.section = section
+        self.description = description
+        self.build = build
+        self.controls = controls
+        self.height = height
+        self.selectable = selectable
+        self.defaults = defaults
+        self.workload = workload
+
+    #options the controls return before anyone touches them, what snapshots are exported for
+    def default_options(self, ctx):
+        return self.defaults(ctx) if self.defaults else {}
+
+CHARTS = OrderedDict()
+
+#registers build(ctx, **options) -> fig or (fig, caption); controls(ctx) draws the chart's own widgets
+#and returns their values as options, or None when there is nothing to draw, defaults(ctx) gives the same
+#without widgets. a selectable chart reports box/lasso selections into st.session_state[f"chart_{name}"].
+#workload "rows" marks charts drawing every selected row, the ones worth a process of their own
+def chart(name, title, section, description, controls=None, height=700, selectable=False, defaults=None, workload="store"):
+    def register(build):
+        CHARTS[name] = Chart(name, title, section, description, build, controls, height, selectable, defaults, workload)
+        return build
+    return register
+
+def style(fig, title):
+    fig.update_layout(title=dict(text=f"<b>{title}</b>"), title_x=0.4, title_font_color="yellow", title_font_size=16)
+    return fig
+
+def snapshot_for(chart, ctx, options):
+    return snapshot_key(chart.name, ctx.backend.name, ctx.version, ctx.regions, ctx.species, ctx.area, options, payload.BINARY_ARRAYS)
+
+def figure_key(chart, ctx, options):
+    return (chart.name, ctx.key(), tuple(sorted(options.items())))
+
+#figure json from the figure cache or an exported snapshot (see mangrove/snapshots.py), None when it has to be built
+def cached_json(chart, ctx, options, snapshots=True):
+    key = figure_key(chart, ctx, options)
+    cached = figureCache.get(key)
+    if cached is not None:
+        perf.record("cached", chart.name, 0.0, size=len(cached[0]))
+        return cached
+    if snapshots:
+        cached = load_snapshot(ctx.version, snapshot_for(chart, ctx, options))
+        if cached is not None:
+            perf.record("snapshot", chart.name, 0.0, size=len(cached[0]))
+            figureCache.put(key, cached, len(cached[0]))
+    return cached
+
+#builds and caches the figure json, None when the chart has nothing to draw. safe to call from worker threads
+def build_json(chart, ctx, options):
+    with perf.timed("build", chart.name):
+        result = chart.build(ctx, **options)
+    if result is None:
+        return None
+    fig, caption = result if isinstance(result, tuple) else (result, None)
+    with perf.timed("serialize", chart.name) as stage:
+        cached = (figure_json(style(fig, chart.title)), caption)
+        stage["bytes"] = len(cached[0])
+    figureCache.put(figure_key(chart, ctx, options), cached, len(cached[0]))
+    return cached
+
+#figure json for the context: the figure cache, then an exported snapshot, then built and cached
+def chart_json(chart, ctx, options, snapshots=True):
+    cached = cached_json(chart, ctx, options, snapshots)
+    return cached if cached is not None else build_json(chart, ctx, options)
+
+def draw_chart(chart, cached, figSlot=st, captionSlot=st):
+    figJson, caption = cached
+    size = {"height": chart.height} if chart.height else {}
+    if chart.selectable and SELECT_EVENTS:
+        size.update(key=f"chart_{chart.name}", on_select="rerun", selection_mode=("box", "lasso"))
+    with perf.timed("render", chart.name):
+        figSlot.plotly_chart(load_figure(figJson), use_container_width=True, **size)
+    if caption:
+        captionSlot.caption(caption)
+
+def pending_message(chart):
+    return f"{chart.title} shows up once all records are loaded."
+
+def render_chart(chart, ctx):
+    try:
+        options = chart.controls(ctx) if chart.controls else {}
+        if options is None:
+            return
+        cached = chart_json(chart, ctx, options)
+    except RowsPending:
+        st.info(pending_message(chart))
+        return
+    if cached is None:
+        return
+    draw_chart(chart, cached)
+    st.write(chart.description)
+
+_buildPool = None
+_processPool = None
+_poolLock = threading.Lock()
+
+#pools live as long as the server and are shared by all sessions, created on the first section that needs them
+def build_pool():
+    global _buildPool
+    with _poolLock:
+        if _buildPool is None:
+            _buildPool = ThreadPoolExecutor(BUILD_WORKERS, thread_name_prefix="mangrove-build")
+        return _buildPool
+
+#spawned rather than forked, the server has threads running
+def process_pool():
+    global _processPool
+    with _poolLock:
+        if _processPool is None:
+            _processPool = ProcessPoolExecutor(PROCESS_WORKERS, mp_context=multiprocessing.get_context("spawn"),
+                                               initializer=_init_process)
+        return _processPool
+
+#per build process: its own backend on the same data, like the export workers (see mangrove/export.py)
+_processBackend = None
+_processVersion = None
+
+def _init_process():
+    global _processBackend, _processVersion
+    _processBackend, _processVersion = open_backend()
+
+#(figure json or None, None) when built, None when the process cannot get at the page's data version,
+#the chart is then built on a thread
+def _build_in_process(name, regions, species, area, options, version):
+    global _processBackend, _processVersion
+    if _processVersion != version:
+        _processBackend, _processVersion = open_backend(reload=True)
+        if _processVersion != version:
+            return None
+    ctx = ChartContext(_processBackend, regions, species, version, area)
+    return chart_json(CHARTS[name], ctx, options, snapshots=False), None
+
+#only worth the pickling for charts drawing many rows out of the in-memory frame
+def use_process(chart, ctx):
+    if PROCESS_WORKERS < 1 or chart.workload != "rows" or ctx.backend.name != "pandas":
+        return False
+    try:
+        return ctx.backend.count(ctx.regions, ctx.species, ctx.area) > PROCESS_ROWS
+    except RowsPending:
+        return False
+
+#runs on a pool thread: records into the rerun's perf run, the result lands in the figure cache even when
+#the page stopped waiting for it. RowsPending is handed back as the class itself
+def _build_task(chart, ctx, options, run, started):
+    started.append(time.monotonic())
+    with perf.attached(run):
+        try:
+            if use_process(chart, ctx):
+                with perf.timed("build", f"{chart.name} (process)"):
+                    remote = process_pool().submit(_build_in_process, chart.name, ctx.regions, ctx.species, ctx.area,
+                                                   options, ctx.version).result()
+                if remote is not None:
+                    cached = remote[0]
+                    if cached is not None:
+                        figureCache.put(figure_key(chart, ctx, options), cached, len(cached[0]))
+                    return cached
+            return build_json(chart, ctx, options)
+        except RowsPending:
+            return RowsPending
+
+#controls, placeholders and cache hits are drawn in page order on the script thread, the rest is built on the
+#pool and every figure is drawn into its placeholder as soon as it is done, streamlit calls stay on this thread
+def render_section(section, ctx):
+    charts = [chart for chart in CHARTS.values() if chart.section == section]
+    if BUILD_WORKERS <= 1:
+        for chart in charts:
+            render_chart(chart, ctx)
+        return
+    pending = {}
+    run = perf.current_run()
+    for chart in charts:
+        try:
+            options = chart.controls(ctx) if chart.controls else {}
+            if options is None:
+                continue
+            cached = cached_json(chart, ctx, options)
+        except RowsPending:
+            st.info(pending_message(chart))
+            continue
+        figSlot, captionSlot = st.empty(), st.empty()
+        st.write(chart.description)
+        if cached is not None:
+            draw_chart(chart, cached, figSlot, captionSlot)
+            continue
+        started = [] #gets the time a worker picked the build up, queued builds get as long again to start
+        future = build_pool().submit(_build_task, chart, ctx, options, run, started)
+        pending[future] = (chart, figSlot, captionSlot, started, time.monotonic() + BUILD_TIMEOUT)
+        figSlot.caption(f"Building {chart.title}...")
+    while pending:
+        done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+        for future in done:
+            chart, figSlot, captionSlot, _, _ = pending.pop(future)
+            try:
+                cached = future.result()
+            except Exception as e:
+                figSlot.exception(e)
+                continue
+            if cached is RowsPending:
+                figSlot.info(pending_message(chart))
+            elif cached is None:
+                figSlot.empty()
+            else:
+                draw_chart(chart, cached, figSlot, captionSlot)
+        now = time.monotonic()
+        for future, (chart, figSlot, captionSlot, started, queuedUntil) in list(pending.items()):
+            if now - (started[0] if started else queuedUntil) > BUILD_TIMEOUT:
+                del pending[future]
+                perf.record("timeout", chart.name, now - (started[0] if started else queuedUntil - BUILD_TIMEOUT))
+                figSlot.warning(f"{chart.title} is taking longer than {BUILD_TIMEOUT:.0f}s, it shows up on the next rerun once built.")
+
+#area the charts are limited to, None for everywhere. drawn in the sidebar, a map selection is read from the
+#map's widget state so it applies to every chart of the rerun that follows it
+def area_filter():
+    kinds = ["Everywhere", "Box", "Radius"] + (["Map selection"] if SELECT_EVENTS else [])
+    with st.sidebar.expander("Pick an area"):
+        kind = st.radio("Limit the charts to", kinds, key="area_kind")
+        if not SELECT_EVENTS:
+            st.caption(f"Selecting on the map needs streamlit 1.35 or newer (this is {st.__version__}), use Box or Radius.")
+        if kind == "Box":
+            box = REGIONS[0]["latitude"] + REGIONS[0]["longitude"]
+            areaCol1, areaCol2 = st.columns(2)
+            latLow = areaCol1.number_input("Latitude from", -90.0, 90.0, float(box[0]))
+            latHigh = areaCol2.number_input("Latitude to", -90.0, 90.0, float(box[1]))
+            lonLow = areaCol1.number_input("Longitude from", -180.0, 180.0, float(box[2]))
+            lonHigh = areaCol2.number_input("Longitude to", -180.0, 180.0, float(box[3]))
+            return ("box", (min(latLow, latHigh), max(latLow, latHigh), min(lonLow, lonHigh), max(lonLow, lonHigh)))
+        if kind == "Radius":
+            centerLat, centerLon, _ = MAP_VIEWS[REGIONS[0]["name"]]
+            areaCol1, areaCol2 = st.columns(2)
+            lat = areaCol1.number_input("Centre latitude", -90.0, 90.0, float(round(centerLat, 2)))
+            lon = areaCol2.number_input("Centre longitude", -180.0, 180.0, float(round(centerLon, 2)))
+            km = st.number_input("Radius km", 1.0, 5000.0, 150.0)
+            return ("radius", (lat, lon, km))
+        if kind == "Map selection":
+            area = selection_area(st.session_state.get("chart_map"))
+            if area is None:
+                st.caption("Select markers on the map with the box or lasso tool.")
+            return area
+    return None
+
+#area of the selected map markers. mapbox selections report the markers only (a lasso comes back as the markers
+#inside it), so a binned map gives the selected grid cells, read from the cell columns sent along as customdata,
+#and a map of single plants gives the rows at the selected markers (see mangrove/spatial.py)
+def selection_area(event):
+    points = (event or {}).get("selection", {}).get("points", [])
+    cells = [point["customdata"] for point in points if len(point.get("customdata") or ()) >= len(CELL_COLUMNS)]
+    if cells:
+        return ("cells", (float(cells[0][2]), tuple(sorted({(int(cell[0]), int(cell[1])) for cell in cells}))))
+    markers = sorted({(float(point["lat"]), float(point["lon"])) for point in points
+                      if point.get("lat") is not None and point.get("lon") is not None})
+    return ("points", tuple(markers)) if markers else None
+
+#osm mapbox plotting entire plant data
+#scatter map breaks sometimes after re-render
+#past MAP_POINT_LIMIT visible records the map gets grid cells binned on the server instead of one marker per row,
+#zooming in shrinks the cells and the viewport so the payload stays bounded (see mangrove/mapbins.py),
+#up to MAP_STORE_ZOOM the cells are merged from cached per-partition cell sums instead of the rows.
+#the viewport is looked up in the lat/lon grid index (see mangrove/spatial.py), the picked area is drawn as an outline
+def map_defaults(ctx):
+    view = next(iter(MAP_VIEWS))
+    return {"view": view, "zoom": MAP_VIEWS[view][2]}
+
+def map_controls(ctx):
+    mapCol1, mapCol2 = st.columns(2)
+    view = mapCol1.selectbox("Map view", list(MAP_VIEWS))
+    zoom = mapCol2.slider("Map zoom", 3, 12, MAP_VIEWS[view][2], key=f"map_zoom_{view}")
+    return {"view": view, "zoom": zoom}
+
+@chart("map", "Map plots of mangrove", "Map", ''' Magroove trees, also known as mangroves, are vital ecosystems found along coastal areas.
+In Saudi Arabia, mangrove tree markers on maps typically indicate the presence of these unique habitats.
+Mangroves serve as crucial buffers against coastal erosion, provide habitats for diverse marine life, and offer protection against storm surges.
+These markers on maps signify areas where these ecosystems thrive, highlighting their significance for biodiversity conservation and coastal management in the Kingdom of Saudi Arabia.''',
+       controls=map_controls, selectable=True, defaults=map_defaults)
+def map_chart(ctx, view, zoom):
+    import plotly.express as px
+    mapLat, mapLon, _ = MAP_VIEWS[view]
+    center = (mapLat, mapLon)
+    store = ctx.store("map_bins", MapBinStore)
+    mapDf = None
+    if zoom > store.zoom or store.count(viewport(center, zoom), ctx.regions, ctx.species) <= MAP_POINT_LIMIT:
+        try:
+            columns = ["Latitude", "Longitude", "Mangrove_Species", "Growth_Rate"]
+            rows = ctx.rows(columns) if ctx.area else ctx.backend.rows(ctx.regions, ctx.species, columns, ("box", viewport(center, zoom)))
+            mapDf, mapBinned = map_frame(rows, zoom, center)
+        except RowsPending:
+            pass
+    if mapDf is None:
+        mapDf, mapBinned = store.cells(zoom, center, ctx.regions, ctx.species), True
+    caption = None
+    if mapBinned:
+        fig = px.scatter_mapbox(mapDf, lat="Latitude", lon="Longitude", mapbox_style="carto-positron",
+                          color="Mangrove_Species", color_discrete_sequence=SPECIES_GREENS,
+                          size="Count", size_max=25, hover_data={"Count": True, "Growth_Rate": ":.2f"},
+                          custom_data=CELL_COLUMNS, zoom=zoom)
+        caption = (f"{len(mapDf)} grid cells summarising {int(mapDf['Count'].sum())} records in view, colour is the "
+                   "dominant species and size the record count. Zoom in for individual plants.")
+    else:
+        fig = px.scatter_mapbox(mapDf, lat="Latitude", lon="Longitude", mapbox_style="carto-positron",
+                          color="Mangrove_Species", color_discrete_sequence=SPECIES_GREENS,
+                          size="Growth_Rate", size_max=15, zoom=zoom)
+    if ctx.area:
+        import plotly.graph_objects as go
+        outlineLat, outlineLon = area_outline(ctx.area)
+        fig.add_trace(go.Scattermapbox(lat=outlineLat, lon=outlineLon, mode="lines", name="Area", line=dict(color="crimson", width=2)))
+    fig.update_layout(mapbox=dict(bearing=0, center=dict(lat=mapLat,lon=mapLon),pitch=0,zoom=zoom))
+    return fig, caption
+
+#temp vs lat
+@chart("latitude_temperature", "Latitude vs Temprature", "Climate", '''Latitude dictates the geographical range of mangroves, thriving within 25 degrees north to 25 degrees south of the equator.
+Temperature influences their growth and distribution, with warm climates being favorable, but frost and extreme heat can be detrimental to mangrove health.''', workload="rows")
+def latitude_temperature(ctx):
+    import plotly.express as px
+    rows = ctx.rows(["Latitude", "Temperature", "Mangrove_Species"])
+    return px.scatter(rows, x="Latitude", y="Temperature", render_mode=render_mode(len(rows)),
+                      color="Mangrove_Species", color_discrete_sequence=SPECIES_COLORS)
+
+#join plot species vs humidity vs temp
+#ols lines come from cached per-partition sums (see mangrove/trendline.py), statsmodels is not needed anymore
+@chart("humidity_temperature", "Humidity Vs Temperature", "Climate", '''The relationship between humidity and temperature for mangrove trees reflects their adaptation to specific coastal climates, highlighting how these factors influence their physiological processes and distribution in their natural habitats.''', workload="rows")
+def humidity_temperature(ctx):
+    import plotly.express as px
+    rows = ctx.rows(["Humidity", "Temperature", "Mangrove_Species"])
+    fig = px.scatter(rows, x="Humidity", y="Temperature", render_mode=render_mode(len(rows)), color="Mangrove_Species",
+                     template="simple_white")
+    return add_trendlines(fig, ctx.store("trendline", TrendlineStore), ctx.regions, ctx.species)
+
+#sunlight vs latitude
+@chart("latitude_sunlight", "Latitude vs Sunlight", "Climate", '''A graph plotting latitude against sunlight exposure for mangrove trees demonstrates how their distribution varies with changing latitudes, revealing patterns of sunlight availability crucial for their growth and ecological niche adaptation along region of Kingdom of Saudi Arabia''', workload="rows")
+def latitude_sunlight(ctx):
+    import plotly.express as px
+    rows = ctx.rows(["Latitude", "Sunlight_Exposure", "Elevation"])
+    return px.scatter(rows, x="Latitude", y="Sunlight_Exposure", render_mode=render_mode(len(rows)),
+                      color="Elevation", color_continuous_scale="Oranges")
+
+# date vs temp
+#drawn from hourly per-partition aggregates instead of every row (see mangrove/timeseries.py),
+#buckets grow from hours to weeks/months with the picked range so the point count stays bounded
+def date_temperature_defaults(ctx):
+    dateRange = ctx.store("time_series", TimeSeriesStore).date_range()
+    if dateRange is None or not dateRange[0] < dateRange[1]:
+        return None
+    return {"start": dateRange[0].to_pydatetime(), "end": dateRange[1].to_pydatetime(), "by": "Mangrove_Species"}
+
+def date_temperature_controls(ctx):
+    dateRange = ctx.store("time_series", TimeSeriesStore).date_range()
+    if dateRange is None or not dateRange[0] < dateRange[1]:
+        return None
+    tsCol1, tsCol2 = st.columns(2)
+    start, end = tsCol1.slider("Date range", min_value=dateRange[0].to_pydatetime(), max_value=dateRange[1].to_pydatetime(),
+                               value=(dateRange[0].to_pydatetime(), dateRange[1].to_pydatetime()))
+    by = tsCol2.radio("Split by", ["Mangrove_Species", "Region"], horizontal=True)
+    return {"start": start, "end": end, "by": by}
+
+@chart("date_temperature", "Date vs Temperature", "Climate", '''Temperature over time shows the seasonal cycle mangroves live through, the line is the mean of each period and the band spans its lowest and highest readings.''',
+       controls=date_temperature_controls, defaults=date_temperature_defaults)
+def date_temperature(ctx, start, end, by):
+    envelope = ctx.store("time_series", TimeSeriesStore).envelope("Temperature", ctx.regions, ctx.species,
+                                                                  by=by, start=start, end=end)
+    return envelope_figure(envelope, by, "Temperature")
+
+#plant height and growth distribution distribution
+#kde merged from cached per-partition grid histograms, rug capped to a fixed sample (see mangrove/density.py)
+@chart("growth_height", "Growth against plant height", "Growth", '''The growth range of a plant typically corresponds to its optimal environmental conditions for growth, including factors like temperature, soil type, and sunlight exposure.
+Plant height, on the other hand, varies depending on genetic traits, species, and environmental factors, often with taller plants requiring more space and resources to thrive.
+Balancing these factors ensures successful cultivation and healthy development of plants in a given environment.''', height=None)
+def growth_height(ctx):
+    return density_figure(ctx.store("density", DensityStore), ['Growth_Rate', 'Plant_Height'], ['Growth Rate', 'Plant Height'],
+                          ctx.regions, ctx.species)
+
+# Calculate average plant height across different mangrove species
+#quartiles and whiskers come from mergeable per-partition t-digests, only outliers are drawn as points (see mangrove/boxstats.py)
+@chart("plant_height_box", "Average plant height across different species", "Growth", '''A graph representing mangrove tree height illustrates the vertical growth pattern of these unique coastal trees over time or across different environmental conditions.''', height=None)
+def plant_height_box(ctx):
+    return box_figure(ctx.store("box", BoxStore), "Plant_Height", SPECIES_GREENS, ctx.regions, ctx.species)
+
+#average growth rate
+@chart("growth_rate_box", "Average growth rates", "Growth", '''A graph representing the growth rate of mangrove trees demonstrates the speed of their vertical development over time, providing insights into their dynamic growth patterns in various habitats.''', height=None)
+def growth_rate_box(ctx):
+    return box_figure(ctx.store("box", BoxStore), "Growth_Rate", SPECIES_GREENS, ctx.regions, ctx.species)
+
+# Scatter plot for Soil Moisture vs Salinity vs organic matter
+#more soil dimensions can be added, past SPLOM_ROWS selected rows every panel is a heatmap of cached
+#per-partition 2d bins instead of one marker per row and panel (see mangrove/splom.py)
+def soil_matrix_defaults(ctx):
+    columns = ctx.store("splom", SplomStore).columns
+    return {"dimensions": tuple(column for column in SPLOM_COLUMNS if column in columns)}
+
+def soil_matrix_controls(ctx):
+    defaults = soil_matrix_defaults(ctx)["dimensions"]
+    dimensions = st.multiselect("Soil dimensions", ctx.store("splom", SplomStore).columns, default=list(defaults))
+    return {"dimensions": tuple(dimensions or defaults)}
+
+@chart("soil_matrix", "Soil Moisture vs Salinity vs Organic matter", "Soil & water", '''A scatter plot illustrating soil moisture, salinity, and organic matter provides a visual representation of their relationship in a given area.
+Each point on the plot represents a specific soil sample, showing how moisture levels, salinity, and organic matter content vary across the sample set.
+Analyzing this plot can reveal correlations, patterns, or potential trends between these important soil properties, aiding in agricultural or environmental assessments and decision-making processes.''',
+       controls=soil_matrix_controls, defaults=soil_matrix_defaults)
+def soil_matrix(ctx, dimensions):
+    if not dimensions: #no soil readings in the selection
+        return None
+    store = ctx.store("splom", SplomStore)
+    rows = store.count(ctx.regions, ctx.species)
+    if rows > SPLOM_ROWS:
+        caption = f"{rows} records binned into {store.bins}x{store.bins} cells per panel, histograms on the diagonal."
+        return splom_figure(store, dimensions, SPECIES_COLORS, ctx.regions, ctx.species), caption
+    import plotly.express as px
+    return px.scatter_matrix(ctx.rows(list(dimensions) + ["Mangrove_Species"]), dimensions=list(dimensions),
+                             color="Mangrove_Species", color_discrete_sequence=SPECIES_COLORS)
+
+#soil moist vs precipitation
+@chart("soil_moisture_precipitation", "Soil Moisture vs Precipitation", "Soil & water", '''A graph depicting soil moisture versus precipitation for mangrove trees showcases the correlation between rainfall levels and soil moisture content in their habitats,
+offering insights into the ecological relationship between precipitation patterns and the water availability crucial for mangrove growth and survival.''', workload="rows")
+def soil_moisture_precipitation(ctx):
+    import plotly.express as px
+    rows = ctx.rows(["Soil_Moisture", "Precipitation", "Mangrove_Species", "Growth_Rate"])
+    return px.scatter(rows, x="Soil_Moisture", y="Precipitation", render_mode=render_mode(len(rows)),
+                      color="Mangrove_Species", size ='Growth_Rate', color_discrete_sequence=SPECIES_GREENS)
+
+#tidal vs precipitation
+@chart("tidal_precipitation", "Tidal Inundation vs Precipitation", "Soil & water", '''A graph depicting the relationship between tidal variation and precipitation for mangrove trees reveals how these environmental factors interact to shape the hydrological conditions crucial for the growth and resilience of mangrove ecosystems''', workload="rows")
+def tidal_precipitation(ctx):
+    import plotly.express as px
+    rows = ctx.rows(["Tidal_Inundation", "Precipitation", "Soil_Moisture", "Plant_Height"])
+    return px.scatter(rows, x="Tidal_Inundation", y="Precipitation", render_mode=render_mode(len(rows)),
+                      color="Soil_Moisture", size="Plant_Height", color_continuous_scale="bugn_r")
+
+#soil moisture vs water depth
+@chart("soil_moisture_water_depth", "Soil Moisture vs Water Depth", "Soil & water", '''Mangroves thrive in areas where soil moisture levels are consistently high, often correlating with shallow water depths.
+This symbiotic relationship ensures adequate water supply for root systems while also facilitating nutrient uptake.
+However, excessive water depth can lead to waterlogging, hindering oxygen availability to roots and impeding growth.
+Thus, an optimal balance between soil moisture and water depth is essential for the successful growth and sustainability of mangrove ecosystems.''', workload="rows")
+def soil_moisture_water_depth(ctx):
+    import plotly.express as px
+    rows = ctx.rows(["Soil_Moisture", "Water_Depth", "Plant_Height"])
+    return px.scatter(rows, x="Soil_Moisture", y="Water_Depth", render_mode=render_mode(len(rows)),
+                      color="Water_Depth", size="Plant_Height", color_continuous_scale="blues_r")
+
+#corelation matrix
+#assembled from per-partition sums and cross-products instead of rescanning the rows (see mangrove/corrstats.py)
+@chart("correlation", "Corelation matrix", "Correlation", '''A correlation matrix of mangrove data incorporates multiple factors to explore their interrelationships within the ecosystem.
+By analyzing correlations between variables such as soil moisture, salinity, temperature, precipitation, sunlight exposure, and tidal variation, researchers can identify patterns and dependencies.
+Strong positive correlations suggest variables that tend to increase or decrease together, indicating potential cause-effect relationships or shared environmental influences.
+Conversely, negative correlations imply variables that change in opposite directions.
+Understanding these correlations helps unveil the complex dynamics shaping mangrove ecosystems, aiding in conservation efforts and sustainable management strategies.''')
+def correlation(ctx):
+    import plotly.express as px
+    corr = ctx.store("correlation", CorrelationStore).corr(ctx.regions, ctx.species)
+    fig = px.imshow(corr, labels=dict(color="Corelation"), color_continuous_scale=DEFAULT_HEATMAP_COLOR, text_auto=True)
+    fig.update_layout(
+        font=dict(
+            #family="Courier New, monospace",
+            size=18
+        )
+    )
+    fig.update_layout(height=700)
+    return fig
@@ -0,0 +1,46 @@
+import hashlib
+import os
+import tempfile
+
+#typed columnar copy of a source (dtypes from mangrove/schema.py), written once per source version and memory-mapped on startup.
+#the cache lives in MANGROVE_CACHE_DIR (default .mangrove_cache next to the scripts).
+CACHE_DIR = os.environ.get("MANGROVE_CACHE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".mangrove_cache")
+VERSION_KEY = b"mangrove.source_version"
+
+def cache_path(source):
+    name = hashlib.sha1(str(source).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{name}.arrow")
+
+#version the cached file was built from, None when there is no usable cache
+def cached_version(source):
+    try:
+        import pyarrow as pa
+        with pa.memory_map(cache_path(source), "r") as source_file:
+            metadata = pa.ipc.open_file(source_file).schema.metadata or {}
+    except (ImportError, OSError, ValueError):
+        return None
+    version = metadata.get(VERSION_KEY)
+    return version.decode("utf-8") if version else None
+
+#zero-copy where arrow allows it, float columns without nulls stay backed by the mapped file
+def read_columnar(source):
+    import pyarrow as pa
+    table = pa.ipc.open_file(pa.memory_map(cache_path(source), "r")).read_all()
+    return table.to_pandas(split_blocks=True)
+
+#arrow IPC file without compression so it can be memory-mapped, replaced atomically
+def write_columnar(source, df, version):
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), VERSION_KEY: version.encode("utf-8")})
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmpPath = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmpPath, cache_path(source))
+    except BaseException:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+        raise
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from mangrove.partitions import PartitionStore
+
+def numeric_columns(df):
+    return list(df.select_dtypes("number").columns)
+
+#pairwise sufficient statistics per partition: for columns i, j over the rows where both are present
+#n[i, j], sum x_i, sum x_i^2 and sum x_i*x_j. values are shifted by a fixed per-column offset first,
+#which leaves correlations unchanged but keeps the sums from cancelling on long histories.
+class CorrelationStore(PartitionStore):
+    def __init__(self, columns, shift=None):
+        super().__init__()
+        self.columns = list(columns)
+        self.shift = np.zeros(len(self.columns)) if shift is None else np.asarray(shift, dtype="float64")
+
+    @classmethod
+    def configured(cls, df, **params):
+        columns = params.setdefault("columns", numeric_columns(df))
+        params.setdefault("shift", np.nan_to_num(df[columns].mean().to_numpy(dtype="float64")))
+        return super().configured(df, **params)
+
+    def summarize(self, part):
+        values = part[self.columns].to_numpy(dtype="float64") - self.shift
+        present = ~np.isnan(values)
+        weights = present.astype("float64")
+        values = np.where(present, values, 0.0)
+        return (weights.T @ weights, values.T @ weights, (values * values).T @ weights, values.T @ values)
+
+    def combine(self, a, b):
+        return tuple(x + y for x, y in zip(a, b))
+
+    #pearson matrix of the selection, same as DataFrame.corr(numeric_only=True) on the selected rows
+    def corr(self, regions=None, species=None):
+        stats = self.select(regions, species)
+        k = len(self.columns)
+        if stats is None:
+            return pd.DataFrame(np.full((k, k), np.nan), index=self.columns, columns=self.columns)
+        n, sums, squares, products = stats
+        with np.errstate(divide="ignore", invalid="ignore"):
+            meanI = sums / n
+            meanJ = sums.T / n
+            cov = products / n - meanI * meanJ
+            varI = squares / n - meanI ** 2
+            varJ = squares.T / n - meanJ ** 2
+            result = cov / np.sqrt(varI * varJ)
+        result[(n < 2) | (varI <= 0) | (varJ <= 0)] = np.nan
+        result = np.clip(result, -1.0, 1.0)
+        diagonal = np.diag(result).copy()
+        np.fill_diagonal(result, np.where(np.isnan(diagonal), np.nan, 1.0))
+        return pd.DataFrame(result, index=self.columns, columns=self.columns)
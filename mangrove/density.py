@@ -0,0 +1,113 @@
+import numpy as np
+
+from mangrove.partitions import PartitionStore, rebin, widen_ranges
+
+DENSITY_COLUMNS = ["Growth_Rate", "Plant_Height"]
+GRID_SIZE = 1024 #fine histogram every partition keeps, the kde is smoothed on this grid
+RUG_SIZE = 300 #rug points per curve whatever the number of rows
+CURVE_POINTS = 500
+COLORS = ["rgb(31, 119, 180)", "rgb(255, 127, 14)", "rgb(44, 160, 44)", "rgb(214, 39, 40)"]
+
+#per partition and column: counts on a fixed grid, n/sum/sum of squares, min/max and a bottom-k rug sample.
+#bottom-k keeps the values with the smallest random priorities, so merged samples are still uniform.
+#values outside the grid range are counted in the edge cells unless the store is widened first.
+class DensityStore(PartitionStore):
+    def __init__(self, ranges, gridSize=GRID_SIZE, rugSize=RUG_SIZE, seed=0):
+        super().__init__()
+        self.ranges = {column: (float(low), float(high)) for column, (low, high) in ranges.items()}
+        self.gridSize = gridSize
+        self.rugSize = rugSize
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def configured(cls, df, columns=DENSITY_COLUMNS, **params):
+        if "ranges" not in params:
+            params["ranges"] = {}
+            for column in columns:
+                low, high = float(df[column].min()), float(df[column].max())
+                pad = (high - low) * 0.1 or 1.0
+                params["ranges"][column] = (low - pad, high + pad)
+        return super().configured(df, **params)
+
+    #partials are replaced, copies handed out earlier keep their ranges and counts
+    def widen(self, df):
+        ranges, steps = widen_ranges(self.ranges, df, self.gridSize)
+        if steps:
+            self.ranges = ranges
+            self.parts = {key: {column: dict(stats, counts=rebin(stats["counts"], steps.get(column, [])))
+                                for column, stats in partial.items()} for key, partial in self.parts.items()}
+        return self
+
+    def summarize(self, part):
+        partial = {}
+        for column, (low, high) in self.ranges.items():
+            values = part[column].to_numpy(dtype="float64")
+            values = values[~np.isnan(values)]
+            cells = np.clip(((values - low) / (high - low) * self.gridSize).astype(np.int64), 0, self.gridSize - 1)
+            priority = self.rng.random(len(values))
+            keep = np.argsort(priority)[:self.rugSize]
+            partial[column] = {
+                "counts": np.bincount(cells, minlength=self.gridSize),
+                "n": len(values), "sum": values.sum(), "squares": (values * values).sum(),
+                "min": values.min() if len(values) else np.inf, "max": values.max() if len(values) else -np.inf,
+                "priority": priority[keep], "sample": values[keep]}
+        return partial
+
+    def combine(self, a, b):
+        merged = {}
+        for column in a:
+            x, y = a[column], b[column]
+            priority = np.concatenate([x["priority"], y["priority"]])
+            keep = np.argsort(priority)[:self.rugSize]
+            merged[column] = {
+                "counts": x["counts"] + y["counts"], "n": x["n"] + y["n"],
+                "sum": x["sum"] + y["sum"], "squares": x["squares"] + y["squares"],
+                "min": min(x["min"], y["min"]), "max": max(x["max"], y["max"]),
+                "priority": priority[keep], "sample": np.concatenate([x["sample"], y["sample"]])[keep]}
+        return merged
+
+    #gaussian kde with scott's bandwidth (what create_distplot uses) from the merged grid counts, via fft
+    def density(self, column, regions=None, species=None):
+        partial = self.select(regions, species)
+        if partial is None or partial[column]["n"] < 2:
+            return None
+        stats = partial[column]
+        low, high = self.ranges[column]
+        n = stats["n"]
+        step = (high - low) / self.gridSize
+        centers = low + step * (np.arange(self.gridSize) + 0.5)
+        std = np.sqrt(max(stats["squares"] - stats["sum"] ** 2 / n, 0.0) / (n - 1))
+        bandwidth = max(std * n ** (-1 / 5), step)
+        offsets = np.arange(-self.gridSize, self.gridSize) * step
+        kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+        size = 4 * self.gridSize
+        smoothed = np.fft.irfft(np.fft.rfft(stats["counts"], size) * np.fft.rfft(kernel, size), size)
+        grid = smoothed[self.gridSize:2 * self.gridSize] / n
+        x = np.linspace(stats["min"], stats["max"], CURVE_POINTS)
+        return {"n": n, "centers": centers, "counts": stats["counts"], "min": stats["min"], "max": stats["max"],
+                "x": x, "y": np.interp(x, centers, np.clip(grid, 0, None)), "rug": stats["sample"]}
+
+#same layout as ff.create_distplot (histogram + kde on top, rug below) built from the cached densities
+def density_figure(store, columns, labels, regions=None, species=None, binSize=1.0):
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for i, (column, label) in enumerate(zip(columns, labels)):
+        density = store.density(column, regions, species)
+        if density is None:
+            continue
+        color = COLORS[i % len(COLORS)]
+        edges = np.arange(density["min"], density["max"] + binSize, binSize)
+        hist, edges = np.histogram(density["centers"], bins=edges, weights=density["counts"])
+        fig.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=hist / (density["n"] * binSize), width=binSize,
+                             name=label, legendgroup=label, marker=dict(color=color), opacity=0.7,
+                             xaxis="x1", yaxis="y1"))
+        fig.add_trace(go.Scatter(x=density["x"], y=density["y"], mode="lines", name=label, legendgroup=label,
+                                 showlegend=False, marker=dict(color=color), xaxis="x1", yaxis="y1"))
+        fig.add_trace(go.Scatter(x=density["rug"], y=[label] * len(density["rug"]), mode="markers", name=label,
+                                 legendgroup=label, showlegend=False, text=None,
+                                 marker=dict(color=color, symbol="line-ns-open"), xaxis="x1", yaxis="y2"))
+    fig.update_layout(barmode="overlay", bargap=0, hovermode="closest", legend=dict(traceorder="reversed"),
+                      xaxis1=dict(domain=[0.0, 1.0], anchor="y2", zeroline=False),
+                      yaxis1=dict(domain=[0.35, 1], anchor="free", position=0.0),
+                      yaxis2=dict(domain=[0, 0.25], anchor="x1", dtick=1, showticklabels=False))
+    return fig
@@ -0,0 +1,95 @@
+#pre-renders every chart of the dashboard for the current data version and a set of sidebar picks, at the
+#charts' default options, in a process pool. the page then reads these files instead of building the figures
+#(see mangrove/snapshots.py). picks: "singles" is no filter, every region, every species and every
+#region/species pair, "all" is every combination of the sidebar multiselects
+#python -m mangrove.export [--picks singles|all] [--workers 8] [--html] [--force]
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mangrove import payload, snapshots
+from mangrove.backends import open_backend
+from mangrove.charts import CHARTS, ChartContext, chart_json, snapshot_for
+from mangrove.payload import load_figure
+from mangrove.precompute import WORKERS
+
+#per worker process: the backend the page would use and its data version
+_backend = None
+_version = None
+
+def _init_worker():
+    global _backend, _version
+    _backend, _version = open_backend()
+
+def subsets(values):
+    return [list(combo) for size in range(len(values) + 1) for combo in itertools.combinations(values, size)]
+
+def make_picks(backend, mode="singles"):
+    regions, species = backend.values("Region"), backend.values("Mangrove_Species")
+    if mode == "all":
+        return [(r, s) for r in subsets(regions) for s in subsets(species)]
+    return [([], [])] + [([r], []) for r in regions] + [([], [s]) for s in species] + \
+           [([r], [s]) for r in regions for s in species]
+
+#every chart for one pick, returns manifest entries of what was written
+def _export(task):
+    regions, species, version, html, force = task
+    if _version != version:
+        raise RuntimeError(f"worker loaded data version {_version}, the export is for {version}")
+    ctx = ChartContext(_backend, regions, species, version)
+    entries = []
+    for chart in CHARTS.values():
+        options = chart.default_options(ctx)
+        if options is None:
+            continue
+        key = snapshot_for(chart, ctx, options)
+        if not force and os.path.exists(snapshots.snapshot_path(version, key)):
+            continue
+        result = chart_json(chart, ctx, options, snapshots=False)
+        if result is None:
+            continue
+        figJson, caption = result
+        page = load_figure(figJson).to_html(include_plotlyjs="cdn", full_html=True) if html else None
+        size = snapshots.save_snapshot(version, key, figJson, caption, page)
+        entries.append({"key": key, "chart": chart.name, "backend": ctx.backend.name, "regions": [str(r) for r in regions],
+                        "species": [str(s) for s in species], "options": repr(sorted(options.items())), "bytes": size})
+    return entries
+
+#workers=0 runs the same tasks in this process, without a pool
+def export(picks="singles", workers=WORKERS, html=False, force=False):
+    backend, version = open_backend()
+    tasks = [(regions, species, version, html, force) for regions, species in make_picks(backend, picks)]
+    start = time.perf_counter()
+    pool = None
+    if workers == 0:
+        _init_worker()
+        results = map(_export, tasks)
+    else:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker)
+        results = pool.map(_export, tasks)
+    try:
+        entries = [entry for result in results for entry in result]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    snapshots.save_manifest(version, entries)
+    snapshots.prune()
+    return version, len(tasks), entries, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="pre-render the dashboard figures")
+    parser.add_argument("--picks", choices=["singles", "all"], default="singles")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--html", action="store_true", help="also write a standalone html page per figure")
+    parser.add_argument("--force", action="store_true", help="rebuild snapshots that exist already")
+    args = parser.parse_args()
+    version, picks, entries, seconds = export(args.picks, args.workers, args.html, args.force)
+    size = sum(entry["bytes"] for entry in entries)
+    print(f"{len(entries)} figures for {picks} picks of {version} in {seconds:.1f}s with {args.workers} workers, "
+          f"{size / 2**20:.1f} MB (typed arrays: {payload.BINARY_ARRAYS})")
+    print(f"saved to {snapshots.version_dir(version)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+FILTER_COLUMNS = ("Region", "Mangrove_Species")
+
+#row-position bitmaps per category value, built once per data version (see loader.derived).
+#bitmaps are packed (one bit per row), OR-ed within a column and AND-ed across columns,
+#so an unfiltered page hands the shared frame to the charts without copying it.
+#a bitmap may hold bytes past self.rows (spare capacity for appended rows), only the first rows bits count
+class FilterIndex:
+    def __init__(self, df, columns=FILTER_COLUMNS):
+        self.rows = len(df)
+        self.bitmaps = {}
+        self.order = {}
+        for column in columns:
+            codes, uniques = pd.factorize(df[column], sort=False)
+            self.order[column] = list(uniques)
+            self.bitmaps[column] = {value: np.packbits(codes == i) for i, value in enumerate(uniques)}
+
+    #values in order of first appearance, same as df[column].unique() for the sidebar
+    def values(self, column):
+        return self.order[column]
+
+    #OR of the chosen values, None when nothing is chosen (no filter on this column)
+    def bitmap(self, column, values):
+        if not values:
+            return None
+        bitmaps = self.bitmaps[column]
+        size = (self.rows + 7) // 8
+        result = np.zeros(size, dtype=np.uint8)
+        for value in values:
+            if value in bitmaps:
+                np.bitwise_or(result, bitmaps[value][:size], out=result)
+        return result
+
+    #index over the frame with rows appended below it (live tail), only the new rows' bits are written.
+    #the bitmaps are shared with this index, which keeps reading its own rows only, and grow by doubling
+    def appended(self, rows):
+        index = object.__new__(type(self))
+        index.rows = self.rows + len(rows)
+        index.order = {column: list(order) for column, order in self.order.items()}
+        index.bitmaps = {column: dict(bitmaps) for column, bitmaps in self.bitmaps.items()}
+        first, size = self.rows // 8, (index.rows + 7) // 8
+        for column, bitmaps in index.bitmaps.items():
+            codes, uniques = pd.factorize(rows[column], sort=False)
+            known = {value: i for i, value in enumerate(uniques)}
+            for value in known:
+                if value not in bitmaps:
+                    index.order[column].append(value)
+                    bitmaps[value] = np.zeros(0, dtype=np.uint8)
+            for value, bitmap in bitmaps.items():
+                if len(bitmap) < size:
+                    grown = np.zeros(max(2 * len(bitmap), size), dtype=np.uint8)
+                    grown[:len(bitmap)] = bitmap
+                    bitmap = bitmaps[value] = grown
+                hit = codes == known.get(value, -2)
+                bits = np.unpackbits(bitmap[first:size])
+                bits[self.rows - first * 8:index.rows - first * 8] = hit
+                bitmap[first:size] = np.packbits(bits)
+        return index
+
+    #AND across columns, None means every row is selected
+    def select(self, filters):
+        result = None
+        for column, values in filters.items():
+            bitmap = self.bitmap(column, values)
+            if bitmap is not None:
+                result = bitmap if result is None else np.bitwise_and(result, bitmap)
+        return result
+
+    def positions(self, bitmap):
+        if bitmap is None:
+            return np.arange(self.rows)
+        return np.flatnonzero(np.unpackbits(bitmap, count=self.rows))
+
+    def count(self, bitmap):
+        if bitmap is None:
+            return self.rows
+        return int(np.unpackbits(bitmap, count=self.rows).sum())
+
+    #the shared frame itself when unfiltered, otherwise only the selected rows are materialized
+    def view(self, df, filters):
+        bitmap = self.select(filters)
+        if bitmap is None:
+            return df
+        return df.take(self.positions(bitmap))
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from mangrove import backends, columnar, loader, schema
+from mangrove.aggregates import STORES
+from mangrove.backends import ROW_COLUMN, PartitionedBackend
+from mangrove.partitions import PARTITION_COLUMNS
+
+#MANGROVE_STREAM=1 reads a local csv in chunks on a background thread instead of parsing it in one go.
+#every chunk is typed, dated and region-tagged on its own, folded into the chart aggregates and appended
+#to a hive-partitioned parquet copy (Region=/Mangrove_Species=), so peak memory follows CHUNK_ROWS and
+#the aggregate charts render while the rest of the file is still coming in. once done the row-level charts read
+#the partitions they need from that copy (backends.PartitionedBackend), the whole frame is never in memory.
+#the duckdb backend builds its database from the csv itself and is not streamed
+STREAM = os.environ.get("MANGROVE_STREAM", "").lower() in ("1", "true", "yes")
+CHUNK_ROWS = int(os.environ.get("MANGROVE_CHUNK_ROWS", 100000))
+SAMPLE_ROWS = 1000 #rows read up front to pick the column dtypes for every chunk
+
+_lock = threading.Lock()
+_ingests = {}
+
+def partition_dir(source):
+    name = hashlib.sha1(str(source).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(columnar.CACHE_DIR, f"{name}.parts")
+
+#float columns are read as float32 straight away (lat/lon stay float64), so no chunk is ever held as float64.
+#columns the schema does not declare are picked up from a sample
+def chunk_dtypes(path):
+    sample = pd.read_csv(path, encoding=loader.ENCODING, nrows=SAMPLE_ROWS)
+    dtypes = {column: np.float32 for column in sample.columns if sample[column].dtype == np.float64}
+    dtypes.update(schema.csv_dtypes())
+    return dtypes
+
+#firstRow is the file position of the chunk's first row, kept in ROW_COLUMN so reads can restore file order
+def write_partitions(chunk, directory, index, firstRow):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    table = pa.Table.from_pandas(chunk, preserve_index=False)
+    table = table.append_column(ROW_COLUMN, pa.array(np.arange(firstRow, firstRow + len(chunk), dtype=np.int64)))
+    for column in PARTITION_COLUMNS:
+        table = table.set_column(table.schema.get_field_index(column), column, table[column].cast(pa.string()))
+    partitioning = ds.partitioning(pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS]), flavor="hive")
+    ds.write_dataset(table, directory, format="parquet", basename_template=f"chunk-{index:06d}-{{i}}.parquet",
+                     partitioning=partitioning, existing_data_behavior="overwrite_or_ignore")
+
+class StreamingIngest:
+    def __init__(self, source, chunkRows=CHUNK_ROWS, stores=STORES):
+        self.source = source
+        self.sourceVersion = loader.file_version(source)
+        self.chunkRows = chunkRows
+        self.storeClasses = dict(stores)
+        self.stores = {}
+        self.order = {column: [] for column in PARTITION_COLUMNS}
+        self.columns = None
+        self.backend = None #set once done, rows then come from the partitions
+        self.rows = 0
+        self.chunks = 0
+        self.progress = 0.0
+        self.done = False
+        self.error = None
+        self.started = time.perf_counter()
+        self.firstChunkSeconds = None
+        self.seconds = None
+        self.tmpDir = f"{partition_dir(source)}.tmp-{os.getpid()}-{id(self)}"
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def pending(self):
+        return not self.done and self.error is None
+
+    #changes with every chunk, so cached figures are rebuilt as more rows arrive
+    @property
+    def version(self):
+        return f"{self.sourceVersion}:rows:{self.rows}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="mangrove-ingest", daemon=True)
+        self.thread.start()
+        return self
+
+    def run(self):
+        try:
+            self.ingest_chunks()
+            self.finish()
+        except Exception as e:
+            shutil.rmtree(self.tmpDir, ignore_errors=True)
+            self.error = e
+
+    #aggregates and partition files, only one chunk is ever in memory. the first chunk sets the store
+    #ranges and offsets, a later chunk with values outside a range widens it before it is folded in
+    def ingest_chunks(self):
+        shutil.rmtree(self.tmpDir, ignore_errors=True)
+        size = max(os.path.getsize(self.source), 1)
+        dtypes = chunk_dtypes(self.source)
+        with open(self.source, "rb") as f:
+            for chunk in pd.read_csv(f, encoding=loader.ENCODING, dtype=dtypes, chunksize=self.chunkRows):
+                chunk = loader.prepare_frame(chunk)
+                write_partitions(chunk, self.tmpDir, self.chunks, self.rows)
+                self.add(chunk, f.tell() / size)
+
+    #the partitions move in place and the page switches to them with the finished aggregates,
+    #an empty csv leaves no backend and the page loads the file as usual
+    def finish(self):
+        directory = partition_dir(self.source)
+        shutil.rmtree(directory, ignore_errors=True)
+        if not os.path.isdir(self.tmpDir):
+            os.makedirs(self.tmpDir) #empty csv
+        os.replace(self.tmpDir, directory)
+        if self.rows:
+            self.backend = PartitionedBackend(directory, self.columns, self, self.snapshot())
+        self.seconds = time.perf_counter() - self.started
+        self.progress = 1.0
+        self.done = True
+
+    def add(self, chunk, progress):
+        with self.lock:
+            for name, storeClass in self.storeClasses.items():
+                if name in self.stores:
+                    self.stores[name].widen(chunk).update(chunk)
+                else:
+                    self.stores[name] = storeClass.from_frame(chunk)
+            if self.columns is None:
+                self.columns = list(chunk.columns)
+            for column, seen in self.order.items():
+                seen.extend(value for value in chunk[column].unique() if value not in seen)
+            self.rows += len(chunk)
+            self.chunks += 1
+            self.progress = min(progress, 1.0)
+            if self.firstChunkSeconds is None:
+                self.firstChunkSeconds = time.perf_counter() - self.started
+
+    #copies so readers never see a half update
+    def snapshot(self):
+        with self.lock:
+            return {name: store.copy() for name, store in self.stores.items()}
+
+    #sidebar values seen so far, in order of first appearance like FilterIndex.values
+    def values(self, column):
+        with self.lock:
+            return list(self.order[column])
+
+#shared ingest for the source, started once per file version. None when streaming is off, the source
+#is not a local csv or the duckdb backend is used, callers then use open_backend as usual
+def start_ingest(source=None, restart=False):
+    if not STREAM or loader.IN_PYODIDE or backends.BACKEND == "duckdb":
+        return None
+    source = loader.resolve_source(source)
+    if loader.is_url(source) or loader.is_bundle(source):
+        return None
+    with _lock:
+        ingest = _ingests.get(source)
+        if ingest is None or restart or (not ingest.pending and ingest.sourceVersion != loader.file_version(source)):
+            ingest = _ingests[source] = StreamingIngest(source).start()
+        return ingest
@@ -0,0 +1,249 @@
+import hashlib
+import importlib.util
+import os
+import threading
+import time
+from io import BytesIO
+
+import pandas as pd
+
+from mangrove import columnar, perf, schema
+from mangrove.partitions import PartitionStore
+from mangrove.regions import assign_regions
+
+#loaded frames live at module level, so every streamlit session in the server process shares one copy.
+#each entry is keyed by source and remembers the version it was parsed from (ETag, mtime or content hash).
+URL = 'https://raw.githubusercontent.com/Dat-A-rtist/mangroveDashboard/main/synthetic_mangrove_dataset.csv'
+LOCAL_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "synthetic_mangrove_dataset.csv")
+BUNDLE = os.path.join(os.path.dirname(LOCAL_CSV), "mangrove_data.npz") #prepared frame for the browser (see mangrove/bundle.py)
+ENCODING = "ISO-8859-1"
+DEFAULT_TTL = float(os.environ.get("MANGROVE_TTL", 600)) #seconds before the source is checked for a new version
+#MANGROVE_TAIL=1 treats a local csv as append-only: a grown file is checked every TAIL_SECONDS and only the new
+#lines are parsed, region-tagged and folded into the cached frame and stores. anything but an append (the bytes
+#before the old end changed, the file got shorter) falls back to a full reload
+TAIL = os.environ.get("MANGROVE_TAIL", "").lower() in ("1", "true", "yes")
+TAIL_SECONDS = float(os.environ.get("MANGROVE_TAIL_SECONDS", 5))
+TAIL_MARK_BYTES = 4096 #bytes before the parsed end that have to be unchanged for the file to count as appended
+
+IN_PYODIDE = importlib.util.find_spec("pyodide") is not None
+
+_lock = threading.RLock()
+_cache = {}
+
+class _Entry:
+    def __init__(self, version, frame):
+        self.version = version
+        self.frame = frame
+        self.checked = time.monotonic()
+        self.derived = {}
+        self.offset = None #tail mode: bytes of the file the frame holds, its header line and the bytes before the end
+        self.header = None
+        self.mark = None
+        self.buffer = None #tail mode: schema.FrameBuffer the frame is a view of, made on the first append
+
+def is_url(source):
+    return str(source).startswith(("http://", "https://"))
+
+#MANGROVE_DATA points the app at another csv, .npz bundle or url, MANGROVE_OFFLINE=1 forces the bundled csv.
+#under pyodide the .npz bundle index.html mounts is used when it is there
+def resolve_source(source=None):
+    if os.environ.get("MANGROVE_OFFLINE", "").lower() in ("1", "true", "yes"):
+        return LOCAL_CSV
+    if IN_PYODIDE and not (os.environ.get("MANGROVE_DATA") or source) and os.path.exists(BUNDLE):
+        return BUNDLE
+    source = os.environ.get("MANGROVE_DATA") or source or URL
+    return source if is_url(source) else os.path.abspath(source)
+
+def content_hash(content):
+    return "sha256:" + hashlib.sha256(content).hexdigest()
+
+def file_version(path):
+    stat = os.stat(path)
+    return f"mtime:{stat.st_mtime_ns}:{stat.st_size}"
+
+#returns (version, content), content is None when the source still has the known version
+def fetch_source(source, knownVersion=None):
+    if not is_url(source):
+        version = file_version(source)
+        if version == knownVersion:
+            return version, None
+        with open(source, "rb") as f:
+            return version, f.read()
+    if IN_PYODIDE:
+        #needed for standalone streamlite version, no conditional requests there so hash the body
+        from pyodide.http import open_url
+        content = open_url(source).read().encode(ENCODING, errors="replace")
+        version = content_hash(content)
+        return version, (None if version == knownVersion else content)
+    import requests
+    headers = {}
+    if knownVersion and knownVersion.startswith("etag:"):
+        headers["If-None-Match"] = knownVersion[len("etag:"):]
+    r = requests.get(source, headers=headers, timeout=60)
+    if r.status_code == 304:
+        return knownVersion, None
+    r.raise_for_status()
+    etag = r.headers.get("ETag")
+    version = f"etag:{etag}" if etag else content_hash(r.content)
+    return version, (None if version == knownVersion else r.content)
+
+#parse once and derive the columns every chart relies on, then hold the frame to the schema (see mangrove/schema.py)
+def prepare_frame(df):
+    df['Date'] = pd.to_datetime(df['Date']) #clean datetime column
+    with perf.timed("region", rows=len(df)):
+        df["Region"] = assign_regions(df["Latitude"], df["Longitude"]) #generate region
+    return schema.enforce_schema(df)
+
+#readings are parsed straight to float32, the float64 frame never exists
+def parse_csv(content):
+    return prepare_frame(pd.read_csv(BytesIO(content), encoding=ENCODING, dtype=schema.csv_dtypes()))
+
+def is_bundle(source):
+    return str(source).endswith(".npz")
+
+#a bundle already holds the prepared frame, anything else is csv
+def parse_content(content, source):
+    if is_bundle(source):
+        from mangrove.bundle import read_bundle
+        return read_bundle(content)
+    return parse_csv(content)
+
+#a new csv version is parsed once and written to the columnar cache, later cold starts only map that file
+#timed as stages (see mangrove/perf.py), parse includes region
+def _read_version(version, content, source):
+    if content is None:
+        with perf.timed("read_columnar") as stage:
+            frame = columnar.read_columnar(source)
+            stage["rows"] = len(frame)
+        return frame
+    with perf.timed("parse") as stage:
+        frame = parse_content(content, source)
+        stage["rows"] = len(frame)
+    try:
+        with perf.timed("write_columnar", rows=len(frame)):
+            columnar.write_columnar(source, frame, version)
+    except (ImportError, OSError):
+        return frame #no pyarrow (pyodide) or read-only disk, keep the parsed frame
+    return columnar.read_columnar(source)
+
+def tails(source=None):
+    source = resolve_source(source)
+    return TAIL and not IN_PYODIDE and not is_url(source) and not is_bundle(source)
+
+#offset is what was parsed, or the size in the version (mtime:<ns>:<size>) for a frame from the columnar cache
+def _start_tail(entry, source, offset=None):
+    offset = int(entry.version.rsplit(":", 1)[1]) if offset is None else offset
+    with open(source, "rb") as f:
+        entry.header = f.readline()
+        f.seek(max(offset - TAIL_MARK_BYTES, 0))
+        entry.mark = f.read(min(offset, TAIL_MARK_BYTES))
+    entry.offset = offset
+
+#complete lines written after entry.offset, None when the file was not just appended to
+def _read_appended(entry, source, size):
+    if size < entry.offset:
+        return None
+    with open(source, "rb") as f:
+        f.seek(entry.offset - len(entry.mark))
+        if f.read(len(entry.mark)) != entry.mark:
+            return None
+        appended = f.read(size - entry.offset)
+    return appended[:appended.rfind(b"\n") + 1] #a line still being written waits for the next check
+
+#parses only the new lines and folds them into the entry. the frame is replaced by a view of the grown buffer
+#(readers keep the one they have), stores and indexes are extended with the new rows on copies for the same reason,
+#other derived values are dropped and rebuilt on demand
+def _append(entry, source, version):
+    size = int(version.rsplit(":", 1)[1])
+    appended = _read_appended(entry, source, size)
+    if appended is None:
+        return False
+    if appended:
+        with perf.timed("tail", "parse") as stage:
+            rows = prepare_frame(pd.read_csv(BytesIO(entry.header + appended), encoding=ENCODING, dtype=schema.csv_dtypes()))
+            stage["rows"], stage["bytes"] = len(rows), len(appended)
+        with perf.timed("tail", "append", rows=len(rows)):
+            if entry.buffer is None:
+                entry.buffer = schema.FrameBuffer(entry.frame)
+            frame = entry.buffer.append(rows)
+            derivedValues = {}
+            for name, value in entry.derived.items():
+                if isinstance(value, PartitionStore):
+                    derivedValues[name] = value.copy().update(rows)
+                elif hasattr(value, "appended"): #FilterIndex, GridIndex
+                    derivedValues[name] = value.appended(rows)
+        entry.frame, entry.derived = frame, derivedValues
+        entry.offset += len(appended)
+        entry.mark = (entry.mark + appended)[-TAIL_MARK_BYTES:]
+    entry.version = version
+    entry.checked = time.monotonic()
+    return True
+
+def _current_entry(source, ttl):
+    entry = _cache.get(source)
+    if entry is not None and entry.offset is not None:
+        ttl = min(ttl, TAIL_SECONDS)
+    if entry is not None and time.monotonic() - entry.checked < ttl:
+        return entry
+    if entry is not None and entry.offset is not None:
+        with perf.timed("fetch", "tail"):
+            version = file_version(source)
+        if version == entry.version or _append(entry, source, version):
+            entry.checked = time.monotonic()
+            return entry
+    knownVersion = entry.version if entry else columnar.cached_version(source)
+    with perf.timed("fetch", "url" if is_url(source) else "file"):
+        version, content = fetch_source(source, knownVersion)
+    if content is None and entry is not None:
+        entry.checked = time.monotonic()
+        return entry
+    entry = _Entry(version, _read_version(version, content, source))
+    entry.derived.update(_precomputed(source, version))
+    if tails(source):
+        _start_tail(entry, source, None if content is None else len(content))
+    _cache[source] = entry
+    return entry
+
+#stores saved by python -m mangrove.precompute for exactly this version, the page then never builds them
+def _precomputed(source, version):
+    from mangrove.aggregates import load_aggregates
+    return load_aggregates(source, version) or {}
+
+#shared, read-only frame for the source, callers must copy before mutating it
+def load_data(source=None, ttl=DEFAULT_TTL):
+    return load_versioned(source, ttl)[0]
+
+#frame and the version it was parsed from, read together so they always match
+def load_versioned(source=None, ttl=DEFAULT_TTL):
+    source = resolve_source(source)
+    with _lock:
+        entry = _current_entry(source, ttl)
+        return entry.frame, entry.version
+
+def data_version(source=None, ttl=DEFAULT_TTL):
+    source = resolve_source(source)
+    with _lock:
+        return _current_entry(source, ttl).version
+
+#memoizes build(frame) next to the loaded frame, dropped together with it when the source changes.
+#pass the frame the caller is using so a version flip mid-rerun never pairs it with another frame's value.
+#with a frame the source is not checked again, the value is only memoized when the frame is the cached one
+def derived(name, build, source=None, ttl=DEFAULT_TTL, frame=None):
+    source = resolve_source(source)
+    with _lock:
+        entry = _cache.get(source) if frame is not None else _current_entry(source, ttl)
+        if frame is not None and (entry is None or frame is not entry.frame):
+            with perf.timed("derive", name, rows=len(frame)):
+                return build(frame)
+        if name not in entry.derived:
+            with perf.timed("derive", name, rows=len(entry.frame)):
+                entry.derived[name] = build(entry.frame)
+        return entry.derived[name]
+
+#drop one source, or everything when source is None, the next load_data fetches again
+def invalidate(source=None):
+    with _lock:
+        if source is None:
+            _cache.clear()
+        else:
+            _cache.pop(resolve_source(source), None)
@@ -0,0 +1,131 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from mangrove.partitions import PartitionStore
+from mangrove.regions import regions
+
+#above MAP_POINT_LIMIT visible rows the map switches from markers to grid cells,
+#and never sends more than MAP_MAX_CELLS cells whatever the number of rows
+MAP_POINT_LIMIT = int(os.environ.get("MANGROVE_MAP_POINTS", 20000))
+MAP_MAX_CELLS = int(os.environ.get("MANGROVE_MAP_CELLS", 2000))
+MAP_STORE_ZOOM = 9 #finest zoom the cell store keeps, closer zooms bin the rows themselves
+CELLS_PER_TILE = 16 #a 256px map tile is split into 16x16 cells, roughly 16px per cell on screen
+MAP_WIDTH_PX = 1400
+MAP_HEIGHT_PX = 700
+
+#centre of every region box plus the whole coast, offered as map views in the dashboard
+def map_views(regions=regions):
+    lats = [v for region in regions for v in region["latitude"]]
+    lons = [v for region in regions for v in region["longitude"]]
+    views = {"All regions": ((min(lats) + max(lats)) / 2, (min(lons) + max(lons)) / 2, 5)}
+    for region in regions:
+        views[region["name"]] = (sum(region["latitude"]) / 2, sum(region["longitude"]) / 2, 7)
+    return views
+
+#degrees covered by one cell at a mapbox zoom level
+def cell_size(zoom):
+    return 360.0 / (2 ** zoom) / CELLS_PER_TILE
+
+#lat/lon box shown by the map at that centre and zoom, widened by margin screens on every side
+def viewport(center, zoom, margin=0.5):
+    lonSpan = 360.0 / (2 ** zoom) * MAP_WIDTH_PX / 256
+    latSpan = lonSpan * MAP_HEIGHT_PX / MAP_WIDTH_PX * math.cos(math.radians(center[0]))
+    lonSpan *= 1 + 2 * margin
+    latSpan *= 1 + 2 * margin
+    return (center[0] - latSpan / 2, center[0] + latSpan / 2,
+            center[1] - lonSpan / 2, center[1] + lonSpan / 2)
+
+def in_box(df, box):
+    lat = df["Latitude"].to_numpy()
+    lon = df["Longitude"].to_numpy()
+    return (lat >= box[0]) & (lat <= box[1]) & (lon >= box[2]) & (lon <= box[3])
+
+#cell columns a map selection is read back from (see charts.selection_area), exact in the float32 payload
+CELL_COLUMNS = ["Lat_Cell", "Lon_Cell", "Cell_Deg"]
+
+def with_cells(cells, cellDeg):
+    cells["Lat_Cell"] = cells.index.get_level_values(0).astype(np.int64)
+    cells["Lon_Cell"] = cells.index.get_level_values(1).astype(np.int64)
+    cells["Cell_Deg"] = cellDeg
+    return cells.reset_index(drop=True)
+
+#one row per occupied grid cell: centroid, point count, mean growth rate, dominant species and the cell itself
+def bin_points(df, cellDeg):
+    keys = [np.floor(df["Latitude"].to_numpy() / cellDeg).astype(np.int64),
+            np.floor(df["Longitude"].to_numpy() / cellDeg).astype(np.int64)]
+    grouped = df.groupby(keys, sort=False)
+    cells = grouped.agg(Latitude=("Latitude", "mean"), Longitude=("Longitude", "mean"),
+                        Count=("Growth_Rate", "size"), Growth_Rate=("Growth_Rate", "mean"))
+    speciesCounts = df.groupby(keys + [df["Mangrove_Species"].to_numpy()], sort=False).size().unstack(fill_value=0)
+    cells["Mangrove_Species"] = speciesCounts.idxmax(axis=1).reindex(cells.index)
+    return with_cells(cells, cellDeg)
+
+#raw markers when few rows are visible, otherwise cells at the zoom's resolution, coarsened until they fit
+def map_frame(df, zoom, center, limit=MAP_POINT_LIMIT, maxCells=MAP_MAX_CELLS):
+    visible = df[in_box(df, viewport(center, zoom))]
+    if len(visible) <= limit:
+        return visible, False
+    cellDeg = cell_size(zoom)
+    cells = bin_points(visible, cellDeg)
+    while len(cells) > maxCells:
+        cellDeg *= 2
+        cells = bin_points(visible, cellDeg)
+    return cells, True
+
+#per partition cell sums at MAP_STORE_ZOOM: count, latitude/longitude sums for the centroid and growth rate sums.
+#a coarser zoom is exactly the same cells as binning the rows there, since floor(floor(x / c) / 2^k) == floor(x / (c * 2^k))
+class MapBinStore(PartitionStore):
+    def __init__(self, zoom=MAP_STORE_ZOOM):
+        super().__init__()
+        self.zoom = zoom
+
+    def summarize(self, part):
+        cellDeg = cell_size(self.zoom)
+        growth = part["Growth_Rate"].to_numpy(dtype="float64")
+        cells = pd.DataFrame({"Count": 1, "Latitude": part["Latitude"].to_numpy(dtype="float64"),
+                              "Longitude": part["Longitude"].to_numpy(dtype="float64"),
+                              "Growth": np.nan_to_num(growth), "GrowthCount": (~np.isnan(growth)).astype(np.int64),
+                              "Lat": np.floor(part["Latitude"].to_numpy() / cellDeg).astype(np.int64),
+                              "Lon": np.floor(part["Longitude"].to_numpy() / cellDeg).astype(np.int64)})
+        return cells.groupby(["Lat", "Lon"]).sum()
+
+    def combine(self, a, b):
+        return a.add(b, fill_value=0)
+
+    def count(self, box, regions=None, species=None):
+        total = self.select(regions, species)
+        if total is None:
+            return 0
+        lat, lon = total["Latitude"] / total["Count"], total["Longitude"] / total["Count"]
+        return int(total["Count"][(lat >= box[0]) & (lat <= box[1]) & (lon >= box[2]) & (lon <= box[3])].sum())
+
+    #same frame as bin_points on the rows in the viewport, coarsened until at most maxCells cells are left
+    def cells(self, zoom, center, regions=None, species=None, maxCells=MAP_MAX_CELLS):
+        bySpecies = self.group(1, regions, species)
+        if not bySpecies:
+            return pd.DataFrame(columns=["Latitude", "Longitude", "Count", "Growth_Rate", "Mangrove_Species"] + CELL_COLUMNS)
+        frame = pd.concat([cells.assign(Mangrove_Species=name) for name, cells in bySpecies.items()]).reset_index()
+        box = viewport(center, zoom)
+        inside = (frame["Latitude"] >= box[0] * frame["Count"]) & (frame["Latitude"] <= box[1] * frame["Count"]) & \
+                 (frame["Longitude"] >= box[2] * frame["Count"]) & (frame["Longitude"] <= box[3] * frame["Count"])
+        frame = frame[inside]
+        factor = 2 ** max(self.zoom - zoom, 0)
+        while True:
+            result = self._coarsen(frame, factor)
+            if len(result) <= maxCells:
+                return result
+            factor *= 2
+
+    def _coarsen(self, frame, factor):
+        keys = [frame["Lat"].to_numpy() // factor, frame["Lon"].to_numpy() // factor]
+        sums = frame.groupby(keys, sort=False)[["Count", "Latitude", "Longitude", "Growth", "GrowthCount"]].sum()
+        speciesCounts = frame.groupby(keys + [frame["Mangrove_Species"].to_numpy()], sort=False)["Count"].sum().unstack(fill_value=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result = pd.DataFrame({"Latitude": sums["Latitude"] / sums["Count"], "Longitude": sums["Longitude"] / sums["Count"],
+                                   "Count": sums["Count"].astype(np.int64),
+                                   "Growth_Rate": sums["Growth"] / sums["GrowthCount"].replace(0, np.nan)})
+        result["Mangrove_Species"] = speciesCounts.idxmax(axis=1).reindex(result.index)
+        return with_cells(result, cell_size(self.zoom) * factor)
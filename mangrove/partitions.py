@@ -0,0 +1,105 @@
+from functools import reduce
+
+import numpy as np
+
+#every page statistic can be assembled from per-(Region, Mangrove_Species) partials, so stores keep
+#one partial per partition and merge the selected ones instead of going back to the rows
+PARTITION_COLUMNS = ("Region", "Mangrove_Species")
+
+#an empty selection means no filter, same as the sidebar multiselects
+def selected(key, regions=None, species=None):
+    return (not regions or key[0] in regions) and (not species or key[1] in species)
+
+#ranges grown to cover the values of df, each step doubles a range towards the side the values fall on, so
+#old cells 2j and 2j+1 become one new cell and counts move over without the rows (see rebin). returns the
+#new ranges and the cell offset of every step per column, columns already covering df have no steps
+def widen_ranges(ranges, df, bins):
+    widened, steps = dict(ranges), {}
+    for column, (low, high) in ranges.items():
+        values = df[column].to_numpy(dtype="float64")
+        values = values[np.isfinite(values)]
+        if not len(values):
+            continue
+        vmin, vmax = values.min(), values.max()
+        while vmax > high or vmin < low:
+            width = high - low
+            if vmax > high:
+                high, offset = low + 2 * width, 0
+            else:
+                low, offset = high - 2 * width, bins // 2
+            steps.setdefault(column, []).append(offset)
+        widened[column] = (low, high)
+    return widened, steps
+
+#counts on the old grid moved to the widened one along axis, bins has to be even
+def rebin(counts, offsets, axis=0):
+    counts = np.moveaxis(counts, axis, 0)
+    for offset in offsets:
+        merged = counts[0::2] + counts[1::2]
+        counts = np.zeros_like(counts)
+        counts[offset:offset + len(merged)] = merged
+    return np.moveaxis(counts, 0, axis)
+
+#base for the aggregate stores, subclasses implement summarize(rows) -> partial and combine(a, b) -> partial
+class PartitionStore:
+    def __init__(self):
+        self.parts = {}
+
+    #empty store set up for df (ranges, offsets), so stores built from parts of df can be merged
+    @classmethod
+    def configured(cls, df, **params):
+        return cls(**params)
+
+    @classmethod
+    def from_frame(cls, df, **params):
+        return cls.configured(df, **params).update(df)
+
+    #shallow copy with its own partition dict, partials are replaced rather than changed in place
+    #so the copy can be updated while readers still use the original
+    def copy(self, parts=True):
+        copy = object.__new__(type(self))
+        copy.__dict__.update(self.__dict__)
+        copy.parts = dict(self.parts) if parts else {}
+        return copy
+
+    #stores on fixed ranges grow them before rows outside are folded in (streamed chunks, see mangrove/ingest.py),
+    #the others take any value as it is
+    def widen(self, df):
+        return self
+
+    def summarize(self, part):
+        raise NotImplementedError
+
+    def combine(self, a, b):
+        raise NotImplementedError
+
+    #fold new rows into the partials they belong to, appended rows only cost their own size
+    def update(self, df):
+        if len(df):
+            for key, part in df.groupby(list(PARTITION_COLUMNS), observed=True, sort=False):
+                self._add(key, self.summarize(part))
+        return self
+
+    def merge(self, other):
+        for key, partial in other.parts.items():
+            self._add(key, partial)
+        return self
+
+    def _add(self, key, partial):
+        key = tuple(key)
+        self.parts[key] = self.combine(self.parts[key], partial) if key in self.parts else partial
+
+    def partials(self, regions=None, species=None):
+        return [(key, partial) for key, partial in self.parts.items() if selected(key, regions, species)]
+
+    #merged partial per value of one partition column (0 Region, 1 Mangrove_Species) within the selection
+    def group(self, by=1, regions=None, species=None):
+        groups = {}
+        for key, partial in self.partials(regions, species):
+            groups[key[by]] = self.combine(groups[key[by]], partial) if key[by] in groups else partial
+        return groups
+
+    #merged partial of the selection, None when no partition matches
+    def select(self, regions=None, species=None):
+        partials = [partial for _, partial in self.partials(regions, species)]
+        return reduce(self.combine, partials) if partials else None
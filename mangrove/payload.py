@@ -0,0 +1,83 @@
+import base64
+import json
+import os
+
+import numpy as np
+
+#figure json is the biggest thing the page sends to the browser. above WEBGL_ROWS rows scatters are drawn
+#as scattergl, and numeric arrays go out as plotly.js typed array specs ({"dtype": "f4", "bdata": base64})
+#instead of lists of json numbers
+WEBGL_ROWS = int(os.environ.get("MANGROVE_WEBGL_ROWS", 2000))
+
+#typed array specs need plotly.js 2.28 or newer, which ships with streamlit 1.35 (the version requirements.txt pins).
+#older streamlit front ends (and the stlite build in index.html) only understand plain lists,
+#MANGROVE_BINARY_ARRAYS=1/0 overrides the guess
+def binary_supported():
+    setting = os.environ.get("MANGROVE_BINARY_ARRAYS", "").lower()
+    if setting:
+        return setting in ("1", "true", "yes")
+    try:
+        import streamlit
+        major, minor = (int(v) for v in streamlit.__version__.split(".")[:2])
+    except (ImportError, ValueError):
+        return False
+    return (major, minor) >= (1, 35)
+
+BINARY_ARRAYS = binary_supported()
+
+#px render_mode for a chart over rows records
+def render_mode(rows, webglRows=None):
+    return "webgl" if rows >= (WEBGL_ROWS if webglRows is None else webglRows) else "svg"
+
+#float arrays are sent as float32, integers as the smallest of int8/16/32 that holds them,
+#anything else (dates, strings, objects) stays a json list
+def typed_array(values):
+    if not isinstance(values, np.ndarray) or values.ndim not in (1, 2) or values.size == 0:
+        return None
+    if values.dtype.kind == "f":
+        values = values.astype("<f4")
+    elif values.dtype.kind in "iu":
+        low, high = values.min(), values.max()
+        for dtype in ("<i1", "<i2", "<i4"):
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                values = values.astype(dtype)
+                break
+        else:
+            return None
+    else:
+        return None
+    spec = {"dtype": values.dtype.str[1:], "bdata": base64.b64encode(np.ascontiguousarray(values).tobytes()).decode("ascii")}
+    if values.ndim == 2:
+        spec["shape"] = f"{values.shape[0]},{values.shape[1]}"
+    return spec
+
+def encode_arrays(node):
+    for key, value in node.items():
+        if isinstance(value, dict):
+            encode_arrays(value)
+            continue
+        if isinstance(value, (list, tuple)) and value and all(isinstance(v, dict) for v in value):
+            for item in value: #splom dimensions
+                encode_arrays(item)
+            continue
+        spec = typed_array(value)
+        if spec is not None:
+            node[key] = spec
+    return node
+
+#figure -> json text for the browser, with the trace arrays binary encoded when the front end can read them
+def figure_json(fig, binary=None):
+    binary = BINARY_ARRAYS if binary is None else binary
+    if not binary:
+        return fig.to_json()
+    import plotly.io as pio
+    figDict = fig.to_dict()
+    for trace in figDict.get("data", []):
+        encode_arrays(trace)
+    return pio.to_json(figDict, validate=False)
+
+#the validators of plotly.py 5 reject typed array specs, the json was built from a valid figure already
+def load_figure(figJson):
+    import plotly.graph_objects as go
+    return go.Figure(json.loads(figJson), _validate=False)
@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+#timing and memory of every dashboard stage: fetch, parse, region, derive (store builds), filter/query and
+#per chart build, serialize and render. the script calls begin_run() at the top of each rerun, stages then
+#record into that rerun's list on the script thread and into process-wide totals for prometheus.
+#MANGROVE_PERF=1 shows the sidebar panel by default, MANGROVE_PERF_TEXTFILE=path rewrites a prometheus
+#text file after every rerun (node_exporter textfile collector style)
+PERF_PANEL = os.environ.get("MANGROVE_PERF", "").lower() in ("1", "true", "yes")
+PERF_TEXTFILE = os.environ.get("MANGROVE_PERF_TEXTFILE")
+FIELDS = ["stage", "name", "seconds", "rss_delta_mb", "rows", "bytes"]
+
+_local = threading.local()
+_lock = threading.Lock()
+_totals = {} #(stage, name) -> {"count", "seconds", "last_seconds", "last_rss_delta_mb", "rows", "bytes"}
+_runs = {"count": 0, "seconds": 0.0, "last": None}
+
+#resident set size in MB, None where there is no /proc (pyodide, macOS)
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+class PerfRun:
+    def __init__(self):
+        self.records = []
+        self.started = time.perf_counter()
+        self.seconds = None
+
+    def add(self, record):
+        self.records.append(record)
+
+    def total(self, stage):
+        return sum(record["seconds"] for record in self.records if record["stage"] == stage)
+
+#starts recording the current rerun on this thread
+def begin_run():
+    run = _local.run = PerfRun()
+    return run
+
+def current_run():
+    return getattr(_local, "run", None)
+
+def finish_run(run):
+    run.seconds = time.perf_counter() - run.started
+    with _lock:
+        _runs["count"] += 1
+        _runs["seconds"] += run.seconds
+        _runs["last"] = run
+    if PERF_TEXTFILE:
+        write_textfile(PERF_TEXTFILE)
+    _local.run = None
+    return run
+
+#latest finished rerun of any session, what benchmarks driving the script read back
+def last_run():
+    with _lock:
+        return _runs["last"]
+
+#stages run for the rerun on another thread (the figure build pool) record into that rerun
+@contextmanager
+def attached(run):
+    previous = current_run()
+    _local.run = run
+    try:
+        yield run
+    finally:
+        _local.run = previous
+
+#rows the stage worked on, bytes it produced (figure json)
+def record(stage, name, seconds, rssDelta=None, rows=None, size=None):
+    entry = {"stage": stage, "name": name or "", "seconds": seconds, "rss_delta_mb": rssDelta, "rows": rows, "bytes": size}
+    run = current_run()
+    if run is not None:
+        run.add(entry)
+    with _lock:
+        total = _totals.setdefault((stage, name or ""), {"count": 0, "seconds": 0.0})
+        total["count"] += 1
+        total["seconds"] += seconds
+        total["last_seconds"] = seconds
+        total["last_rss_delta_mb"] = rssDelta
+        total["rows"] = rows
+        total["bytes"] = size
+
+#with timed("parse") as stage: ... stage["rows"] = len(frame)   (or stage["bytes"])
+#rss is read before and after, on a server with several sessions the delta includes what other threads did
+@contextmanager
+def timed(stage, name=None, rows=None):
+    info = {"rows": rows, "bytes": None}
+    before = rss_mb()
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        seconds = time.perf_counter() - start
+        after = rss_mb() if before is not None else None
+        record(stage, name, seconds, None if after is None else round(after - before, 2), info["rows"], info["bytes"])
+
+def to_json(run):
+    return json.dumps({"seconds": run.seconds, "records": run.records}, indent=1)
+
+def to_csv(run):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=FIELDS)
+    writer.writeheader()
+    writer.writerows(run.records)
+    return out.getvalue()
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+#process-wide totals since start in the prometheus text exposition format
+def to_prometheus():
+    with _lock:
+        totals = {key: dict(value) for key, value in _totals.items()}
+        runs = dict(_runs)
+    lines = ["# HELP mangrove_stage_seconds Time spent per dashboard stage.", "# TYPE mangrove_stage_seconds summary"]
+    for (stage, name), total in sorted(totals.items()):
+        labels = f'stage="{_label(stage)}",name="{_label(name)}"'
+        lines.append(f"mangrove_stage_seconds_sum{{{labels}}} {total['seconds']:.6f}")
+        lines.append(f"mangrove_stage_seconds_count{{{labels}}} {total['count']}")
+    lines += ["# HELP mangrove_stage_last_seconds Duration of the latest run of each stage.",
+              "# TYPE mangrove_stage_last_seconds gauge"]
+    for (stage, name), total in sorted(totals.items()):
+        lines.append(f'mangrove_stage_last_seconds{{stage="{_label(stage)}",name="{_label(name)}"}} {total["last_seconds"]:.6f}')
+    lines += ["# HELP mangrove_stage_last_rss_delta_bytes Resident memory change over the latest run of each stage.",
+              "# TYPE mangrove_stage_last_rss_delta_bytes gauge"]
+    for (stage, name), total in sorted(totals.items()):
+        if total["last_rss_delta_mb"] is not None:
+            lines.append(f'mangrove_stage_last_rss_delta_bytes{{stage="{_label(stage)}",name="{_label(name)}"}} '
+                         f'{int(total["last_rss_delta_mb"] * 2**20)}')
+    lines += ["# HELP mangrove_stage_rows Rows the latest run of each stage worked on.", "# TYPE mangrove_stage_rows gauge"]
+    for (stage, name), total in sorted(totals.items()):
+        if total["rows"] is not None:
+            lines.append(f'mangrove_stage_rows{{stage="{_label(stage)}",name="{_label(name)}"}} {total["rows"]}')
+    lines += ["# HELP mangrove_stage_bytes Bytes the latest run of each stage produced.", "# TYPE mangrove_stage_bytes gauge"]
+    for (stage, name), total in sorted(totals.items()):
+        if total["bytes"] is not None:
+            lines.append(f'mangrove_stage_bytes{{stage="{_label(stage)}",name="{_label(name)}"}} {total["bytes"]}')
+    lines += ["# HELP mangrove_reruns_total Script reruns recorded.", "# TYPE mangrove_reruns_total counter",
+              f"mangrove_reruns_total {runs['count']}",
+              "# HELP mangrove_rerun_seconds_total Time spent in recorded reruns.", "# TYPE mangrove_rerun_seconds_total counter",
+              f"mangrove_rerun_seconds_total {runs['seconds']:.6f}"]
+    rss = rss_mb()
+    if rss is not None:
+        lines += ["# HELP mangrove_resident_memory_bytes Resident memory of the server process.",
+                  "# TYPE mangrove_resident_memory_bytes gauge", f"mangrove_resident_memory_bytes {int(rss * 2**20)}"]
+    return "\n".join(lines) + "\n"
+
+def write_textfile(path):
+    tmpPath = f"{path}.tmp-{os.getpid()}"
+    with open(tmpPath, "w", encoding="utf-8") as f:
+        f.write(to_prometheus())
+    os.replace(tmpPath, path)
+
+#sidebar table of this rerun's stages with the exports, drawn at the end of the script
+def perf_panel(run):
+    import pandas as pd
+    import streamlit as st
+    if not st.sidebar.checkbox("Show perf", value=PERF_PANEL):
+        return
+    with st.sidebar.expander("perf", expanded=True):
+        frame = pd.DataFrame(run.records, columns=FIELDS)
+        st.caption(f"rerun {run.seconds:.3f}s: load {run.total('fetch') + run.total('parse') + run.total('read_columnar'):.3f}s, "
+                   f"filter {run.total('filter'):.3f}s, build {run.total('build'):.3f}s, serialize {run.total('serialize'):.3f}s, "
+                   f"render {run.total('render'):.3f}s, rss {rss_mb() or 0:.0f} MB")
+        st.dataframe(frame, hide_index=True, use_container_width=True)
+        st.download_button("JSON", to_json(run), "mangrove_perf.json", "application/json")
+        st.download_button("CSV", to_csv(run), "mangrove_perf.csv", "text/csv")
+        st.download_button("Prometheus", to_prometheus(), "mangrove_perf.prom", "text/plain")
@@ -0,0 +1,89 @@
+#builds every chart aggregate for the current data version in a process pool and saves them next to the
+#columnar cache, the dashboard then loads them with the frame instead of building them on first view
+#python -m mangrove.precompute [--source data.csv] [--workers 8] [--task-rows 50000]
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mangrove import columnar, loader
+from mangrove.aggregates import STORES, aggregate_path, save_aggregates
+from mangrove.partitions import PARTITION_COLUMNS
+
+WORKERS = int(os.environ.get("MANGROVE_WORKERS", os.cpu_count() or 1))
+TASK_ROWS = int(os.environ.get("MANGROVE_TASK_ROWS", 50000))
+
+#per worker process: the memory-mapped frame and the configured (empty) stores
+_frame = None
+_stores = None
+
+def _init_worker(source, stores):
+    global _frame, _stores
+    _frame = columnar.read_columnar(source)
+    _stores = stores
+
+def _summarize(task):
+    taskId, key, positions = task
+    part = _frame.take(positions)
+    partials = {}
+    for name, store in _stores.items():
+        if hasattr(store, "rng"): #every worker starts from the same seed, rug priorities must differ per task
+            store.rng = np.random.default_rng(taskId)
+        partials[name] = store.summarize(part)
+    return key, partials
+
+#every (Region, Mangrove_Species) partition in date order, cut into time buckets of about taskRows rows.
+#the stores are mergeable, so buckets of one partition are summarized anywhere and combined afterwards
+def make_tasks(df, taskRows=TASK_ROWS):
+    dates = df["Date"].to_numpy()
+    tasks = []
+    for key, positions in df.groupby(list(PARTITION_COLUMNS), observed=True).indices.items():
+        positions = positions[np.argsort(dates[positions], kind="stable")]
+        for bucket in np.array_split(positions, math.ceil(len(positions) / taskRows)):
+            tasks.append((len(tasks), key, bucket))
+    return tasks
+
+#workers=0 runs the same tasks in this process, without a pool
+def precompute(source=None, workers=WORKERS, taskRows=TASK_ROWS, stores=STORES, save=True):
+    source = loader.resolve_source(source)
+    df, version = loader.load_versioned(source, ttl=0)
+    if columnar.cached_version(source) != version:
+        raise RuntimeError("precompute reads the columnar cache, which needs pyarrow and a writable cache dir")
+    configured = {name: storeClass.configured(df) for name, storeClass in stores.items()}
+    tasks = make_tasks(df, taskRows)
+    start = time.perf_counter()
+    pool = None
+    if workers == 0:
+        _init_worker(source, configured)
+        results = map(_summarize, tasks)
+    else:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(source, configured))
+        results = pool.map(_summarize, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+    try:
+        for key, partials in results: #summarize never touches parts, so the configured stores collect the merge
+            for name, partial in partials.items():
+                configured[name]._add(key, partial)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    seconds = time.perf_counter() - start
+    if save:
+        save_aggregates(source, version, configured)
+    return version, configured, seconds
+
+def main():
+    parser = argparse.ArgumentParser(description="precompute the dashboard aggregates")
+    parser.add_argument("--source", help="csv path or url, defaults to what the dashboard loads")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--task-rows", type=int, default=TASK_ROWS)
+    args = parser.parse_args()
+    version, stores, seconds = precompute(args.source, args.workers, args.task_rows)
+    source = loader.resolve_source(args.source)
+    print(f"{len(stores)} aggregates for {version} in {seconds:.2f}s with {args.workers} workers")
+    print(f"saved to {aggregate_path(source, version)}")
+
+if __name__ == "__main__":
+    main()
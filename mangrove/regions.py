@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from mangrove.spatial import BoxIndex
+
+UNKNOWN_REGION = "Unknown"
+
+# Define latitude and longitude ranges for each region
+regions = [
+    {"name": "Central", "latitude": (24.5, 27.0), "longitude": (34.5, 37.5)},  # Central region
+    {"name": "Southern", "latitude": (16.5, 19.0), "longitude": (34.5, 37.5)},  # Southern region
+    {"name": "Eastern", "latitude": (27.0, 29.5), "longitude": (37.5, 41.0)},  # Eastern region
+    {"name": "Western", "latitude": (19.0, 21.5), "longitude": (41.0, 45.0)},  # Western region
+    {"name": "Northern", "latitude": (21.5, 24.5), "longitude": (45.0, 48.5)}   # Northern region
+]
+
+# Function to determine the region based on latitude and longitude
+#row-wise reference, assign_regions below must give the same answer for every point
+def get_region(latitude, longitude, regions=regions):
+    for region in regions:
+        if region["latitude"][0] <= latitude <= region["latitude"][1] and \
+           region["longitude"][0] <= longitude <= region["longitude"][1]:
+            return region["name"]
+    return UNKNOWN_REGION
+
+#region names in declaration order followed by the fallback, used as categorical categories
+def region_names(regions=regions):
+    return list(dict.fromkeys([region["name"] for region in regions] + [UNKNOWN_REGION]))
+
+#vectorized get_region over whole latitude/longitude columns, returns a categorical.
+#one table lookup per point through the box index (see mangrove/spatial.py), so hundreds of regions cost the same
+def assign_regions(latitude, longitude, regions=regions):
+    lat = np.asarray(latitude, dtype="float64")
+    lon = np.asarray(longitude, dtype="float64")
+    names = region_names(regions)
+    codes = np.full(lat.shape, names.index(UNKNOWN_REGION), dtype="int16")
+    if not regions or not len(lat):
+        return pd.Categorical.from_codes(codes, categories=names)
+    codeOf = np.array([names.index(region["name"]) for region in regions], dtype="int16")
+    index = BoxIndex([region["latitude"] + region["longitude"] for region in regions])
+    found = index.lookup(lat, lon)
+    codes[found >= 0] = codeOf[found[found >= 0]]
+    return pd.Categorical.from_codes(codes, categories=names)
@@ -0,0 +1,170 @@
+#dtype and valid range of every column the dashboard knows. the loader applies it once per data version,
+#so the one frame shared by all sessions is float32 readings, categorical species/region and datetime64 dates.
+#ranges are physical bounds, readings outside them are counted (python -m mangrove.schema), and set to NaN
+#at load time when MANGROVE_STRICT_RANGES=1 (for versions parsed from then on, the columnar cache keeps what it has)
+#python -m mangrove.schema [--source data.csv]
+import argparse
+import os
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+STRICT_RANGES = os.environ.get("MANGROVE_STRICT_RANGES", "").lower() in ("1", "true", "yes")
+
+#float32 keeps ~7 significant digits which covers every sensor reading in the dataset,
+#latitude/longitude stay float64, region edges and map positions need the full precision
+SCHEMA = {
+    "Date": ("datetime64[ns]", None),
+    "Latitude": ("float64", (-90, 90)),
+    "Longitude": ("float64", (-180, 180)),
+    "Elevation": ("float32", (-500, 9000)),
+    "Temperature": ("float32", (-60, 60)),
+    "Precipitation": ("float32", (0, None)),
+    "Humidity": ("float32", (0, 100)),
+    "Sunlight_Exposure": ("float32", (0, None)),
+    "Salinity": ("float32", (0, None)),
+    "Nitrogen": ("float32", (0, None)),
+    "Phosphorus": ("float32", (0, None)),
+    "Potassium": ("float32", (0, None)),
+    "Organic_Matter": ("float32", (0, None)),
+    "Tidal_Inundation": ("float32", None), #ratio or share of time, the sign convention is not documented
+    "Water_Depth": ("float32", None),
+    "Soil_Moisture": ("float32", (0, 100)),
+    "Growth_Rate": ("float32", None),
+    "Plant_Height": ("float32", (0, None)),
+    "Mangrove_Species": ("category", None),
+    "Region": ("category", None),
+}
+FLOAT64_COLUMNS = [column for column, (dtype, _) in SCHEMA.items() if dtype == "float64"]
+CATEGORY_COLUMNS = [column for column, (dtype, _) in SCHEMA.items() if dtype == "category"]
+
+#read_csv dtypes, so readings are parsed straight to float32 instead of float64 first.
+#dates and categories are converted after the parse (region does not exist in the csv yet)
+def csv_dtypes():
+    return {column: dtype for column, (dtype, _) in SCHEMA.items() if dtype.startswith("float")}
+
+#declared dtypes, columns the schema does not know go float64 -> float32 like the readings
+def compact_frame(df):
+    for column in df.columns:
+        dtype = SCHEMA[column][0] if column in SCHEMA else ("float32" if df[column].dtype == np.float64 else None)
+        if dtype == "category":
+            if not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype("category")
+        elif dtype is not None and df[column].dtype != dtype:
+            df[column] = pd.to_datetime(df[column]).astype(dtype) if dtype.startswith("datetime") else df[column].astype(dtype)
+    return df
+
+#columns of a growing frame (live tail, see loader.TAIL) in arrays with spare capacity that double when full, so
+#appending costs the new rows and frame() is a new DataFrame over views of the filled part, not a copy.
+#frames handed out earlier never see later rows, they only cover what was filled when they were made.
+#categoricals keep their codes, categories new to the buffer are added after its own ones so old codes stay valid
+class FrameBuffer:
+    def __init__(self, df, capacity=None):
+        self.rows = len(df)
+        self.names = list(df.columns)
+        self.arrays = {}
+        self.categories = {}
+        capacity = max(capacity or 2 * len(df), len(df), 1)
+        for column in self.names:
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                self.categories[column] = values.cat.categories
+                values = values.cat.codes.to_numpy(dtype=np.int32)
+            else:
+                values = values.to_numpy()
+            array = np.empty(capacity, dtype=values.dtype)
+            array[:len(values)] = values
+            self.arrays[column] = array
+
+    @property
+    def capacity(self):
+        return len(next(iter(self.arrays.values())))
+
+    def frame(self):
+        columns = {}
+        for column in self.names:
+            values = self.arrays[column][:self.rows]
+            if column in self.categories:
+                values = pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(self.categories[column]))
+            columns[column] = values
+        return pd.DataFrame(columns, copy=False)
+
+    #rows with the buffer's columns, returns the frame with them
+    def append(self, rows):
+        end = self.rows + len(rows)
+        if end > self.capacity:
+            capacity = max(2 * self.capacity, end)
+            for column, array in self.arrays.items():
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:self.rows] = array[:self.rows]
+                self.arrays[column] = grown
+        for column in self.names:
+            values = rows[column]
+            if column in self.categories:
+                values = values.astype(object) if isinstance(values.dtype, pd.CategoricalDtype) else values
+                added = pd.Index(pd.unique(values.dropna())).difference(self.categories[column], sort=False)
+                if len(added):
+                    self.categories[column] = self.categories[column].append(added)
+                values = pd.Categorical(values, categories=self.categories[column]).codes
+            self.arrays[column][self.rows:end] = np.asarray(values, dtype=self.arrays[column].dtype)
+        self.rows = end
+        return self.frame()
+
+#{column: readings outside the valid range}, only columns that have some
+def out_of_range(df):
+    counts = {}
+    for column, (_, bounds) in SCHEMA.items():
+        if bounds is None or column not in df.columns:
+            continue
+        values = df[column].to_numpy()
+        outside = np.zeros(len(values), dtype=bool)
+        if bounds[0] is not None:
+            outside |= values < bounds[0]
+        if bounds[1] is not None:
+            outside |= values > bounds[1]
+        if outside.any():
+            counts[column] = int(outside.sum())
+    return counts
+
+def mask_out_of_range(df):
+    for column in out_of_range(df):
+        low, high = SCHEMA[column][1]
+        values = df[column]
+        df[column] = values.where((values >= (low if low is not None else -np.inf)) & (values <= (high if high is not None else np.inf)))
+    return df
+
+#applied by the loader to every freshly parsed frame or chunk
+def enforce_schema(df):
+    df = compact_frame(df)
+    return mask_out_of_range(df) if STRICT_RANGES else df
+
+#bytes per column of two frames with the same columns, plus a total row
+def memory_report(before, after):
+    report = pd.DataFrame({"dtype before": before.dtypes.astype(str), "dtype after": after.dtypes.astype(str),
+                           "bytes before": before.memory_usage(index=False, deep=True),
+                           "bytes after": after.memory_usage(index=False, deep=True)})
+    report.loc["total"] = ["", "", report["bytes before"].sum(), report["bytes after"].sum()]
+    report["ratio"] = report["bytes before"] / report["bytes after"]
+    return report
+
+def main():
+    from mangrove import loader
+    from mangrove.regions import assign_regions
+    parser = argparse.ArgumentParser(description="memory per column of the raw and the schema-typed frame")
+    parser.add_argument("--source", default=loader.LOCAL_CSV, help="csv path or url, defaults to the bundled csv")
+    args = parser.parse_args()
+    source = loader.resolve_source(args.source)
+    _, content = loader.fetch_source(source)
+    #what every session used to hold: read_csv defaults, regions as python strings
+    raw = pd.read_csv(BytesIO(content), encoding=loader.ENCODING)
+    raw["Date"] = pd.to_datetime(raw["Date"])
+    raw["Region"] = np.asarray(assign_regions(raw["Latitude"], raw["Longitude"]), dtype=object)
+    typed = loader.parse_csv(content)
+    with pd.option_context("display.width", 120, "display.max_rows", 100, "display.max_columns", 10):
+        print(memory_report(raw, typed[raw.columns]))
+    for column, count in out_of_range(typed).items():
+        print(f"{column}: {count} readings outside {SCHEMA[column][1]}")
+
+if __name__ == "__main__":
+    main()
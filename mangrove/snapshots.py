@@ -0,0 +1,85 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from mangrove import columnar
+
+#pre-rendered figure json, one gzip file per (data version, chart, filter state, chart options), written by
+#python -m mangrove.export. the page serves a snapshot when there is one for exactly what it is about to build
+#and builds live otherwise. MANGROVE_SNAPSHOTS=0 stops serving them, MANGROVE_SNAPSHOT_DIR moves them elsewhere
+SNAPSHOTS = os.environ.get("MANGROVE_SNAPSHOTS", "1").lower() not in ("0", "false", "no")
+SNAPSHOT_DIR = os.environ.get("MANGROVE_SNAPSHOT_DIR") or os.path.join(columnar.CACHE_DIR, "snapshots")
+SNAPSHOT_KEEP = 3 #data versions kept on disk
+MANIFEST_NAME = "manifest.json"
+
+def version_dir(version):
+    return os.path.join(SNAPSHOT_DIR, hashlib.sha1(str(version).encode("utf-8")).hexdigest()[:16])
+
+#same filter normalisation as ChartContext.key, binary says whether the json holds typed arrays (see payload.py).
+#the backend is part of the key like in ChartContext.key, pandas and duckdb do not draw every figure the same
+def snapshot_key(name, backend, version, regions, species, area, options, binary):
+    state = (name, backend, str(version), tuple(sorted(map(str, regions))), tuple(sorted(map(str, species))), area,
+             tuple(sorted(options.items())), bool(binary))
+    return hashlib.sha256(repr(state).encode("utf-8")).hexdigest()[:32]
+
+def snapshot_path(version, key, suffix=".json.gz"):
+    return os.path.join(version_dir(version), key + suffix)
+
+def _write(path, content):
+    fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(gzip.compress(content, compresslevel=6))
+        os.replace(tmpPath, path)
+    except BaseException:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+        raise
+    return os.path.getsize(path)
+
+#writes the figure json (and a standalone html page when given), returns the compressed bytes written
+def save_snapshot(version, key, figJson, caption, html=None):
+    os.makedirs(version_dir(version), exist_ok=True)
+    size = _write(snapshot_path(version, key), json.dumps({"figure": figJson, "caption": caption}).encode("utf-8"))
+    if html is not None:
+        size += _write(snapshot_path(version, key, ".html.gz"), html.encode("utf-8"))
+    return size
+
+#(figure json, caption) like FigureCache entries, None when there is no readable snapshot
+def load_snapshot(version, key):
+    if not SNAPSHOTS:
+        return None
+    path = snapshot_path(version, key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, "rb") as f:
+            saved = json.loads(f.read())
+    except (OSError, ValueError, EOFError):
+        return None
+    return saved["figure"], saved["caption"]
+
+#what was exported for the version, entries of earlier exports are kept unless rewritten
+def save_manifest(version, entries):
+    path = os.path.join(version_dir(version), MANIFEST_NAME)
+    known = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            known = {entry["key"]: entry for entry in json.load(f)["snapshots"]}
+    known.update((entry["key"], entry) for entry in entries)
+    os.makedirs(version_dir(version), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": str(version), "snapshots": list(known.values())}, f, indent=1)
+    return len(known)
+
+#drops the snapshot directories of all but the latest SNAPSHOT_KEEP versions
+def prune(keep=SNAPSHOT_KEEP):
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return
+    directories = sorted((os.path.join(SNAPSHOT_DIR, name) for name in os.listdir(SNAPSHOT_DIR)),
+                         key=os.path.getmtime, reverse=True)
+    for directory in directories[keep:]:
+        shutil.rmtree(directory, ignore_errors=True)
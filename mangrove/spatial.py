@@ -0,0 +1,218 @@
+import math
+import os
+
+import numpy as np
+
+#spatial lookups over Latitude/Longitude. an area is a hashable tuple so it can be part of cache keys:
+#("box", (latLow, latHigh, lonLow, lonHigh)), ("radius", (lat, lon, km)) or ("polygon", ((lat, lon), ...)),
+#edges count as inside like the region boxes. a map selection is ("cells", (cellDeg, ((latCell, lonCell), ...))),
+#the grid cells of mangrove/mapbins.py (floor(lat / cellDeg)), or ("points", ((lat, lon), ...)), the rows at the
+#selected markers. markers go to the browser as float32 (see mangrove/payload.py) so points match in float32
+GRID_CELL_DEG = float(os.environ.get("MANGROVE_GRID_CELL_DEG", 0.05)) #~5 km cells for the point grid
+EARTH_KM = 6371.0
+KM_PER_DEG = math.pi * EARTH_KM / 180
+FLOAT32_DEG = 180 * 2.0 ** -23 #largest float32 rounding of a coordinate, cells and points boxes are widened by it
+
+#one uint64 per coordinate pair, the bits of its float32 latitude and longitude
+def point_keys(lat, lon):
+    pairs = np.stack([np.asarray(lat, dtype="<f4"), np.asarray(lon, dtype="<f4")], axis=1)
+    return np.ascontiguousarray(pairs).view("<u8").ravel()
+
+def cell_keys(lat, lon, cellDeg):
+    return np.floor(lat / cellDeg).astype(np.int64) * (1 << 32) + np.floor(lon / cellDeg).astype(np.int64)
+
+#lat/lon box around the area
+def area_box(area):
+    kind, shape = area
+    if kind == "box":
+        return shape
+    if kind == "radius":
+        lat, lon, km = shape
+        latDeg = km / KM_PER_DEG
+        lonDeg = km / (KM_PER_DEG * max(math.cos(math.radians(lat)), 1e-6))
+        return (lat - latDeg, lat + latDeg, lon - lonDeg, lon + lonDeg)
+    if kind == "polygon":
+        lats, lons = [p[0] for p in shape], [p[1] for p in shape]
+        return (min(lats), max(lats), min(lons), max(lons))
+    if kind == "cells":
+        cellDeg, cells = shape
+        lats, lons = [cell[0] for cell in cells], [cell[1] for cell in cells]
+        return (min(lats) * cellDeg - FLOAT32_DEG, (max(lats) + 1) * cellDeg + FLOAT32_DEG,
+                min(lons) * cellDeg - FLOAT32_DEG, (max(lons) + 1) * cellDeg + FLOAT32_DEG)
+    if kind == "points":
+        lats, lons = [p[0] for p in shape], [p[1] for p in shape]
+        return (min(lats) - FLOAT32_DEG, max(lats) + FLOAT32_DEG, min(lons) - FLOAT32_DEG, max(lons) + FLOAT32_DEG)
+    raise ValueError(f"unknown area {kind!r}")
+
+#exact test for points already known to be near the area, NaN coordinates are never inside
+def area_mask(lat, lon, area):
+    lat = np.asarray(lat, dtype="float64")
+    lon = np.asarray(lon, dtype="float64")
+    kind, shape = area
+    box = area_box(area)
+    inside = (lat >= box[0]) & (lat <= box[1]) & (lon >= box[2]) & (lon <= box[3])
+    if kind == "radius":
+        #haversine distance to the centre
+        lat0, lon0 = math.radians(shape[0]), math.radians(shape[1])
+        phi, lam = np.radians(lat), np.radians(lon)
+        a = np.sin((phi - lat0) / 2) ** 2 + math.cos(lat0) * np.cos(phi) * np.sin((lam - lon0) / 2) ** 2
+        inside &= 2 * EARTH_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0))) <= shape[2]
+    elif kind == "polygon":
+        #even-odd ray casting along the longitude axis, one pass per edge
+        crossings = np.zeros(len(lat), dtype=bool)
+        for (lat1, lon1), (lat2, lon2) in zip(shape, shape[1:] + shape[:1]):
+            if lat1 == lat2:
+                continue
+            spans = (lat1 > lat) != (lat2 > lat)
+            crossings ^= spans & (lon < lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1))
+        inside &= crossings
+    elif kind == "cells":
+        cellDeg, cells = shape
+        keys = np.array([cell[0] for cell in cells], dtype=np.int64) * (1 << 32) + np.array([cell[1] for cell in cells], dtype=np.int64)
+        inside[inside] = np.isin(cell_keys(lat[inside], lon[inside], cellDeg), keys)
+    elif kind == "points":
+        inside[inside] = np.isin(point_keys(lat[inside], lon[inside]), point_keys(*zip(*shape)))
+    return inside
+
+#points outlining the area for drawing it on the map, closed. cells are outlined one by one, separated by None
+def area_outline(area, steps=64):
+    kind, shape = area
+    if kind == "points":
+        kind, shape = "box", area_box(area)
+    if kind == "cells":
+        cellDeg, lats, lons = shape[0], [], []
+        for latCell, lonCell in shape[1]:
+            cellLats, cellLons = area_outline(("box", (latCell * cellDeg, (latCell + 1) * cellDeg,
+                                                       lonCell * cellDeg, (lonCell + 1) * cellDeg)))
+            lats += cellLats + [None]
+            lons += cellLons + [None]
+        return lats, lons
+    if kind == "box":
+        latLow, latHigh, lonLow, lonHigh = shape
+        return [latLow, latLow, latHigh, latHigh, latLow], [lonLow, lonHigh, lonHigh, lonLow, lonLow]
+    if kind == "radius":
+        lat, lon, km = shape
+        angles = np.linspace(0, 2 * math.pi, steps + 1)
+        lats = lat + km / KM_PER_DEG * np.sin(angles)
+        lons = lon + km / (KM_PER_DEG * max(math.cos(math.radians(lat)), 1e-6)) * np.cos(angles)
+        return lats.tolist(), lons.tolist()
+    points = list(shape) + [shape[0]]
+    return [p[0] for p in points], [p[1] for p in points]
+
+#row positions bucketed into a regular lat/lon grid and sorted by cell (row-major), so the cells of one grid row
+#inside a box are one contiguous slice. a query touches the slices of the box's grid rows and tests only the
+#points in those cells exactly, instead of scanning every row. built once per data version (see loader.derived).
+#rows appended later (live tail) wait unsorted in a small side list that queries test directly, the grid is
+#rebuilt over everything once that list passes GRID_REBUILD_SHARE of the rows
+GRID_REBUILD_SHARE = 0.125
+
+class GridIndex:
+    def __init__(self, latitude, longitude, cellDeg=GRID_CELL_DEG):
+        lat = np.asarray(latitude, dtype="float64")
+        lon = np.asarray(longitude, dtype="float64")
+        self.rows = len(lat)
+        self.cellDeg = cellDeg
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+        self.latMin = float(lat[valid].min()) if valid.any() else 0.0
+        self.lonMin = float(lon[valid].min()) if valid.any() else 0.0
+        latCell = np.where(valid, np.floor((lat - self.latMin) / cellDeg), 0).astype(np.int64)
+        lonCell = np.where(valid, np.floor((lon - self.lonMin) / cellDeg), 0).astype(np.int64)
+        self.latCells = int(latCell.max()) + 1 if len(lat) else 1
+        self.lonCells = int(lonCell.max()) + 1 if len(lat) else 1
+        cells = np.where(valid, latCell * self.lonCells + lonCell, self.latCells * self.lonCells) #NaN rows sort last
+        self.order = np.argsort(cells, kind="stable")
+        self.cells = cells[self.order]
+        self.lat = lat[self.order]
+        self.lon = lon[self.order]
+        self.gridRows = self.rows
+        self.extraLat = np.empty(0, dtype="float64") #appended rows, filled up to rows - gridRows, grow by doubling
+        self.extraLon = np.empty(0, dtype="float64")
+
+    @classmethod
+    def from_frame(cls, df, cellDeg=GRID_CELL_DEG):
+        return cls(df["Latitude"], df["Longitude"], cellDeg)
+
+    def _cell_range(self, low, high, origin, count):
+        first = max(int(math.floor((low - origin) / self.cellDeg)), 0)
+        last = min(int(math.floor((high - origin) / self.cellDeg)), count - 1)
+        return first, last
+
+    #sorted positions (into the sorted arrays) of the points in the grid cells touching box
+    def _candidates(self, box):
+        latFirst, latLast = self._cell_range(box[0], box[1], self.latMin, self.latCells)
+        lonFirst, lonLast = self._cell_range(box[2], box[3], self.lonMin, self.lonCells)
+        if latFirst > latLast or lonFirst > lonLast:
+            return np.empty(0, dtype=np.int64)
+        rowStarts = np.arange(latFirst, latLast + 1, dtype=np.int64) * self.lonCells
+        starts = np.searchsorted(self.cells, rowStarts + lonFirst, "left")
+        ends = np.searchsorted(self.cells, rowStarts + lonLast, "right")
+        keep = ends > starts
+        starts, ends = starts[keep], ends[keep]
+        if not len(starts):
+            return np.empty(0, dtype=np.int64)
+        #concatenated ranges without a python loop: ones with a jump at every slice start
+        lengths = ends - starts
+        steps = np.ones(lengths.sum(), dtype=np.int64)
+        offsets = np.cumsum(lengths)[:-1]
+        steps[0] = starts[0]
+        steps[offsets] = starts[1:] - ends[:-1] + 1
+        return np.cumsum(steps)
+
+    #row positions of the frame inside the area, ascending like FilterIndex.positions
+    def query(self, area):
+        candidates = self._candidates(area_box(area))
+        hit = candidates[area_mask(self.lat[candidates], self.lon[candidates], area)]
+        positions = self.order[hit]
+        extraRows = self.rows - self.gridRows
+        if extraRows:
+            extra = np.flatnonzero(area_mask(self.extraLat[:extraRows], self.extraLon[:extraRows], area)) + self.gridRows
+            positions = np.concatenate([positions, extra])
+        return np.sort(positions)
+
+    #index over the frame with rows appended below it, this one is left as it is for readers of the old frame
+    def appended(self, rows):
+        start, end = self.rows - self.gridRows, self.rows - self.gridRows + len(rows)
+        if end > GRID_REBUILD_SHARE * self.gridRows:
+            lat, lon = np.empty(self.gridRows), np.empty(self.gridRows)
+            lat[self.order], lon[self.order] = self.lat, self.lon
+            return GridIndex(np.concatenate([lat, self.extraLat[:start], rows["Latitude"].to_numpy(dtype="float64")]),
+                             np.concatenate([lon, self.extraLon[:start], rows["Longitude"].to_numpy(dtype="float64")]), self.cellDeg)
+        index = object.__new__(type(self))
+        index.__dict__.update(self.__dict__)
+        index.rows = self.rows + len(rows)
+        if end > len(self.extraLat):
+            capacity = max(2 * len(self.extraLat), end)
+            index.extraLat, index.extraLon = np.empty(capacity), np.empty(capacity)
+            index.extraLat[:start], index.extraLon[:start] = self.extraLat[:start], self.extraLon[:start]
+        index.extraLat[start:end] = rows["Latitude"].to_numpy(dtype="float64")
+        index.extraLon[start:end] = rows["Longitude"].to_numpy(dtype="float64")
+        return index
+
+    def count(self, area):
+        return len(self.query(area))
+
+#first of a list of boxes (latLow, latHigh, lonLow, lonHigh) containing each point, -1 for none. all box edges
+#cut both axes into slabs (every edge value is a slab of its own, so inclusive edges stay exact) and a table
+#holds the first box covering each pair of slabs, one lookup per point however many boxes there are
+class BoxIndex:
+    def __init__(self, boxes):
+        self.latBounds = np.unique(np.array([v for box in boxes for v in box[:2]], dtype="float64"))
+        self.lonBounds = np.unique(np.array([v for box in boxes for v in box[2:]], dtype="float64"))
+        self.table = np.full((2 * len(self.latBounds) + 1, 2 * len(self.lonBounds) + 1), -1, dtype=np.int32)
+        #painted last to first so the first box wins where boxes overlap
+        for k in reversed(range(len(boxes))):
+            latLow, latHigh, lonLow, lonHigh = boxes[k]
+            if latLow > latHigh or lonLow > lonHigh:
+                continue
+            latSlabs = self.slabs(self.latBounds, [latLow, latHigh])
+            lonSlabs = self.slabs(self.lonBounds, [lonLow, lonHigh])
+            self.table[latSlabs[0]:latSlabs[1] + 1, lonSlabs[0]:lonSlabs[1] + 1] = k
+
+    #2*i is the open interval below bounds[i], 2*i+1 the bound itself. NaN lands past the last bound, in no box
+    @staticmethod
+    def slabs(bounds, values):
+        values = np.asarray(values, dtype="float64")
+        return np.searchsorted(bounds, values, "left") + np.searchsorted(bounds, values, "right")
+
+    def lookup(self, latitude, longitude):
+        return self.table[self.slabs(self.latBounds, latitude), self.slabs(self.lonBounds, longitude)]
@@ -0,0 +1,118 @@
+import os
+
+import numpy as np
+
+from mangrove.partitions import PartitionStore, rebin, widen_ranges
+
+SPLOM_COLUMNS = ["Salinity", "Organic_Matter", "Soil_Moisture"]
+SOIL_COLUMNS = SPLOM_COLUMNS + ["Nitrogen", "Phosphorus", "Potassium"]
+SPLOM_BINS = 40 #cells per axis of every panel
+SPLOM_ROWS = int(os.environ.get("MANGROVE_SPLOM_ROWS", 5000)) #past this many selected rows panels become heatmaps
+
+#per partition: a bins x bins count grid for every column pair (i < j, the lower triangle is its transpose)
+#and a histogram per column for the diagonal, on fixed per-column ranges so partitions add up cell by cell.
+#values outside the range are counted in the edge cells unless the store is widened first.
+class SplomStore(PartitionStore):
+    def __init__(self, ranges, bins=SPLOM_BINS):
+        super().__init__()
+        self.ranges = {column: (float(low), float(high)) for column, (low, high) in ranges.items()}
+        self.columns = list(self.ranges)
+        self.bins = bins
+
+    @classmethod
+    def configured(cls, df, columns=SOIL_COLUMNS, **params):
+        if "ranges" not in params:
+            params["ranges"] = {}
+            for column in columns:
+                if column not in df:
+                    continue
+                low, high = float(df[column].min()), float(df[column].max())
+                if np.isnan(low):
+                    continue
+                if high <= low:
+                    low, high = low - 0.5, high + 0.5
+                params["ranges"][column] = (low, high)
+        return super().configured(df, **params)
+
+    def cells(self, values, column):
+        low, high = self.ranges[column]
+        cells = np.clip(np.floor(np.nan_to_num((values - low) / (high - low) * self.bins)), 0, self.bins - 1)
+        return np.where(np.isnan(values), -1, cells).astype(np.int64)
+
+    #partials are replaced, copies handed out earlier keep their ranges and counts
+    def widen(self, df):
+        ranges, steps = widen_ranges(self.ranges, df, self.bins)
+        if steps:
+            self.ranges = ranges
+            self.parts = {key: {name: self._rebin(name, counts, steps) for name, counts in partial.items()}
+                          for key, partial in self.parts.items()}
+        return self
+
+    @staticmethod
+    def _rebin(name, counts, steps):
+        if name == "n":
+            return counts
+        if isinstance(name, str):
+            return rebin(counts, steps.get(name, []))
+        return rebin(rebin(counts, steps.get(name[0], []), 0), steps.get(name[1], []), 1)
+
+    def summarize(self, part):
+        cells = {column: self.cells(part[column].to_numpy(dtype="float64"), column) for column in self.columns}
+        partial = {"n": len(part)}
+        for i, column in enumerate(self.columns):
+            valid = cells[column] >= 0
+            partial[column] = np.bincount(cells[column][valid], minlength=self.bins)
+            for other in self.columns[i + 1:]:
+                both = valid & (cells[other] >= 0)
+                flat = cells[column][both] * self.bins + cells[other][both]
+                partial[column, other] = np.bincount(flat, minlength=self.bins * self.bins).reshape(self.bins, self.bins)
+        return partial
+
+    def combine(self, a, b):
+        return {key: a[key] + b[key] for key in a}
+
+    def count(self, regions=None, species=None):
+        return sum(partial["n"] for _, partial in self.partials(regions, species))
+
+    def centers(self, column):
+        low, high = self.ranges[column]
+        step = (high - low) / self.bins
+        return low + step * (np.arange(self.bins) + 0.5)
+
+    #counts[x, y] for column x against column y, whichever triangle the pair is stored in
+    @staticmethod
+    def panel(partial, x, y):
+        return partial[x, y] if (x, y) in partial else partial[y, x].T
+
+#heatmap panels below the diagonal and above it (one grid per pair, transposed), per species histograms on it
+def splom_figure(store, columns, colors, regions=None, species=None):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    columns = [column for column in columns if column in store.ranges]
+    k = len(columns)
+    fig = make_subplots(rows=k, cols=k, shared_xaxes="columns", horizontal_spacing=0.02, vertical_spacing=0.02)
+    total = store.select(regions, species)
+    if total is None:
+        return fig
+    groups = store.group(1, regions, species)
+    centers = {column: store.centers(column) for column in columns}
+    for row, yColumn in enumerate(columns, 1):
+        for col, xColumn in enumerate(columns, 1):
+            if row == col:
+                width = centers[xColumn][1] - centers[xColumn][0]
+                for i, (name, partial) in enumerate(groups.items()):
+                    fig.add_trace(go.Bar(x=centers[xColumn], y=partial[xColumn], width=width, name=name,
+                                         legendgroup=name, showlegend=row == 1, opacity=0.6,
+                                         marker=dict(color=colors[i % len(colors)])), row=row, col=col)
+                continue
+            counts = store.panel(total, xColumn, yColumn).T.astype("float64")
+            counts[counts == 0] = np.nan
+            fig.add_trace(go.Heatmap(x=centers[xColumn], y=centers[yColumn], z=counts, coloraxis="coloraxis",
+                                     hovertemplate=f"{xColumn}=%{{x:.2f}}<br>{yColumn}=%{{y:.2f}}<br>rows=%{{z}}<extra></extra>"),
+                          row=row, col=col)
+    for i, column in enumerate(columns, 1):
+        fig.update_xaxes(title_text=column, row=k, col=i)
+        fig.update_yaxes(title_text=column, row=i, col=1)
+    fig.update_layout(barmode="overlay", bargap=0, coloraxis=dict(colorscale="Greens", colorbar=dict(title="rows")),
+                      legend_title_text="Mangrove_Species")
+    return fig
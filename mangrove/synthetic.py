@@ -0,0 +1,118 @@
+#larger copies of synthetic_mangrove_dataset.csv for load testing: same 19 columns in the same order, species and
+#region shares of the source, latitude/longitude uniform inside the region boxes and the readings drawn from a
+#gaussian fitted to the source conditioned on the position, so their spread and correlations (temperature with
+#latitude, soil moisture with precipitation, ...) carry over. dates are evenly spaced over the source's range.
+#written in chunks, memory stays at CHUNK_ROWS whatever the number of rows.
+#python -m mangrove.synthetic --rows 1000000 --out mangrove_1m.csv [--seed 0] [--check]
+import argparse
+import os
+import time
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from mangrove import loader
+from mangrove.regions import UNKNOWN_REGION, assign_regions, regions
+
+CHUNK_ROWS = 500000
+POSITION_COLUMNS = ["Latitude", "Longitude"]
+
+#everything generate() needs, from the raw source csv
+def fit_model(df):
+    columns = list(df.columns)
+    readings = [column for column in columns if column not in POSITION_COLUMNS + ["Date", "Mangrove_Species"]]
+    dates = pd.to_datetime(df["Date"])
+    values = df[POSITION_COLUMNS + readings].dropna().to_numpy(dtype="float64")
+    regionCounts = pd.Series(assign_regions(df["Latitude"], df["Longitude"])).value_counts()
+    return {"columns": columns, "readings": readings, "start": dates.min(), "end": dates.max(),
+            "species": df["Mangrove_Species"].value_counts(normalize=True),
+            "regions": regionCounts[regionCounts > 0] / regionCounts.sum(),
+            "bounds": (df["Latitude"].min(), df["Latitude"].max(), df["Longitude"].min(), df["Longitude"].max()),
+            "mean": values.mean(axis=0), "cov": np.cov(values, rowvar=False)}
+
+#readings given the position: mean shifts with the position, the rest of the covariance is the noise
+def _conditional(model):
+    cov = model["cov"]
+    gain = cov[2:, :2] @ np.linalg.inv(cov[:2, :2])
+    noise = cov[2:, 2:] - gain @ cov[:2, 2:]
+    return gain, np.linalg.cholesky(noise + np.eye(len(noise)) * 1e-12)
+
+def _positions(model, regionNames, rng):
+    lat, lon = np.empty(len(regionNames)), np.empty(len(regionNames))
+    boxes = {region["name"]: region for region in regions}
+    for name in np.unique(regionNames):
+        rows = np.flatnonzero(regionNames == name)
+        if name == UNKNOWN_REGION: #anywhere in the source's extent outside every box
+            box = model["bounds"]
+            while len(rows):
+                lat[rows] = rng.uniform(box[0], box[1], len(rows))
+                lon[rows] = rng.uniform(box[2], box[3], len(rows))
+                rows = rows[np.asarray(assign_regions(lat[rows], lon[rows])) != UNKNOWN_REGION]
+            continue
+        lat[rows] = rng.uniform(*boxes[name]["latitude"], len(rows))
+        lon[rows] = rng.uniform(*boxes[name]["longitude"], len(rows))
+    return lat, lon
+
+#frames of at most chunkRows rows with the source's columns, rows in date order like the source
+def generate(model, rows, seed=0, chunkRows=CHUNK_ROWS):
+    rng = np.random.default_rng(seed)
+    gain, noise = _conditional(model)
+    start, span = model["start"].value, model["end"].value - model["start"].value
+    for offset in range(0, rows, chunkRows):
+        n = min(chunkRows, rows - offset)
+        regionNames = rng.choice(np.asarray(model["regions"].index, dtype=object), n, p=model["regions"].to_numpy())
+        lat, lon = _positions(model, regionNames, rng)
+        position = np.column_stack([lat, lon]) - model["mean"][:2]
+        readings = model["mean"][2:] + position @ gain.T + rng.standard_normal((n, len(model["readings"]))) @ noise.T
+        steps = np.arange(offset, offset + n, dtype="float64") / max(rows - 1, 1)
+        chunk = pd.DataFrame(readings, columns=model["readings"])
+        chunk["Date"] = pd.to_datetime(start + (steps * span).astype("int64"))
+        chunk["Latitude"], chunk["Longitude"] = lat, lon
+        chunk["Mangrove_Species"] = rng.choice(np.asarray(model["species"].index, dtype=object), n, p=model["species"].to_numpy())
+        yield chunk[model["columns"]]
+
+def write_csv(path, model, rows, seed=0, chunkRows=CHUNK_ROWS):
+    with open(path, "w", encoding=loader.ENCODING, newline="") as f:
+        for i, chunk in enumerate(generate(model, rows, seed, chunkRows)):
+            chunk.to_csv(f, index=False, header=i == 0)
+    return path
+
+def read_source(source=None):
+    source = loader.resolve_source(source or loader.LOCAL_CSV)
+    _, content = loader.fetch_source(source)
+    return pd.read_csv(BytesIO(content), encoding=loader.ENCODING)
+
+#means, spreads and correlations of the generated sample next to the source's
+def check(source, generated):
+    numeric = [column for column in source.columns if column not in ("Date", "Mangrove_Species")]
+    report = pd.DataFrame({"mean": source[numeric].mean(), "generated mean": generated[numeric].mean(),
+                           "std": source[numeric].std(), "generated std": generated[numeric].std()})
+    corrDiff = (source[numeric].corr() - generated[numeric].corr()).abs().to_numpy().max()
+    shares = pd.DataFrame({"source": source["Mangrove_Species"].value_counts(normalize=True),
+                           "generated": generated["Mangrove_Species"].value_counts(normalize=True)})
+    return report, corrDiff, shares
+
+def main():
+    parser = argparse.ArgumentParser(description="write a larger csv with the distributions of the source")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--source", default=None, help="csv path or url to fit, defaults to the bundled csv")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--check", action="store_true", help="compare a sample of the output with the source")
+    args = parser.parse_args()
+    source = read_source(args.source)
+    start = time.perf_counter()
+    write_csv(args.out, fit_model(source), args.rows, args.seed, args.chunk_rows)
+    print(f"{args.rows} rows written to {args.out} in {time.perf_counter() - start:.1f}s, "
+          f"{os.path.getsize(args.out) / 2**20:.0f} MB")
+    if args.check:
+        report, corrDiff, shares = check(source, pd.read_csv(args.out, encoding=loader.ENCODING, nrows=min(args.rows, 200000)))
+        with pd.option_context("display.width", 120):
+            print(report.round(3))
+            print(shares.round(3))
+        print(f"largest correlation difference {corrDiff:.3f}")
+
+if __name__ == "__main__":
+    main()
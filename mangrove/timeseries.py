@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from mangrove.partitions import PartitionStore
+
+TIME_SERIES_COLUMNS = ["Temperature"]
+STATS = ("count", "sum", "min", "max")
+#candidate plot buckets, the finest one that keeps the visible range under max_points wins
+BUCKETS = [("h", pd.Timedelta(hours=1)), ("D", pd.Timedelta(days=1)),
+           ("W", pd.Timedelta(weeks=1)), ("MS", pd.Timedelta(days=31)), ("QS", pd.Timedelta(days=92)),
+           ("YS", pd.Timedelta(days=366))]
+
+def choose_bucket(start, end, maxPoints):
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for rule, width in BUCKETS:
+        if span / width <= maxPoints:
+            return rule
+    return BUCKETS[-1][0]
+
+#hourly count/sum/min/max per partition, its size follows the history length rather than the row count
+class TimeSeriesStore(PartitionStore):
+    def __init__(self, columns=TIME_SERIES_COLUMNS, base="h"):
+        super().__init__()
+        self.columns = list(columns)
+        self.base = base
+
+    def summarize(self, part):
+        return part.groupby(part["Date"].dt.floor(self.base))[self.columns].agg(list(STATS))
+
+    #hours present on one side only are NaN on the other after the align, which fmin/fmax skip
+    def combine(self, a, b):
+        a, b = a.align(b, join="outer")
+        merged = {}
+        for key in a.columns:
+            x, y = a[key].to_numpy(), b[key].to_numpy()
+            if key[1] == "count":
+                merged[key] = (np.nan_to_num(x) + np.nan_to_num(y)).astype("int64")
+            elif key[1] == "sum":
+                merged[key] = np.nan_to_num(x) + np.nan_to_num(y)
+            else:
+                merged[key] = np.fmin(x, y) if key[1] == "min" else np.fmax(x, y)
+        return pd.DataFrame(merged, index=a.index).sort_index()
+
+    def date_range(self):
+        if not self.parts:
+            return None
+        return (min(partial.index.min() for partial in self.parts.values()),
+                max(partial.index.max() for partial in self.parts.values()))
+
+    #min/mean/max per bucket and per group ("Mangrove_Species" or "Region"), at most ~maxPoints buckets per group
+    def envelope(self, column, regions=None, species=None, by="Mangrove_Species", start=None, end=None, maxPoints=400):
+        groupAt = 1 if by == "Mangrove_Species" else 0
+        frames = []
+        for key, partial in self.partials(regions, species):
+            frame = partial[column].copy()
+            frame[by] = key[groupAt]
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=["Date", by, "min", "mean", "max", "count"])
+        hourly = pd.concat(frames).rename_axis("Date").reset_index()
+        start = pd.Timestamp(start) if start is not None else hourly["Date"].min()
+        end = pd.Timestamp(end) if end is not None else hourly["Date"].max()
+        hourly = hourly[(hourly["Date"] >= start) & (hourly["Date"] <= end)]
+        rule = choose_bucket(start, end, maxPoints)
+        result = hourly.groupby([by, pd.Grouper(key="Date", freq=rule)], observed=True).agg(
+            count=("count", "sum"), sum=("sum", "sum"), min=("min", "min"), max=("max", "max")).reset_index()
+        result = result[result["count"] > 0]
+        result["mean"] = result["sum"] / result["count"]
+        return result[["Date", by, "min", "mean", "max", "count"]]
+
+COLORS = ["rgb(31, 119, 180)", "rgb(255, 127, 14)", "rgb(44, 160, 44)",
+          "rgb(214, 39, 40)", "rgb(148, 103, 189)", "rgb(140, 86, 75)"]
+
+#mean line per group with its min..max band behind it
+def envelope_figure(envelope, by, column):
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for i, (name, group) in enumerate(envelope.groupby(by, observed=True, sort=False)):
+        color = COLORS[i % len(COLORS)]
+        band = color.replace("rgb(", "rgba(").replace(")", ", 0.2)")
+        fig.add_trace(go.Scatter(x=group["Date"], y=group["max"], mode="lines", line=dict(width=0),
+                                 legendgroup=str(name), showlegend=False, hoverinfo="skip"))
+        fig.add_trace(go.Scatter(x=group["Date"], y=group["min"], mode="lines", line=dict(width=0),
+                                 fill="tonexty", fillcolor=band, legendgroup=str(name), showlegend=False, hoverinfo="skip"))
+        fig.add_trace(go.Scatter(x=group["Date"], y=group["mean"], mode="lines", line=dict(color=color),
+                                 name=str(name), legendgroup=str(name),
+                                 customdata=group[["min", "max", "count"]],
+                                 hovertemplate="%{x}<br>mean %{y:.2f}<br>min %{customdata[0]:.2f}, max %{customdata[1]:.2f}"
+                                               "<br>%{customdata[2]} records<extra>%{fullData.name}</extra>"))
+    fig.update_layout(xaxis_title="Date", yaxis_title=column)
+    return fig
@@ -0,0 +1,62 @@
+import numpy as np
+
+from mangrove.partitions import PartitionStore
+
+#n, sum dx, sum dy, sum dx^2, sum dy^2, sum dx*dy over rows with both values, dx/dy shifted by a fixed offset
+SUMS = 6
+
+#least squares y = slope * x + intercept per group from cached sums, replaces trendline="ols" and statsmodels
+class TrendlineStore(PartitionStore):
+    def __init__(self, x="Humidity", y="Temperature", shift=(0.0, 0.0)):
+        super().__init__()
+        self.x = x
+        self.y = y
+        self.shift = tuple(float(v) for v in shift)
+
+    @classmethod
+    def configured(cls, df, **params):
+        x, y = params.get("x", "Humidity"), params.get("y", "Temperature")
+        params.setdefault("shift", (float(np.nan_to_num(df[x].mean())), float(np.nan_to_num(df[y].mean()))))
+        return super().configured(df, **params)
+
+    def summarize(self, part):
+        x = part[self.x].to_numpy(dtype="float64")
+        y = part[self.y].to_numpy(dtype="float64")
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+        dx, dy = x - self.shift[0], y - self.shift[1]
+        sums = np.array([len(x), dx.sum(), dy.sum(), (dx * dx).sum(), (dy * dy).sum(), (dx * dy).sum()])
+        return sums, (x.min() if len(x) else np.inf), (x.max() if len(x) else -np.inf)
+
+    def combine(self, a, b):
+        return a[0] + b[0], min(a[1], b[1]), max(a[2], b[2])
+
+    #slope, intercept, r2 and the two end points of the fitted line for every species in the selection
+    def fits(self, regions=None, species=None):
+        result = {}
+        for name, (sums, low, high) in self.group(1, regions, species).items():
+            n, sx, sy, sxx, syy, sxy = sums
+            if n < 2:
+                continue
+            varX = sxx - sx * sx / n
+            varY = syy - sy * sy / n
+            coVar = sxy - sx * sy / n
+            if varX <= 0:
+                continue
+            slope = coVar / varX
+            intercept = self.shift[1] + (sy - slope * sx) / n - slope * self.shift[0]
+            r2 = coVar * coVar / (varX * varY) if varY > 0 else 1.0
+            result[name] = {"n": int(n), "slope": slope, "intercept": intercept, "r2": r2,
+                            "x": [low, high], "y": [slope * low + intercept, slope * high + intercept]}
+        return result
+
+#scatter per species with its fitted line on top, in the trace's own colour and with the px trendline hover
+def add_trendlines(fig, store, regions=None, species=None):
+    import plotly.graph_objects as go
+    colors = {trace.name: trace.marker.color for trace in fig.data}
+    for name, fit in store.fits(regions, species).items():
+        hover = (f"<b>OLS trendline</b><br>{store.y} = {fit['slope']:g} * {store.x} + {fit['intercept']:g}"
+                 f"<br>R<sup>2</sup>={fit['r2']:f}<br><br>{store.x}=%{{x}}<br>{store.y}=%{{y}} <b>(trend)</b><extra></extra>")
+        fig.add_trace(go.Scatter(x=fit["x"], y=fit["y"], mode="lines", name=name, legendgroup=name, showlegend=False,
+                                 line=dict(color=colors.get(name)), hovertemplate=hover))
+    return fig
@@ -0,0 +1,61 @@
+#the shared duckdb backend across a new source version: the new backend sees the new rows and the replaced one
+#keeps answering for sessions that still hold it
+import os
+import time
+
+import numpy as np
+import pytest
+
+from mangrove import backends, columnar, loader
+
+pytest.importorskip("duckdb")
+
+def test_new_version_is_read_and_old_backend_stays_open(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("MANGROVE_OFFLINE", raising=False)
+    monkeypatch.delenv("MANGROVE_DATA", raising=False)
+    with open(loader.LOCAL_CSV, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    path = str(tmp_path / "mangrove.csv")
+    with open(path, "wb") as f:
+        f.writelines(lines[:501])
+    old = backends.duckdb_backend(path, ttl=0)
+    time.sleep(0.01) #new mtime
+    with open(path, "ab") as f:
+        f.writelines(lines[501:601])
+    new = backends.duckdb_backend(path, ttl=0)
+    assert new is not old and new.version != old.version
+    assert (old.count(), new.count()) == (500, 600)
+    assert backends.database_version(path) == new.version
+
+    for end in (701, 801, 901):
+        time.sleep(0.01)
+        with open(path, "ab") as f:
+            f.writelines(lines[end - 100:end])
+        assert backends.duckdb_backend(path, ttl=0).count() == end - 1
+    assert len(backends.database_files(path)) == backends.DATABASE_KEEP
+    backends._databases.pop(os.path.abspath(path), None)
+
+#the sql splom and map cell adapters group by region as well as by species, like the pandas stores
+@pytest.mark.parametrize("by", [0, 1])
+def test_sql_groups_match_pandas_stores(tmp_path, monkeypatch, by):
+    from mangrove.mapbins import MapBinStore
+    from mangrove.splom import SplomStore
+    monkeypatch.setattr(columnar, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("MANGROVE_DATA", raising=False)
+    backend = backends.duckdb_backend(loader.LOCAL_CSV, ttl=0)
+    with open(loader.LOCAL_CSV, "rb") as f:
+        df = loader.parse_csv(f.read())
+    sqlSplom, splom = backend.store("splom", SplomStore), SplomStore.from_frame(df)
+    sqlGroups, groups = sqlSplom.group(by, species=["Avicennia marina"]), splom.group(by, species=["Avicennia marina"])
+    assert sqlSplom.ranges == splom.ranges and sqlGroups.keys() == groups.keys()
+    for name, partial in groups.items():
+        for key, value in partial.items():
+            assert np.array_equal(sqlGroups[name][key], value), (name, key)
+    sqlCells, cells = backend.store("map_bins", MapBinStore).group(by), MapBinStore.from_frame(df).group(by)
+    assert sqlCells.keys() == cells.keys()
+    for name, frame in cells.items():
+        sqlFrame = sqlCells[name].sort_index()
+        assert np.array_equal(sqlFrame["Count"], frame.sort_index()["Count"]), name
+        assert np.allclose(sqlFrame["Latitude"], frame.sort_index()["Latitude"]), name
+    backends._databases.pop(loader.LOCAL_CSV, None)
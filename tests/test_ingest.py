@@ -0,0 +1,60 @@
+#chunks streamed in by StreamingIngest (mangrove/ingest.py) whose values fall outside the ranges the first chunk
+#set: the widened density and splom stores against stores built in one pass on the final ranges, nothing is
+#left piled up in the edge cells
+import numpy as np
+import pytest
+
+from mangrove import loader
+from mangrove.density import DENSITY_COLUMNS, DensityStore
+from mangrove.ingest import StreamingIngest
+from mangrove.splom import SplomStore
+
+STORES = {"density": DensityStore, "splom": SplomStore}
+
+#sorted on the columns, so every chunk after the first goes past the top of the ranges
+@pytest.fixture
+def chunks():
+    with open(loader.LOCAL_CSV, "rb") as f:
+        df = loader.parse_csv(f.read())
+    df = df.sort_values(["Growth_Rate", "Salinity"], ignore_index=True)
+    df.loc[len(df) - 1, "Plant_Height"] = df["Plant_Height"].min() - 50.0 #and one past the bottom
+    return df, [df.iloc[start:start + 200] for start in range(0, len(df), 200)]
+
+#the row that sat exactly on the first chunk's upper edge stays one cell lower, once per axis
+def assert_counts_close(counts, expected, n):
+    assert counts.sum() == expected.sum() == n
+    assert np.abs(counts - expected).sum() <= 2 * counts.ndim
+
+def test_later_chunks_widen_the_ranges(chunks):
+    df, parts = chunks
+    ingest = StreamingIngest(loader.LOCAL_CSV, stores=STORES)
+    for chunk in parts:
+        ingest.add(chunk, 0.0)
+    density, splom = ingest.stores["density"], ingest.stores["splom"]
+    for column in DENSITY_COLUMNS:
+        low, high = density.ranges[column]
+        assert low <= df[column].min() and df[column].max() <= high
+    single = DensityStore(density.ranges).update(df)
+    for column in DENSITY_COLUMNS:
+        counts = density.density(column)["counts"]
+        assert_counts_close(counts, single.density(column)["counts"], len(df))
+        assert counts[0] + counts[-1] < 0.01 * len(df)
+
+    for column in splom.columns:
+        assert splom.ranges[column][0] <= df[column].min() and df[column].max() <= splom.ranges[column][1]
+    single = SplomStore(splom.ranges).update(df)
+    total, expected = splom.select(), single.select()
+    for column in splom.columns:
+        assert_counts_close(total[column], expected[column], len(df))
+    assert_counts_close(splom.panel(total, "Salinity", "Soil_Moisture"), single.panel(expected, "Salinity", "Soil_Moisture"), len(df))
+
+#snapshots taken before a chunk widened the stores keep their own ranges and counts
+def test_snapshot_is_not_rebinned(chunks):
+    _, parts = chunks
+    ingest = StreamingIngest(loader.LOCAL_CSV, stores=STORES)
+    ingest.add(parts[0], 0.0)
+    before = ingest.snapshot()
+    ranges, counts = dict(before["splom"].ranges), before["splom"].select()["Salinity"].copy()
+    ingest.add(parts[-1], 1.0)
+    assert ingest.stores["splom"].ranges != ranges
+    assert before["splom"].ranges == ranges and np.array_equal(before["splom"].select()["Salinity"], counts)
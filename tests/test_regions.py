@@ -0,0 +1,48 @@
+#the vectorized assign_regions of mangrove/regions.py against the row-wise get_region it replaced
+import numpy as np
+import pytest
+
+from mangrove.regions import UNKNOWN_REGION, assign_regions, get_region, regions
+
+OVERLAPPING = [
+    {"name": "Outer", "latitude": (10.0, 20.0), "longitude": (30.0, 40.0)},
+    {"name": "Inner", "latitude": (12.0, 15.0), "longitude": (32.0, 35.0)}, #inside Outer, never wins
+    {"name": "Side", "latitude": (15.0, 25.0), "longitude": (35.0, 45.0)}, #shares a corner area with Outer
+    {"name": "Outer", "latitude": (30.0, 31.0), "longitude": (30.0, 31.0)}, #second box of the same region
+]
+
+def reference(lat, lon, regionList):
+    return np.array([get_region(a, b, regionList) for a, b in zip(lat, lon)], dtype=object)
+
+#random points plus every pair of box edges, and points just outside them
+def make_points(regionList, rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    latEdges = np.unique([v for region in regionList for v in region["latitude"]])
+    lonEdges = np.unique([v for region in regionList for v in region["longitude"]])
+    latEdges = np.concatenate([latEdges, np.nextafter(latEdges, -np.inf), np.nextafter(latEdges, np.inf)])
+    lonEdges = np.concatenate([lonEdges, np.nextafter(lonEdges, -np.inf), np.nextafter(lonEdges, np.inf)])
+    gridLat, gridLon = np.meshgrid(latEdges, lonEdges)
+    lat = np.concatenate([rng.uniform(latEdges.min() - 2, latEdges.max() + 2, rows), gridLat.ravel()])
+    lon = np.concatenate([rng.uniform(lonEdges.min() - 2, lonEdges.max() + 2, rows), gridLon.ravel()])
+    return lat, lon
+
+@pytest.mark.parametrize("regionList", [regions, OVERLAPPING], ids=["dataset", "overlapping"])
+def test_matches_get_region(regionList):
+    lat, lon = make_points(regionList)
+    assert np.array_equal(np.asarray(assign_regions(lat, lon, regionList), dtype=object), reference(lat, lon, regionList))
+
+def test_inclusive_bounds_and_first_match():
+    lat = [10.0, 20.0, 15.0, 13.0, 20.0, 30.5]
+    lon = [30.0, 40.0, 35.0, 33.0, 45.0, 30.5]
+    assert list(assign_regions(lat, lon, OVERLAPPING)) == ["Outer", "Outer", "Outer", "Outer", "Side", "Outer"]
+    #Central and Eastern of the dataset meet at latitude 27, longitude 37.5, Central is listed first
+    assert list(assign_regions([27.0], [37.5])) == [get_region(27.0, 37.5)] == ["Central"]
+
+def test_unknown_and_nan():
+    lat = [0.0, np.nan, 25.0, np.nan, 25.0]
+    lon = [0.0, 36.0, np.nan, np.nan, 36.0]
+    result = assign_regions(lat, lon)
+    assert list(result) == [UNKNOWN_REGION] * 4 + ["Central"]
+    assert list(result) == list(reference(lat, lon, regions))
+    assert list(assign_regions([], [])) == []
+    assert list(assign_regions([25.0], [36.0], [])) == [UNKNOWN_REGION] == [get_region(25.0, 36.0, [])]
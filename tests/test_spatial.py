@@ -0,0 +1,33 @@
+#map selection areas of mangrove/spatial.py: the grid cells of a binned map and the rows at selected markers,
+#through area_mask and the GridIndex, against the cell and float32 marker every row was drawn as
+import numpy as np
+
+from mangrove.mapbins import bin_points, cell_size
+from mangrove.spatial import GridIndex, area_mask
+
+def make_points(rows=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    lat, lon = rng.uniform(16.0, 28.0, rows), rng.uniform(34.0, 44.0, rows)
+    lat[:10] = np.nan
+    return lat, lon
+
+def test_cells_select_exactly_their_rows():
+    import pandas as pd
+    lat, lon = make_points()
+    cellDeg = cell_size(7)
+    df = pd.DataFrame({"Latitude": lat, "Longitude": lon, "Growth_Rate": 1.0, "Mangrove_Species": "Avicennia marina"})
+    cells = bin_points(df.dropna(), cellDeg).iloc[::7]
+    area = ("cells", (float(cells["Cell_Deg"].iloc[0]), tuple(zip(cells["Lat_Cell"], cells["Lon_Cell"]))))
+    picked = set(zip(cells["Lat_Cell"], cells["Lon_Cell"]))
+    expected = np.array([(a, b) in picked for a, b in zip(np.floor(lat / cellDeg), np.floor(lon / cellDeg))])
+    assert np.array_equal(area_mask(lat, lon, area), expected)
+    assert np.array_equal(GridIndex(lat, lon).query(area), np.flatnonzero(expected))
+    assert expected.sum() == cells["Count"].sum()
+
+#markers come back from the browser as float32, the rows they were drawn from are matched and no others
+def test_points_match_float32_markers():
+    lat, lon = make_points()
+    picked = np.array([10, 11, 500, 19999])
+    area = ("points", tuple(zip(lat[picked].astype("float32").tolist(), lon[picked].astype("float32").tolist())))
+    assert np.array_equal(np.flatnonzero(area_mask(lat, lon, area)), picked)
+    assert np.array_equal(GridIndex(lat, lon).query(area), picked)
@@ -0,0 +1,96 @@
+#rows appended to a csv in tail mode (loader.TAIL) against a full re-parse of the grown file: the frame,
+#the FilterIndex and every aggregate store folded by loader._append have to match
+import numpy as np
+import pandas as pd
+import pytest
+
+from mangrove import columnar, loader
+from mangrove.aggregates import STORES
+from mangrove.filters import FILTER_COLUMNS, FilterIndex
+
+@pytest.fixture
+def csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(columnar, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(loader, "TAIL", True)
+    monkeypatch.delenv("MANGROVE_OFFLINE", raising=False)
+    monkeypatch.delenv("MANGROVE_DATA", raising=False)
+    with open(loader.LOCAL_CSV, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    path = str(tmp_path / "mangrove.csv")
+    with open(path, "wb") as f:
+        f.writelines(lines[:401])
+    yield path, lines[401:]
+    loader.invalidate(path)
+
+def append(path, lines):
+    with open(path, "ab") as f:
+        f.writelines(lines)
+
+def pick_up(path):
+    df, _ = loader.load_versioned(path, ttl=0)
+    index = loader.derived("filter_index", FilterIndex, path, frame=df)
+    stores = {name: loader.derived(name, storeClass.from_frame, path, frame=df) for name, storeClass in STORES.items()}
+    return df, index, stores
+
+def assert_index_matches(index, full):
+    assert index.rows == full.rows
+    for column in FILTER_COLUMNS:
+        assert set(index.values(column)) == set(full.values(column))
+        for value in full.values(column):
+            assert np.array_equal(index.positions(index.bitmap(column, [value])), full.positions(full.bitmap(column, [value])))
+
+#tailed stores against the same stores (same ranges) folded over the whole re-parsed frame in one pass
+def assert_stores_match(stores, full):
+    for name, store in stores.items():
+        assert store.parts.keys() == store.copy(parts=False).update(full).parts.keys(), name
+    single = {name: store.copy(parts=False).update(full) for name, store in stores.items()}
+    pd.testing.assert_frame_equal(stores["correlation"].corr(), single["correlation"].corr(), rtol=1e-9)
+    for name, fit in single["trendline"].fits().items():
+        for key in ("slope", "intercept", "n"):
+            assert stores["trendline"].fits()[name][key] == pytest.approx(fit[key], rel=1e-9)
+    for name, box in single["box"].summary("Plant_Height").items():
+        tailed = stores["box"].summary("Plant_Height")[name]
+        assert tailed["n"] == box["n"] and tailed["mean"] == pytest.approx(box["mean"], rel=1e-9)
+        assert tailed["median"] == pytest.approx(box["median"], abs=0.05 * (box["q3"] - box["q1"]))
+    pd.testing.assert_frame_equal(stores["time_series"].envelope("Temperature"), single["time_series"].envelope("Temperature"))
+    assert np.array_equal(stores["density"].density("Growth_Rate")["counts"], single["density"].density("Growth_Rate")["counts"])
+    for key, value in single["splom"].select().items():
+        assert np.array_equal(np.asarray(stores["splom"].select()[key]), np.asarray(value)), key
+    assert stores["map_bins"].select().equals(single["map_bins"].select())
+
+def test_appended_rows_match_full_reparse(csv):
+    path, rest = csv
+    pick_up(path)
+    append(path, rest[:150])
+    append(path, rest[150:300] + [rest[300][:20]]) #a line still being written is left for the next check
+    df, index, stores = pick_up(path)
+    assert len(df) == 700
+    assert loader._cache[path].buffer is not None #picked up as an append, not reloaded
+    with open(path, "rb") as f:
+        full = loader.parse_csv(f.read().rsplit(b"\n", 1)[0] + b"\n")
+    pd.testing.assert_frame_equal(df, full, check_categorical=False)
+    assert_index_matches(index, FilterIndex(full))
+    assert_stores_match(stores, full)
+
+    append(path, [rest[300][20:]] + rest[301:])
+    df, index, stores = pick_up(path)
+    with open(path, "rb") as f:
+        full = loader.parse_csv(f.read())
+    assert len(df) == len(full)
+    pd.testing.assert_frame_equal(df, full, check_categorical=False)
+    assert_index_matches(index, FilterIndex(full))
+    assert_stores_match(stores, full)
+
+#a file that was rewritten rather than appended to is reloaded in full
+def test_rewrite_reloads(csv):
+    path, rest = csv
+    pick_up(path)
+    with open(path, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(path, "wb") as f:
+        f.writelines(lines[:1] + rest[:500])
+    df, index, _ = pick_up(path)
+    with open(path, "rb") as f:
+        full = loader.parse_csv(f.read())
+    pd.testing.assert_frame_equal(df, full, check_categorical=False)
+    assert_index_matches(index, FilterIndex(full))
@@ -0,0 +1,83 @@
+#the cached-sums fit of mangrove/trendline.py against statsmodels ols on the same rows
+import numpy as np
+import pandas as pd
+import pytest
+
+from mangrove.trendline import TrendlineStore
+
+sm = pytest.importorskip("statsmodels.api")
+
+def make_frame(rows=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    humidity = rng.uniform(40, 95, rows)
+    species = rng.choice(["Avicennia marina", "Rhizophora mucronata", "Ceriops tagal"], rows)
+    slope = np.where(species == "Avicennia marina", 0.2, np.where(species == "Ceriops tagal", -0.1, 0.05))
+    df = pd.DataFrame({"Humidity": humidity, "Temperature": 20 + slope * humidity + rng.normal(0, 2, rows),
+                       "Region": rng.choice(["North", "Central", "South"], rows), "Mangrove_Species": species})
+    df.loc[rng.choice(rows, 50, replace=False), "Temperature"] = np.nan
+    return df.astype({"Humidity": "float32", "Temperature": "float32", "Region": "category", "Mangrove_Species": "category"})
+
+def ols(rows):
+    rows = rows.dropna(subset=["Humidity", "Temperature"])
+    return sm.OLS(rows["Temperature"].to_numpy("float64"), sm.add_constant(rows["Humidity"].to_numpy("float64"))).fit()
+
+def assert_matches(fits, df):
+    for name, rows in df.groupby("Mangrove_Species", observed=True):
+        fit = ols(rows)
+        assert fits[name]["n"] == rows[["Humidity", "Temperature"]].notna().all(axis=1).sum()
+        assert fits[name]["slope"] == pytest.approx(fit.params[1], rel=1e-9, abs=1e-12)
+        assert fits[name]["intercept"] == pytest.approx(fit.params[0], rel=1e-9, abs=1e-12)
+        assert abs(fits[name]["r2"] - fit.rsquared) < 1e-9
+
+def test_fit_matches_statsmodels():
+    df = make_frame()
+    fits = TrendlineStore.from_frame(df).fits()
+    assert set(fits) == set(df["Mangrove_Species"])
+    assert_matches(fits, df)
+
+#every row in one group, the fit over the whole frame
+def test_single_group_matches_statsmodels():
+    df = make_frame().assign(Mangrove_Species="Avicennia marina").astype({"Mangrove_Species": "category"})
+    fits = TrendlineStore.from_frame(df).fits()
+    assert list(fits) == ["Avicennia marina"]
+    assert_matches(fits, df)
+
+#stores built from chunks and merged partition by partition give the single-pass fit
+def test_merged_partitions_match_statsmodels():
+    df = make_frame()
+    store = TrendlineStore.configured(df)
+    for chunk in np.array_split(np.arange(len(df)), 7):
+        store.merge(store.copy(parts=False).update(df.iloc[chunk]))
+    assert_matches(store.fits(), df)
+    single = TrendlineStore.from_frame(df).fits()
+    for name, fit in store.fits().items():
+        assert fit["slope"] == pytest.approx(single[name]["slope"], rel=1e-12)
+
+def test_filtered_subset_matches_statsmodels():
+    df = make_frame()
+    regions, species = ["North", "South"], ["Avicennia marina", "Ceriops tagal"]
+    fits = TrendlineStore.from_frame(df).fits(regions, species)
+    subset = df[df["Region"].isin(regions) & df["Mangrove_Species"].isin(species)]
+    assert set(fits) == set(species)
+    assert_matches(fits, subset)
+
+#one point or a constant humidity has no line, statsmodels cannot fit a slope there either
+def test_degenerate_groups_are_skipped():
+    df = make_frame(300)
+    single = pd.DataFrame({"Humidity": [60.0], "Temperature": [25.0], "Region": ["North"], "Mangrove_Species": ["Single"]})
+    flat = pd.DataFrame({"Humidity": [70.0] * 5, "Temperature": [24.0, 25.0, 26.0, 25.5, 24.5], "Region": ["North"] * 5,
+                         "Mangrove_Species": ["Flat"] * 5})
+    df = pd.concat([df, single, flat], ignore_index=True).astype({"Region": "category", "Mangrove_Species": "category"})
+    fits = TrendlineStore.from_frame(df).fits()
+    assert "Single" not in fits and "Flat" not in fits
+    assert_matches(fits, df[~df["Mangrove_Species"].isin(["Single", "Flat"])])
+
+#constant temperature: a flat line at that value, like statsmodels. statsmodels has no r2 there (0/0), the store shows 1
+def test_zero_variance_y():
+    df = pd.DataFrame({"Humidity": [50.0, 60.0, 70.0, 80.0], "Temperature": [25.0] * 4, "Region": ["North"] * 4,
+                       "Mangrove_Species": ["Avicennia marina"] * 4}).astype({"Region": "category", "Mangrove_Species": "category"})
+    fit = TrendlineStore.from_frame(df).fits()["Avicennia marina"]
+    reference = ols(df)
+    assert fit["slope"] == pytest.approx(reference.params[1], abs=1e-12)
+    assert fit["intercept"] == pytest.approx(reference.params[0])
+    assert fit["r2"] == 1.0